@@ -0,0 +1,50 @@
+"""Cards parsed per second for each parse_page backend.
+
+    python -m benchmarks.bench_parsers --pages 50 --repeat 3
+"""
+import argparse
+import time
+
+from benchmarks.catalog import render_page
+from utils.extract import PARSERS, parse_page
+from utils.parsers import lxml_available
+
+
+def _strip_timestamps(records):
+    return [{k: v for k, v in r.items() if k != 'timestamp'} for r in records]
+
+
+def run(pages=50, per_page=20, repeat=3):
+    documents = [render_page(p, pages, per_page) for p in range(1, pages + 1)]
+    backends = [name for name in PARSERS if name != 'lxml' or lxml_available()]
+
+    reference = [_strip_timestamps(parse_page(doc)[0]) for doc in documents]
+    results = {}
+    for name in backends:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parsed = [parse_page(doc, name) for doc in documents]
+            best = min(best, time.perf_counter() - start)
+        if [_strip_timestamps(records) for records, _ in parsed] != reference:
+            raise AssertionError(f"{name} output differs from the html.parser reference")
+        results[name] = pages * per_page / best
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.pages, args.per_page, args.repeat)
+    baseline = results['html.parser']
+    for name, rate in results.items():
+        print(f"{name:12s} {rate:10.0f} cards/s  ({rate / baseline:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
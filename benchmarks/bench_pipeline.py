@@ -0,0 +1,178 @@
+"""Stage and end-to-end benchmarks of the main.py flow against a local fake catalog.
+
+Each size starts benchmarks.fake_server in a child process, scrapes it with
+scrape_all_pages, transforms the records and loads them into CSV, Parquet and
+a database (the local SqliteSink store, or PostgreSQL with --dsn). Google
+Sheets is left out because it cannot run locally. Per-stage RunMetrics are saved to
+benchmarks/results/<time>-<commit>.json so runs can be compared across commits.
+
+    python -m benchmarks.bench_pipeline --products 1000 100000 1000000
+    python -m benchmarks.bench_pipeline --products 10000 --latency 0.02 --error-rate 0.01 --workers 16
+    python -m benchmarks.bench_pipeline --stages transform load --products 1000000
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+
+import pandas as pd
+
+from benchmarks.catalog import raw_records
+from benchmarks.fake_server import FakeCatalogServer
+from utils.extract import HEADERS, get_default_client, scrape_all_pages, set_default_client
+from utils.http_client import HttpClient
+from utils.load import CsvChunkWriter, ParquetSink, PostgresSink, SqliteSink, run_sinks
+from utils.metrics import RunMetrics
+from utils.parsers import lxml_available
+from utils.transform import transform_fashion_data
+
+STAGES = ("extract", "transform", "load")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _sinks(workdir, dsn):
+    sinks = [CsvChunkWriter(os.path.join(workdir, "products.csv")), ParquetSink(os.path.join(workdir, "parquet"))]
+    if dsn:
+        sinks.append(PostgresSink({"dsn": dsn}, table_name="bench_pipeline", mode="overwrite"))
+    else:
+        sinks.append(SqliteSink(os.path.join(workdir, "products.db")))
+    return sinks
+
+
+@contextmanager
+def _catalog_client(workers):
+    previous = get_default_client()
+    # Short backoff: injected 500s should cost a retry, not seconds of sleep.
+    client = HttpClient(headers=HEADERS, backoff_factor=0.01, backoff_max=0.1, pool_size=max(workers, 1))
+    set_default_client(client)
+    try:
+        yield client
+    finally:
+        set_default_client(previous)
+        client.close()
+
+
+def run(products, stages=STAGES, per_page=20, latency=0.0, error_rate=0.0, workers=8,
+        parser=None, dsn=None):
+    parser = parser or ('lxml' if lxml_available() else 'html.parser')
+    metrics = RunMetrics()
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as quiet:
+        if "extract" in stages:
+            server = FakeCatalogServer(math.ceil(products / per_page), per_page, latency, error_rate, process=True)
+            with server, _catalog_client(workers), metrics, metrics.stage("extract") as stage, redirect_stdout(quiet):
+                records = scrape_all_pages(server.base_url, delay=0, max_workers=workers, parser=parser)
+                stage.rows_out = len(records)
+        else:
+            records = raw_records(products)
+
+        with metrics:
+            df = pd.DataFrame(records)
+            if "transform" in stages or "load" in stages:
+                df = transform_fashion_data(df)
+
+            if "load" in stages:
+                sinks = _sinks(workdir, dsn)
+                with metrics.stage("load", rows_in=len(df)) as stage, redirect_stdout(quiet):
+                    results = run_sinks(df, sinks)
+                    stage.rows_out = len(df) if all(r.ok for r in results) else 0
+                for sink in sinks:
+                    sink.close()
+                for result in results:
+                    if not result.ok:
+                        print(f"{result.name} failed: {result.error}")
+
+    report = metrics.as_dict()
+    report.update(products=products, rows=len(df), parser=parser, workers=workers,
+                  per_page=per_page, latency=latency, error_rate=error_rate)
+    return report
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def save_results(runs, directory=RESULTS_DIR):
+    commit = _git("rev-parse", "--short", "HEAD") or "unknown"
+    document = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()} ({os.cpu_count()} CPUs)",
+        "runs": runs,
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{time.strftime('%Y%m%dT%H%M%S')}-{commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    return path
+
+
+def _print_run(report):
+    print(f"\n{report['products']:>9,} products -> {report['rows']:,} rows "
+          f"({report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU)")
+    for name, stats in report["stages"].items():
+        rate = stats["rows_out"] / stats["wall_seconds"] if stats["rows_out"] and stats["wall_seconds"] else 0
+        print(f"    {name:22s} {stats['wall_seconds']:9.3f}s  {stats['calls']:>7} calls  {rate:12,.0f} rows/s")
+
+
+def compare(old_path, new_path):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{old['commit']} -> {new['commit']}  (ratio < 1 is faster)")
+    old_runs = {run["products"]: run for run in old["runs"]}
+    for run in new["runs"]:
+        before = old_runs.get(run["products"])
+        if before is None:
+            continue
+        print(f"{run['products']:>9,} products")
+        for name, stats in run["stages"].items():
+            previous = before["stages"].get(name)
+            if not previous or not previous["wall_seconds"]:
+                continue
+            ratio = stats["wall_seconds"] / previous["wall_seconds"]
+            print(f"    {name:22s} {previous['wall_seconds']:9.3f}s -> {stats['wall_seconds']:9.3f}s  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES))
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses that are 500s")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent page fetches")
+    parser.add_argument('--parser', choices=['html.parser', 'lxml'])
+    parser.add_argument('--dsn', help="load into PostgreSQL instead of the local SQLite store")
+    parser.add_argument('--no-save', action='store_true', help="do not write a results file")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    runs = []
+    for products in args.products:
+        report = run(products, args.stages, args.per_page, args.latency, args.error_rate,
+                     args.workers, args.parser, args.dsn)
+        _print_run(report)
+        runs.append(report)
+    if not args.no_save:
+        print(f"\nResults saved to {save_results(runs)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Compare Postgres load strategies (row-by-row, prepared INSERT, COPY, staging swap) on a local server.
+
+    python -m benchmarks.bench_postgres_load --rows 10000 100000 --dsn "dbname=bench user=postgres password=admin123 host=localhost"
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.catalog import raw_records
+from utils.load import PRODUCT_COLUMNS, PRODUCT_COLUMNS_DDL, PostgresSink
+from utils.transform import transform_fashion_data
+
+TABLE = "bench_products"
+
+
+def _row_by_row(sink, df):
+    # The original save_to_postgres_append: one execute per row over iterrows().
+    with sink.transaction() as cursor:
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {TABLE} ({PRODUCT_COLUMNS_DDL});")
+        for _, row in df.iterrows():
+            cursor.execute(f"INSERT INTO {TABLE} ({PRODUCT_COLUMNS}) VALUES (%s, %s, %s, %s, %s, %s, %s)", tuple(row))
+
+
+STRATEGIES = {
+    'row-by-row INSERT': _row_by_row,
+    'prepared INSERT (batched)': lambda sink, df: sink._append(df, TABLE, use_copy=False),
+    'COPY append': lambda sink, df: sink._append(df, TABLE),
+    'COPY staging-swap overwrite': lambda sink, df: sink._overwrite(df, TABLE),
+}
+
+
+def _reset(sink):
+    with sink.transaction() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {TABLE};")
+    sink._ready.clear()
+
+
+def _count(sink):
+    with sink.transaction() as cursor:
+        cursor.execute(f"SELECT count(*) FROM {TABLE};")
+        return cursor.fetchone()[0]
+
+
+def run(rows, sink, strategies=STRATEGIES):
+    df = transform_fashion_data(pd.DataFrame(raw_records(rows)))
+    results = {}
+    for name, load in strategies.items():
+        _reset(sink)
+        start = time.perf_counter()
+        load(sink, df)
+        elapsed = time.perf_counter() - start
+        loaded = _count(sink)
+        if loaded != len(df):
+            raise AssertionError(f"{name} loaded {loaded} rows, expected {len(df)}")
+        results[name] = elapsed
+    _reset(sink)
+    return len(df), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dsn', default="dbname=fashion_db user=postgres password=admin123 host=localhost port=5432")
+    parser.add_argument('--skip-row-by-row', action='store_true', help="skip the slow iterrows strategy")
+    args = parser.parse_args()
+
+    strategies = {k: v for k, v in STRATEGIES.items() if not (args.skip_row_by_row and k.startswith('row'))}
+    with PostgresSink({'dsn': args.dsn}) as sink:
+        for rows in args.rows:
+            loaded, results = run(rows, sink, strategies)
+            print(f"{loaded:>9,} rows")
+            for name, elapsed in results.items():
+                print(f"    {name:28s} {elapsed:8.3f}s  {loaded / elapsed:12,.0f} rows/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Legacy vs current transform_fashion_data on synthetic catalogs.
+
+The legacy output is cast to OUTPUT_SCHEMA before comparing; only the
+current transform is timed with the typing step included.
+
+    python -m benchmarks.bench_transform --rows 1000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks import legacy_transform
+from benchmarks.catalog import raw_records
+from utils.transform import apply_output_schema, transform_fashion_data
+
+
+def _timed(func, df, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run(rows, repeat=3):
+    df = pd.DataFrame(raw_records(rows))
+    legacy_time, expected = _timed(legacy_transform.transform_fashion_data, df, repeat)
+    current_time, actual = _timed(transform_fashion_data, df, repeat)
+    if actual.to_csv(index=False) != apply_output_schema(expected).to_csv(index=False):
+        raise AssertionError("transform output differs from the legacy implementation")
+    return {'rows': rows, 'legacy_s': legacy_time, 'current_s': current_time,
+            'speedup': legacy_time / current_time}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        r = run(rows, args.repeat)
+        print(f"{r['rows']:>9,} rows  legacy {r['legacy_s']:.3f}s  current {r['current_s']:.3f}s  ({r['speedup']:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Synthetic fashion-studio catalog pages shaped like the markup extract_fashion_data expects."""
+import random
+
+TITLES = ["T-shirt", "Hoodie", "Pants", "Outerwear", "Jacket", "Shirt", "Dress", "Shoes"]
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+
+
+def render_card(index, rng):
+    # Mirror the live site's mix of valid and invalid rows so transforms have work to do.
+    roll = rng.random()
+    title = "Unknown Product" if roll < 0.02 else f"{rng.choice(TITLES)} {index}"
+    price = "Price Unavailable" if roll > 0.98 else f"${rng.uniform(10, 500):.2f}"
+    rating = "Rating: ⭐ Invalid Rating / 5" if 0.5 < roll < 0.52 else f"Rating: ⭐ {rng.uniform(1, 5):.1f} / 5"
+    return (
+        '<div class="collection-card">'
+        '<div style="position: relative;"><img src="/img.png" class="collection-image" alt="product"></div>'
+        '<div class="product-details">'
+        f'<h3 class="product-title">{title}</h3>'
+        f'<div class="price-container"><span class="price">{price}</span></div>'
+        f'<p style="font-size: 14px; color: #777;">{rating}</p>'
+        f'<p style="font-size: 14px; color: #777;">{rng.randint(1, 8)} Colors</p>'
+        f'<p style="font-size: 14px; color: #777;">Size: {rng.choice(SIZES)}</p>'
+        f'<p style="font-size: 14px; color: #777;">Gender: {rng.choice(GENDERS)}</p>'
+        '</div></div>'
+    )
+
+
+def render_page(page, total_pages, per_page=20, seed=0):
+    rng = random.Random(seed * 1_000_003 + page)
+    start = (page - 1) * per_page
+    cards = "".join(render_card(start + i, rng) for i in range(per_page))
+    previous = '<li class="page-item previous"><a class="page-link" href="/">Previous</a></li>' if page > 1 else ''
+    nxt = (
+        f'<li class="page-item next"><a class="page-link" href="/page{page + 1}">Next</a></li>'
+        if page < total_pages else ''
+    )
+    return (
+        '<!DOCTYPE html><html><head><meta charset="UTF-8"><title>Fashion Studio</title></head><body>'
+        f'<div class="collection-grid" id="collectionList">{cards}</div>'
+        '<ul class="pagination">'
+        f'{previous}<li class="page-item current"><span class="page-link">Page {page} of {total_pages}</span></li>{nxt}'
+        '</ul></body></html>'
+    ).encode('utf-8')
+
+
+def raw_records(n, seed=0):
+    """Records shaped like extract_fashion_data output, without rendering HTML."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(n):
+        roll = rng.random()
+        records.append({
+            "title": "Unknown Product" if roll < 0.02 else f"{rng.choice(TITLES)} {i}",
+            "price": "Price Unavailable" if roll > 0.98 else f"${rng.uniform(10, 500):.2f}",
+            "rating": "⭐ Invalid Rating / 5" if 0.5 < roll < 0.52 else (
+                "Not Rated" if 0.6 < roll < 0.61 else f"⭐ {rng.uniform(1, 5):.1f} / 5"),
+            "colors": f"{rng.randint(1, 8)} Colors",
+            "size": None if 0.7 < roll < 0.705 else rng.choice(SIZES),
+            "gender": rng.choice(GENDERS).lower(),
+            "timestamp": f"2025-06-22T17:{i // 60 % 60:02d}:{i % 60:02d}.910986",
+        })
+    return records
@@ -0,0 +1,176 @@
+"""Local stand-in for fashion-studio.dicoding.dev serving synthetic catalog pages.
+
+`/` is page 1 and `/pageN` is page N, rendered by benchmarks.catalog.render_page
+with the same markup extract_fashion_data expects. Pages past the end return 404.
+Latency and a random 500 error rate are configurable; responses carry an ETag
+and honour If-None-Match, so the HTTP cache path can be exercised too.
+
+    python -m benchmarks.fake_server --pages 500 --latency 0.05 --port 8000
+"""
+import argparse
+import multiprocessing
+import random
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.catalog import render_page
+
+PAGE_PATH = re.compile(r"^/page(\d+)/?$")
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without TCP_NODELAY each
+    # keep-alive response stalls ~40 ms on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+
+        page = _page_number(self.path.split("?", 1)[0])
+        if page is None or page > server.pages:
+            return self._reply(404, b"Not Found")
+        if server.error_rate and server.roll() < server.error_rate:
+            return self._reply(500, b"Internal Server Error")
+
+        etag = f'"{server.seed}-{server.per_page}-{page}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self._reply(304, b"", etag=etag)
+        self._reply(200, server.render(page), etag=etag)
+
+    def _reply(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _page_number(path):
+    if path in ("", "/"):
+        return 1
+    match = PAGE_PATH.match(path)
+    return int(match.group(1)) if match else None
+
+
+class CatalogServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that give up mid-response (retries, timeouts, cancelled tasks) are expected;
+        # socketserver would otherwise print a traceback to stdout for each one.
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+def make_server(pages, per_page=20, latency=0.0, error_rate=0.0, seed=0, host="127.0.0.1", port=0):
+    server = CatalogServer((host, port), CatalogHandler)
+    server.pages = pages
+    server.per_page = per_page
+    server.latency = latency
+    server.error_rate = error_rate
+    server.seed = seed
+
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    def roll():
+        with rng_lock:
+            return rng.random()
+
+    server.roll = roll
+    server.render = lru_cache(maxsize=256)(lambda page: render_page(page, pages, per_page, seed))
+    return server
+
+
+def _serve_in_child(conn, options):
+    server = make_server(**options)
+    conn.send(server.server_address[1])
+    conn.close()
+    server.serve_forever(poll_interval=0.05)
+
+
+class FakeCatalogServer:
+    """Run make_server() in a background thread, or in a child process with
+    `process=True` so rendering pages does not compete with the code under test
+    for the GIL."""
+
+    def __init__(self, pages, per_page=20, latency=0.0, error_rate=0.0, seed=0, process=False):
+        self.options = dict(pages=pages, per_page=per_page, latency=latency, error_rate=error_rate, seed=seed)
+        self.process = process
+        self.port = None
+        self._server = None
+        self._worker = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}/"
+
+    def start(self):
+        if self.process:
+            parent, child = multiprocessing.Pipe()
+            self._worker = multiprocessing.Process(target=_serve_in_child, args=(child, self.options), daemon=True)
+            self._worker.start()
+            self.port = parent.recv()
+            parent.close()
+        else:
+            self._server = make_server(**self.options)
+            self.port = self._server.server_address[1]
+            self._worker = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05},
+                                            daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        elif self._worker is not None:
+            self._worker.terminate()
+        if self._worker is not None:
+            self._worker.join()
+            self._worker = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--per-page', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of responses that are 500s")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    server = make_server(args.pages, args.per_page, args.latency, args.error_rate, args.seed, port=args.port)
+    print(f"Serving {args.pages} pages x {args.per_page} products on http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
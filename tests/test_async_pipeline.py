@@ -0,0 +1,194 @@
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+import pandas as pd
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from benchmarks.fake_server import FakeCatalogServer
+from utils.async_pipeline import (
+    AsyncPostgresSink,
+    AsyncRateLimiter,
+    aiter_pages,
+    dataframe_records,
+    fetch_content,
+    open_session,
+    run_async_pipeline,
+)
+from utils.load import CsvChunkWriter
+from utils.transform import apply_output_schema
+
+
+@pytest.fixture
+def catalog():
+    with FakeCatalogServer(pages=6, per_page=5) as server:
+        yield server
+
+
+async def _collect_pages(base_url, **kwargs):
+    async with open_session() as session:
+        return [records async for records in aiter_pages(base_url, session, **kwargs)]
+
+
+class TestAsyncExtract:
+    def test_pages_in_order(self, catalog):
+        pages = asyncio.run(_collect_pages(catalog.base_url, max_concurrency=4))
+
+        assert len(pages) == 6
+        assert all(len(records) == 5 for records in pages)
+        titles = [r["title"] for records in pages for r in records]
+        assert titles == [t for t in titles if t]  # no empty cards
+
+    def test_zero_total_is_treated_as_unknown(self, catalog):
+        pages = asyncio.run(_collect_pages(catalog.base_url, max_concurrency=4, total_pages=0))
+        assert len(pages) == 6
+
+        with patch("utils.async_pipeline.fetch_content", AsyncMock(return_value=None)), \
+                patch("utils.async_pipeline.print", create=True):
+            assert asyncio.run(_collect_pages(catalog.base_url, total_pages=0)) == []
+
+    def test_fetch_retries_server_errors(self):
+        async def run():
+            with FakeCatalogServer(pages=1, error_rate=1.0) as server:
+                async with open_session() as session:
+                    return await fetch_content(session, server.base_url, retries=2, backoff_factor=0.001)
+
+        with patch("utils.async_pipeline.print", create=True) as mock_print:
+            assert asyncio.run(run()) is None
+        assert any("500" in str(call) for call in mock_print.call_args_list)
+
+    def test_missing_page_returns_none(self, catalog):
+        async def run():
+            async with open_session() as session:
+                return await fetch_content(session, catalog.base_url + "page99", backoff_factor=0.001)
+
+        with patch("builtins.print"):
+            assert asyncio.run(run()) is None
+
+    def test_rate_limiter_spaces_requests(self):
+        async def run():
+            limiter = AsyncRateLimiter(rate=20)
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(3):
+                await limiter.wait()
+            return loop.time() - start
+
+        assert asyncio.run(run()) >= 0.09
+
+
+class TestRunAsyncPipeline:
+    def test_streams_into_sinks(self, catalog, tmp_path):
+        writer = CsvChunkWriter(str(tmp_path / "products.csv"))
+
+        stats = asyncio.run(run_async_pipeline(catalog.base_url, [writer], batch_size=7, queue_size=1,
+                                               max_concurrency=3))
+
+        assert stats["rows_extracted"] == 30
+        assert stats["sinks"]["CSV"] == {"ok": True, "rows": stats["rows_transformed"], "seconds": None,
+                                         "error": None}
+        assert len(pd.read_csv(tmp_path / "products.csv")) == stats["rows_transformed"]
+
+    def test_failed_sink_is_dropped(self, catalog, tmp_path):
+        broken = MagicMock()
+        broken.name = "Broken"
+        broken.rows = 0
+        broken.write.side_effect = RuntimeError("disk full")
+        writer = CsvChunkWriter(str(tmp_path / "products.csv"))
+
+        stats = asyncio.run(run_async_pipeline(catalog.base_url, [broken, writer], batch_size=10))
+
+        assert broken.write.call_count == 1
+        assert stats["sinks"]["Broken"]["ok"] is False
+        assert stats["sinks"]["CSV"]["rows"] == stats["rows_transformed"]
+
+
+def _fake_asyncpg_pool():
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    conn.copy_records_to_table = AsyncMock()
+    conn.transaction.return_value.__aenter__ = AsyncMock()
+    conn.transaction.return_value.__aexit__ = AsyncMock(return_value=False)
+    pool = MagicMock()
+    pool.acquire.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.acquire.return_value.__aexit__ = AsyncMock(return_value=False)
+    pool.close = AsyncMock()
+    return pool, conn
+
+
+TYPED = apply_output_schema(pd.DataFrame({
+    "title": ["T-shirt", "Hoodie"],
+    "price": [160000.0, 320000.0],
+    "rating": [4.5, 3.0],
+    "colors": [3, 5],
+    "size": ["M", "L"],
+    "gender": ["men", "women"],
+    "timestamp": ["2025-06-22T17:23:17.910986", "2025-06-22T17:23:18"],
+}))
+
+
+class TestAsyncPostgresSink:
+    def test_records_are_python_types(self):
+        records = dataframe_records(TYPED)
+        title, price, rating, colors, size, gender, timestamp = records[0]
+        assert type(price) is int and type(colors) is int
+        assert isinstance(rating, float) and isinstance(timestamp, datetime)
+        assert size == "M"
+
+    def test_append_copies_records(self):
+        pool, conn = _fake_asyncpg_pool()
+        sink = AsyncPostgresSink({"database": "fashion_db"}, table_name="products")
+
+        async def run():
+            with patch("utils.async_pipeline.asyncpg") as mock_asyncpg:
+                mock_asyncpg.create_pool = AsyncMock(return_value=pool)
+                await sink.write(TYPED)
+                await sink.close()
+
+        asyncio.run(run())
+        conn.copy_records_to_table.assert_awaited_once()
+        args, kwargs = conn.copy_records_to_table.call_args
+        assert args == ("products",)
+        assert kwargs["columns"][0] == "title" and len(kwargs["records"]) == 2
+        assert sink.rows == 2
+
+    def test_overwrite_stages_chunks_then_swaps_on_close(self):
+        pool, conn = _fake_asyncpg_pool()
+        sink = AsyncPostgresSink({"database": "fashion_db"}, table_name="products", mode="overwrite")
+
+        async def run():
+            with patch("utils.async_pipeline.asyncpg") as mock_asyncpg:
+                mock_asyncpg.create_pool = AsyncMock(return_value=pool)
+                await sink.write(TYPED)
+                await sink.write(TYPED)
+                await sink.close()
+
+        asyncio.run(run())
+        statements = [c.args[0] for c in conn.execute.call_args_list]
+        assert [c.args[0] for c in conn.copy_records_to_table.call_args_list] == ["products_staging"] * 2
+        assert statements.count("DROP TABLE IF EXISTS products_staging;") == 1
+        assert "ALTER TABLE products_staging RENAME TO products;" in statements
+        pool.close.assert_awaited_once()
+
+    def test_overwrite_failure_drops_staging_instead_of_swapping(self):
+        pool, conn = _fake_asyncpg_pool()
+        conn.copy_records_to_table.side_effect = [None, RuntimeError("connection lost")]
+        sink = AsyncPostgresSink({"database": "fashion_db"}, table_name="products", mode="overwrite")
+
+        async def run():
+            with patch("utils.async_pipeline.asyncpg") as mock_asyncpg:
+                mock_asyncpg.create_pool = AsyncMock(return_value=pool)
+                await sink.write(TYPED)
+                with pytest.raises(RuntimeError):
+                    await sink.write(TYPED)
+                await sink.close()
+
+        asyncio.run(run())
+        statements = [c.args[0] for c in conn.execute.call_args_list]
+        assert not any("RENAME TO products;" in s for s in statements)
+        assert statements[-1] == "DROP TABLE IF EXISTS products_staging;"
+
+    def test_upsert_not_supported(self):
+        with pytest.raises(ValueError):
+            AsyncPostgresSink({}, mode="upsert")
@@ -0,0 +1,65 @@
+import json
+import requests
+import pytest
+from benchmarks.fake_server import FakeCatalogServer
+from benchmarks import bench_pipeline
+from utils.extract import HEADERS, scrape_all_pages, set_default_client
+from utils.http_client import HttpClient
+
+
+@pytest.fixture
+def catalog():
+    with FakeCatalogServer(pages=3, per_page=5) as server:
+        yield server
+
+
+class TestFakeCatalogServer:
+    def test_serves_paginated_catalog(self, catalog):
+        first = requests.get(catalog.base_url, timeout=5)
+        last = requests.get(catalog.base_url + "page3", timeout=5)
+
+        assert first.status_code == 200
+        assert first.text.count('class="collection-card"') == 5
+        assert 'class="page-item next"' in first.text
+        assert 'class="page-item next"' not in last.text
+        assert requests.get(catalog.base_url + "page4", timeout=5).status_code == 404
+
+    def test_honours_if_none_match(self, catalog):
+        etag = requests.get(catalog.base_url, timeout=5).headers["ETag"]
+        response = requests.get(catalog.base_url, headers={"If-None-Match": etag}, timeout=5)
+        assert response.status_code == 304
+
+    def test_error_rate(self):
+        with FakeCatalogServer(pages=1, error_rate=1.0) as server:
+            assert requests.get(server.base_url, timeout=5).status_code == 500
+
+    def test_scrape_all_pages_reads_whole_catalog(self, catalog):
+        set_default_client(HttpClient(headers=HEADERS))
+        try:
+            records = scrape_all_pages(catalog.base_url, delay=0)
+        finally:
+            set_default_client(None)
+
+        assert len(records) == 15
+        assert all(r["title"] and r["price"] for r in records)
+
+
+class TestBenchPipeline:
+    def test_full_flow_reports_stages(self):
+        report = bench_pipeline.run(60, per_page=20, workers=2)
+
+        assert report["products"] == 60
+        assert 0 < report["rows"] <= 60
+        assert report["stages"]["extract"]["rows_out"] == 60
+        assert report["stages"]["load"]["rows_out"] == report["rows"]
+        assert {"fetch", "parse", "transform", "load:SQLite"} <= report["stages"].keys()
+
+    def test_results_round_trip_and_compare(self, tmp_path, capsys):
+        runs = [bench_pipeline.run(200, stages=("transform",))]
+        old = bench_pipeline.save_results(runs, str(tmp_path / "a"))
+        new = bench_pipeline.save_results(runs, str(tmp_path / "b"))
+
+        document = json.loads(open(new).read())
+        assert document["runs"][0]["stages"]["transform"]["rows_in"] == 200
+        bench_pipeline.compare(old, new)
+        assert "transform" in capsys.readouterr().out
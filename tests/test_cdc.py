@@ -0,0 +1,89 @@
+from datetime import datetime
+import pandas as pd
+import pytest
+from utils.cdc import ChangeTracker, attribute_hashes
+from utils.transform import apply_output_schema, product_keys
+
+
+def _snapshot(rows):
+    return apply_output_schema(pd.DataFrame(
+        [{"title": t, "price": p, "rating": r, "colors": 3, "size": "M", "gender": "men",
+          "timestamp": ts} for t, p, r, ts in rows]
+    ))
+
+
+FIRST = _snapshot([
+    ("T-shirt", 160000, 4.5, "2025-06-22T10:00:00"),
+    ("Hoodie", 320000, 3.9, "2025-06-22T10:00:01"),
+    ("Jacket", 480000, 4.1, "2025-06-22T10:00:02"),
+])
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return ChangeTracker(str(tmp_path / "state.db"))
+
+
+class TestChangeTracker:
+    def test_first_run_is_all_inserts(self, tracker):
+        changes = tracker.diff(FIRST)
+
+        assert changes.counts() == {"inserts": 3, "updates": 0, "deletes": 0}
+        assert list(changes.upserts.columns) == list(FIRST.columns)
+        assert changes.upserts["price"].dtype == "int64"
+
+    def test_unchanged_snapshot_has_no_changes(self, tracker):
+        tracker.commit(tracker.diff(FIRST))
+        later = FIRST.assign(timestamp=FIRST["timestamp"] + pd.Timedelta(days=1))
+
+        assert len(tracker.diff(later)) == 0
+
+    def test_detects_updates_and_deletes(self, tracker):
+        tracker.commit(tracker.diff(FIRST))
+        second = _snapshot([
+            ("T-shirt", 150000, 4.5, "2025-06-23T10:00:00"),  # price drop
+            ("Hoodie", 320000, 3.9, "2025-06-23T10:00:01"),   # unchanged
+            ("Pants", 200000, 4.0, "2025-06-23T10:00:02"),    # new
+        ])                                                     # Jacket removed
+
+        changes = tracker.diff(second)
+
+        assert changes.counts() == {"inserts": 1, "updates": 1, "deletes": 1}
+        assert changes.updates["title"].tolist() == ["T-shirt"]
+        assert changes.inserts["title"].tolist() == ["Pants"]
+        assert changes.deletes["title"].tolist() == ["Jacket"]
+        assert changes.deletes["product_key"].tolist() == product_keys(FIRST.iloc[[2]]).tolist()
+
+    def test_partial_snapshot_skips_deletes(self, tracker):
+        tracker.commit(tracker.diff(FIRST))
+        assert len(tracker.diff(FIRST.iloc[:1], detect_deletes=False).deletes) == 0
+
+    def test_diff_does_not_advance_state(self, tracker):
+        tracker.diff(FIRST)
+        assert len(tracker) == 0
+        assert tracker.diff(FIRST).counts()["inserts"] == 3
+
+    def test_duplicate_products_keep_latest_row(self, tracker):
+        snapshot = _snapshot([
+            ("T-shirt", 100000, 4.0, "2025-06-22T10:00:05"),
+            ("T-shirt", 90000, 4.0, "2025-06-22T10:00:00"),
+        ])
+        changes = tracker.diff(snapshot)
+        assert changes.inserts["price"].tolist() == [100000]
+
+    def test_history_records_price_and_rating_changes(self, tracker):
+        tracker.commit(tracker.diff(FIRST), observed_at=datetime(2025, 6, 22))
+        second = FIRST.assign(price=FIRST["price"] - 10000).iloc[:2]
+        tracker.commit(tracker.diff(second), observed_at=datetime(2025, 6, 23))
+
+        key = product_keys(FIRST.iloc[[0]]).iloc[0]
+        history = tracker.history(key)
+        assert history["change"].tolist() == ["insert", "update"]
+        assert history["price"].tolist() == [160000, 150000]
+        assert history["rating"].tolist() == [4.5, 4.5]
+        assert tracker.history()["change"].tolist().count("delete") == 1
+        assert len(tracker) == 2
+
+    def test_attribute_hash_ignores_timestamp(self):
+        later = FIRST.assign(timestamp=FIRST["timestamp"] + pd.Timedelta(hours=1))
+        assert attribute_hashes(FIRST).tolist() == attribute_hashes(later).tolist()
@@ -0,0 +1,64 @@
+import os
+from unittest.mock import patch
+import pytest
+from utils.checkpoint import CrawlCheckpoint
+
+BASE_URL = "https://fashion-studio.dicoding.dev/"
+
+
+class TestCrawlCheckpoint:
+    def test_round_trip(self, tmp_path):
+        """Saved pages are returned as (records, has_next)"""
+        checkpoint = CrawlCheckpoint(tmp_path / "ckpt", BASE_URL)
+        checkpoint.save_page(2, [{"title": "A"}], True)
+
+        assert checkpoint.get(2) == ([{"title": "A"}], True)
+        assert checkpoint.get(1) is None
+        assert checkpoint.completed_pages() == [2]
+
+    def test_survives_reopen(self, tmp_path):
+        """A new instance for the same crawl sees pages saved by the previous one"""
+        CrawlCheckpoint(tmp_path, BASE_URL).save_page(1, [{"title": "A"}], False)
+
+        assert CrawlCheckpoint(tmp_path, BASE_URL).get(1) == ([{"title": "A"}], False)
+
+    def test_different_base_url_discards_state(self, tmp_path):
+        """State from another crawl is never resumed"""
+        CrawlCheckpoint(tmp_path, BASE_URL).save_page(1, [{"title": "A"}], True)
+
+        checkpoint = CrawlCheckpoint(tmp_path, "https://example.com/")
+        assert checkpoint.completed_pages() == []
+
+    def test_typed_records_do_not_mix_with_raw(self, tmp_path):
+        """Switching typed field parsing on starts a fresh crawl"""
+        CrawlCheckpoint(tmp_path, BASE_URL).save_page(1, [{"price": "$10.00"}], True)
+
+        assert CrawlCheckpoint(tmp_path, BASE_URL, typed=True).completed_pages() == []
+
+    def test_clear(self, tmp_path):
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+        checkpoint.save_page(1, [{"title": "A"}], True)
+        (tmp_path / "leftover.tmp").write_text("")
+        (tmp_path / "notes.txt").write_text("keep me")
+        checkpoint.clear()
+
+        assert checkpoint.completed_pages() == []
+        assert sorted(os.listdir(tmp_path)) == ["notes.txt"]
+
+    def test_failed_write_keeps_previous_file(self, tmp_path):
+        """An interrupted write leaves the previous page state and no temp files"""
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+        checkpoint.save_page(1, [{"title": "old"}], True)
+
+        with patch("utils.fileio.os.fsync", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                checkpoint.save_page(1, [{"title": "new"}], True)
+
+        assert checkpoint.get(1) == ([{"title": "old"}], True)
+        assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+    def test_corrupt_page_is_treated_as_missing(self, tmp_path):
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+        (tmp_path / "page-000003.json").write_text("{not json")
+
+        assert checkpoint.get(3) is None
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+import pytest
+from benchmarks.fake_server import FakeCatalogServer
+from utils.discovery import discover_page_count, discover_pages, page_count_from_html, probe_last_page
+from utils.extract import fetching_content, page_url, set_default_client
+
+
+@pytest.fixture
+def catalog():
+    with FakeCatalogServer(pages=13, per_page=2) as server:
+        yield server
+    set_default_client(None)
+
+
+def test_page_count_from_pagination_text():
+    assert page_count_from_html(b'<li class="page-item current"><span>Page 1 of 50</span></li>') == 50
+    assert page_count_from_html("<ul class='pagination'><li class='next'></li></ul>") is None
+
+
+@pytest.mark.parametrize("last", [1, 2, 3, 8, 13, 64, 1000])
+def test_probe_finds_last_page_in_log_requests(last):
+    probed = []
+
+    def exists(page):
+        probed.append(page)
+        return page <= last
+
+    assert probe_last_page(exists) == last
+    assert len(probed) <= 2 * last.bit_length() + 1
+
+
+def test_probe_respects_max_pages():
+    assert probe_last_page(lambda page: True, max_pages=100) == 100
+
+
+def test_discovery_reads_page_count(catalog):
+    with patch("utils.discovery.fetching_content", wraps=fetching_content) as fetch:
+        urls = discover_pages(catalog.base_url)
+
+    assert urls == [page_url(catalog.base_url, page) for page in range(1, 14)]
+    assert fetch.call_count == 1
+
+
+def test_discovery_probes_without_page_count(catalog):
+    with patch("utils.discovery.page_count_from_html", return_value=None), patch("builtins.print"):
+        assert discover_page_count(catalog.base_url) == 13
+
+
+def test_discovery_of_unreachable_catalog():
+    with patch("utils.discovery.fetching_content", return_value=None):
+        assert discover_pages("http://127.0.0.1:9/") == []
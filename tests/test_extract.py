@@ -2,38 +2,69 @@ import pytest
 from unittest.mock import patch, MagicMock
 from bs4 import BeautifulSoup
 import requests
+import time
 from datetime import datetime
 from utils.extract import (
     fetching_content,
+    get_default_client,
+    set_default_client,
     extract_fashion_data,
     scrape_all_pages,
     extract_all_products_from_url,
+    page_url,
+    iter_pages,
+    iter_batches,
+    scrape_pages_pipelined,
+    RateLimiter,
     HEADERS
 )
+from utils.checkpoint import CrawlCheckpoint
 
 BASE_URL = "https://fashion-studio.dicoding.dev/"
 
 class TestFetchingContent:
-    @patch('requests.get')
-    def test_successful_fetch(self, mock_get):
+    @patch('utils.extract.get_default_client')
+    def test_successful_fetch(self, mock_get_client):
         """Test successful content fetching"""
-        mock_response = MagicMock()
-        mock_response.raise_for_status.return_value = None
-        mock_response.content = b'<html>content</html>'
-        mock_get.return_value = mock_response
+        mock_get_client.return_value.get_content.return_value = b'<html>content</html>'
 
         result = fetching_content(BASE_URL)
         assert result == b'<html>content</html>'
-        mock_get.assert_called_once_with(BASE_URL, headers=HEADERS)
+        mock_get_client.return_value.get_content.assert_called_once_with(BASE_URL)
 
-    @patch('requests.get')
-    def test_failed_fetch(self, mock_get):
+    @patch('utils.extract.get_default_client')
+    def test_failed_fetch(self, mock_get_client):
         """Test failed request handling"""
-        mock_get.side_effect = requests.exceptions.RequestException("Error")
+        mock_get_client.return_value.get_content.side_effect = requests.exceptions.RequestException("Error")
 
         result = fetching_content(BASE_URL)
         assert result is None
 
+    def test_explicit_client(self):
+        """Test fetching through a caller-supplied client"""
+        client = MagicMock()
+        client.get_content.return_value = b'<html>custom</html>'
+
+        assert fetching_content(BASE_URL, client=client) == b'<html>custom</html>'
+        client.get_content.assert_called_once_with(BASE_URL)
+
+    def test_set_default_client(self):
+        """Test swapping the shared client"""
+        original = get_default_client()
+        replacement = MagicMock()
+        replacement.get_content.return_value = b'<html>swapped</html>'
+        try:
+            set_default_client(replacement)
+            assert fetching_content(BASE_URL) == b'<html>swapped</html>'
+        finally:
+            set_default_client(original)
+
+    def test_default_client_is_shared(self):
+        """Test the pooled default client is created once and carries HEADERS"""
+        client = get_default_client()
+        assert get_default_client() is client
+        assert client.session.headers['User-Agent'] == HEADERS['User-Agent']
+
 class TestExtractFashionData:
     def test_complete_product_data(self):
         """Test extraction with complete product data"""
@@ -172,4 +203,237 @@ class TestExtractAllProductsFromUrl:
         mock_fetch.return_value = None
 
         results = extract_all_products_from_url(BASE_URL)
-        assert results == []
\ No newline at end of file
+        assert results == []
+
+def _catalog_pages(total_pages, cards_per_page=2):
+    """Build a fake catalog: url -> html bytes, with `li.next` on every page but the last."""
+    pages = {}
+    for page in range(1, total_pages + 1):
+        url = page_url(BASE_URL, page)
+        cards = "".join(
+            f"""<div class="collection-card"><div class="product-details">
+                <h3 class="product-title">P{page}-{i}</h3></div></div>"""
+            for i in range(cards_per_page)
+        )
+        nxt = '<li class="next"><a href="#"></a></li>' if page < total_pages else ''
+        pages[url] = f"<html>{cards}{nxt}</html>".encode()
+    return pages
+
+class TestScrapeAllPagesConcurrent:
+    @patch('utils.extract.fetching_content')
+    def test_same_order_as_sequential(self, mock_fetch):
+        """Concurrent mode returns records in the same order as the sequential path"""
+        pages = _catalog_pages(7)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        with patch('utils.extract.time.sleep'):
+            sequential = scrape_all_pages(BASE_URL)
+        concurrent = scrape_all_pages(BASE_URL, max_workers=4)
+
+        titles = [r['title'] for r in concurrent]
+        assert titles == [r['title'] for r in sequential]
+        assert titles[:3] == ['P1-0', 'P1-1', 'P2-0']
+        assert len(titles) == 14
+
+    @patch('utils.extract.fetching_content')
+    def test_overfetch_bounded_by_workers(self, mock_fetch):
+        """Pages past the end are fetched at most max_workers - 1 times"""
+        pages = _catalog_pages(5)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        results = scrape_all_pages(BASE_URL, max_workers=3)
+        assert len(results) == 10
+        assert mock_fetch.call_count <= 5 + 2
+
+    @patch('utils.extract.fetching_content')
+    def test_stops_on_failed_page(self, mock_fetch, capsys):
+        """A failed fetch ends the concurrent crawl like the sequential one"""
+        pages = _catalog_pages(5)
+        del pages[page_url(BASE_URL, 3)]
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        results = scrape_all_pages(BASE_URL, max_workers=4)
+        assert [r['title'] for r in results] == ['P1-0', 'P1-1', 'P2-0', 'P2-1']
+        assert "Failed to fetch content. Stopping." in capsys.readouterr().out
+
+    @patch('utils.extract.fetching_content')
+    def test_known_total_fetches_nothing_past_the_end(self, mock_fetch):
+        """With total_pages from discovery, no page beyond the catalog is requested"""
+        pages = _catalog_pages(5)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        results = scrape_all_pages(BASE_URL, max_workers=4, total_pages=5)
+        assert len(results) == 10
+        assert mock_fetch.call_count == 5
+
+    @patch('utils.extract.fetching_content')
+    def test_underestimated_total_follows_pagination(self, mock_fetch, capsys):
+        """A stale total_pages does not cut the crawl short"""
+        pages = _catalog_pages(6)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        results = scrape_all_pages(BASE_URL, max_workers=3, total_pages=4)
+        assert len(results) == 12
+        assert "following pagination" in capsys.readouterr().out
+
+    @patch('utils.extract.fetching_content')
+    def test_zero_total_is_treated_as_unknown(self, mock_fetch):
+        """A failed discovery (total_pages=0) falls back to following the pagination"""
+        pages = _catalog_pages(3)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        assert len(scrape_all_pages(BASE_URL, max_workers=3, total_pages=0)) == 6
+        mock_fetch.side_effect = lambda url: None
+        assert scrape_all_pages(BASE_URL, max_workers=3, total_pages=0) == []
+
+class TestRateLimiter:
+    def test_unlimited_never_sleeps(self):
+        limiter = RateLimiter()
+        with patch('utils.extract.time.sleep') as mock_sleep:
+            for _ in range(5):
+                limiter.wait()
+        mock_sleep.assert_not_called()
+
+    def test_spaces_requests(self):
+        limiter = RateLimiter(rate=10)
+        with patch('utils.extract.time.sleep') as mock_sleep:
+            for _ in range(3):
+                limiter.wait()
+        assert mock_sleep.call_count >= 1
+        assert all(0 < c.args[0] <= 0.2 for c in mock_sleep.call_args_list)
+
+class TestScrapePagesPipelined:
+    @patch('utils.extract.fetching_content')
+    def test_matches_sequential_order(self, mock_fetch):
+        """Pipelined extraction yields the same records, in page order"""
+        pages = _catalog_pages(9, cards_per_page=3)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        pages = list(scrape_pages_pipelined(BASE_URL, fetch_workers=3, parse_workers=2, queue_size=2))
+        assert [[r['title'] for r in records] for records in pages] == [
+            [f"P{p}-{i}" for i in range(3)] for p in range(1, 10)
+        ]
+
+    @patch('utils.extract.fetching_content')
+    def test_stops_on_failed_page(self, mock_fetch):
+        """A failed fetch ends the stream after the pages before it"""
+        pages = _catalog_pages(6)
+        del pages[page_url(BASE_URL, 4)]
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        pages = list(scrape_pages_pipelined(BASE_URL, fetch_workers=2, parse_workers=1))
+        assert [len(records) for records in pages] == [2, 2, 2]
+
+    @patch('utils.extract.fetching_content')
+    def test_in_flight_pages_are_bounded(self, mock_fetch):
+        """Fetchers never run more than fetch_workers + queue_size pages ahead"""
+        pages = _catalog_pages(40, cards_per_page=1)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        stream = scrape_pages_pipelined(BASE_URL, fetch_workers=2, parse_workers=1, queue_size=2)
+        assert [r['title'] for r in next(stream)] == ['P1-0']
+        time.sleep(0.3)
+        assert mock_fetch.call_count <= 4
+        stream.close()
+
+    @patch('utils.extract.fetching_content')
+    def test_known_total_and_stale_total(self, mock_fetch):
+        """Fetchers stop claiming at total_pages, and resume if the last page links further"""
+        pages = _catalog_pages(6, cards_per_page=1)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        exact = list(scrape_pages_pipelined(BASE_URL, fetch_workers=3, parse_workers=1, total_pages=6))
+        assert len(exact) == 6
+        assert mock_fetch.call_count == 6
+
+        stale = list(scrape_pages_pipelined(BASE_URL, fetch_workers=3, parse_workers=1, total_pages=3))
+        assert [r['title'] for records in stale for r in records] == [f"P{p}-0" for p in range(1, 7)]
+
+    @patch('utils.extract.fetching_content')
+    def test_zero_total_is_treated_as_unknown(self, mock_fetch):
+        """total_pages=0 from a failed discovery must not stall the fetchers"""
+        pages = _catalog_pages(3, cards_per_page=1)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+        assert len(list(scrape_pages_pipelined(BASE_URL, fetch_workers=2, parse_workers=1, total_pages=0))) == 3
+
+        mock_fetch.side_effect = lambda url: None
+        assert list(scrape_pages_pipelined(BASE_URL, fetch_workers=2, parse_workers=1, total_pages=0)) == []
+
+class TestIterPages:
+    @patch('utils.extract.fetching_content')
+    @patch('utils.extract.time.sleep')
+    def test_yields_per_page(self, mock_sleep, mock_fetch):
+        """Test the generator yields one record list per page"""
+        pages = _catalog_pages(3, cards_per_page=2)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        stream = iter_pages(BASE_URL)
+        assert [r['title'] for r in next(stream)] == ['P1-0', 'P1-1']
+        assert mock_fetch.call_count == 1
+        assert len(list(stream)) == 2
+
+    def test_iter_batches_regroups_records(self):
+        """Test per-page lists are regrouped into fixed-size batches"""
+        batches = list(iter_batches([[1, 2, 3], [4], [5, 6, 7, 8, 9]], batch_size=4))
+        assert batches == [[1, 2, 3, 4], [5, 6, 7, 8], [9]]
+
+class TestResumableCrawl:
+    @patch('utils.extract.fetching_content')
+    @patch('utils.extract.time.sleep')
+    def test_resume_skips_completed_pages(self, mock_sleep, mock_fetch, tmp_path):
+        """A crawl that failed on page 3 resumes there and skips pages 1-2"""
+        pages = _catalog_pages(4)
+        flaky = dict(pages)
+        del flaky[page_url(BASE_URL, 3)]
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+
+        mock_fetch.side_effect = lambda url: flaky.get(url)
+        first = scrape_all_pages(BASE_URL, checkpoint=checkpoint)
+        assert len(first) == 4
+        assert checkpoint.completed_pages() == [1, 2]
+
+        mock_fetch.reset_mock()
+        mock_fetch.side_effect = lambda url: pages.get(url)
+        second = scrape_all_pages(BASE_URL, checkpoint=CrawlCheckpoint(tmp_path, BASE_URL))
+
+        assert [r['title'] for r in second] == [f"P{p}-{i}" for p in range(1, 5) for i in range(2)]
+        fetched = [c.args[0] for c in mock_fetch.call_args_list]
+        assert fetched == [page_url(BASE_URL, 3), page_url(BASE_URL, 4)]
+
+    @patch('utils.extract.fetching_content')
+    @patch('utils.extract.time.sleep')
+    def test_completed_crawl_clears_checkpoint(self, mock_sleep, mock_fetch, tmp_path):
+        pages = _catalog_pages(2)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+
+        scrape_all_pages(BASE_URL, checkpoint=checkpoint)
+        assert checkpoint.completed_pages() == []
+
+    @patch('utils.extract.fetching_content')
+    @patch('utils.extract.time.sleep')
+    def test_resume_false_starts_over(self, mock_sleep, mock_fetch, tmp_path):
+        pages = _catalog_pages(2)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+        checkpoint.save_page(1, [{"title": "stale"}], True)
+
+        results = scrape_all_pages(BASE_URL, checkpoint=checkpoint, resume=False)
+        assert results[0]['title'] == 'P1-0'
+        assert mock_fetch.call_count == 2
+
+    @patch('utils.extract.fetching_content')
+    def test_concurrent_resume(self, mock_fetch, tmp_path):
+        """The concurrent path also serves saved pages without fetching them"""
+        pages = _catalog_pages(5)
+        checkpoint = CrawlCheckpoint(tmp_path, BASE_URL)
+        checkpoint.save_page(1, [{"title": "P1-0"}, {"title": "P1-1"}], True)
+        checkpoint.save_page(2, [{"title": "P2-0"}, {"title": "P2-1"}], True)
+        mock_fetch.side_effect = lambda url: pages.get(url)
+
+        results = scrape_all_pages(BASE_URL, max_workers=3, checkpoint=checkpoint)
+
+        assert [r['title'] for r in results] == [f"P{p}-{i}" for p in range(1, 6) for i in range(2)]
+        fetched = {c.args[0] for c in mock_fetch.call_args_list}
+        assert page_url(BASE_URL, 1) not in fetched
+        assert page_url(BASE_URL, 2) not in fetched
@@ -0,0 +1,57 @@
+import pytest
+from utils import fields
+from utils.fields import cache_stats, parse_colors, parse_paragraph, parse_paragraph_typed, parse_price, parse_rating
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    fields.clear_caches()
+    yield
+    fields.clear_caches()
+
+
+def test_paragraph_classification_matches_extract_rules():
+    assert parse_paragraph("Rating: ⭐ 4.8 / 5") == ("rating", "⭐ 4.8 / 5")
+    assert parse_paragraph("3 Colors") == ("colors", "3 Colors")
+    assert parse_paragraph("Size: xl") == ("size", "XL")
+    assert parse_paragraph("Gender: Men") == ("gender", "men")
+    assert parse_paragraph("Free shipping") == (None, None)
+
+
+def test_typed_values():
+    assert parse_paragraph_typed("Rating: ⭐ 4.8 / 5") == ("rating", 4.8)
+    assert parse_paragraph_typed("Rating: ⭐ Invalid Rating / 5") == ("rating", None)
+    assert parse_paragraph_typed("Rating: Not Rated") == ("rating", None)
+    assert parse_paragraph_typed("3 Colors") == ("colors", 3)
+    assert parse_paragraph_typed("Size: M") == ("size", "M")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$499.00", 499.0),
+    ("$1,250.50", 1250.5),
+    ("Price Unavailable", None),
+    (None, None),
+    ("$.", None),
+])
+def test_parse_price(text, expected):
+    assert parse_price(text) == expected
+
+
+def test_out_of_range_colors_and_bad_ratings():
+    assert parse_colors("300 Colors") is None
+    assert parse_colors("Colors") is None
+    assert parse_rating("⭐ . / 5") is None
+
+
+def test_cache_stats_count_since_baseline():
+    parse_paragraph("Size: M")
+    baseline = cache_stats()
+    for _ in range(3):
+        parse_paragraph("Size: M")
+    parse_paragraph("Size: L")
+
+    stats = cache_stats(baseline)["paragraph"]
+    assert (stats["hits"], stats["misses"]) == (3, 1)
+    assert stats["hit_rate"] == 0.75
+    assert stats["size"] == 2
+    assert cache_stats(baseline)["price"]["hit_rate"] is None
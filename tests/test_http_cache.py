@@ -0,0 +1,110 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.http_cache import ResponseCache
+from utils.http_client import HttpClient
+
+URL = "https://fashion-studio.dicoding.dev/page2"
+
+
+class TestResponseCache:
+    def test_store_and_get(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        assert cache.store(URL, b'<html>page</html>', etag='"abc"', last_modified='Mon, 01 Jan 2024 00:00:00 GMT')
+
+        cached = cache.get(URL)
+        assert cached.body == b'<html>page</html>'
+        assert cached.etag == '"abc"'
+        assert cache.conditional_headers(URL) == {
+            'If-None-Match': '"abc"',
+            'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+        }
+
+    def test_missing_entry(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        assert cache.get(URL) is None
+        assert cache.conditional_headers(URL) == {}
+
+    def test_skips_responses_without_validators(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        assert not cache.store(URL, b'body')
+        assert URL not in cache
+
+    def test_persists_across_instances(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.store(URL, b'body', etag='"v1"')
+        cache.flush()
+        assert ResponseCache(str(tmp_path)).get(URL).body == b'body'
+
+    def test_index_is_written_on_flush_not_per_lookup(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        for page in range(20):
+            cache.store(f"{URL}?p={page}", b'body', etag='"v1"')
+            cache.get(f"{URL}?p={page}")
+        assert not (tmp_path / ResponseCache.INDEX_FILE).exists()
+
+        cache.flush()
+        assert len(ResponseCache(str(tmp_path))) == 20
+
+    def test_index_is_written_after_flush_interval(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), flush_interval=0)
+        cache.store(URL, b'body', etag='"v1"')
+        assert URL in ResponseCache(str(tmp_path))
+
+    def test_lru_eviction(self, tmp_path):
+        cache = ResponseCache(str(tmp_path), max_bytes=10)
+        cache.store('a', b'aaaa', etag='1')
+        cache.store('b', b'bbbb', etag='2')
+        cache.get('a')  # 'b' is now least recently used
+        cache.store('c', b'cccc', etag='3')
+
+        assert 'a' in cache and 'c' in cache
+        assert 'b' not in cache
+        assert cache.total_bytes == 8
+        assert len(list(tmp_path.glob('*.body'))) == 2
+
+    def test_clear(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        cache.store(URL, b'body', etag='"v1"')
+        cache.clear()
+        assert len(cache) == 0
+        assert not list(tmp_path.glob('*.body'))
+
+
+class _EtagHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'<html>catalog</html>'
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _EtagHandler)
+    httpd.requests = []
+    threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_client_revalidates_with_cache(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_address[1]}/"
+    with HttpClient(cache=ResponseCache(str(tmp_path))) as client:
+        assert client.get_content(url) == b'<html>catalog</html>'
+    with HttpClient(cache=ResponseCache(str(tmp_path))) as client:
+        assert client.get_content(url) == b'<html>catalog</html>'
+
+    assert 'If-None-Match' not in server.requests[0]
+    assert server.requests[1]['If-None-Match'] == '"v1"'
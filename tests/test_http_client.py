@@ -0,0 +1,90 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from utils.http_client import HttpClient
+
+
+class _ScriptedHandler(BaseHTTPRequestHandler):
+    """Replies with the next (status, headers) from the server script, then 200."""
+
+    def do_GET(self):
+        self.server.hits += 1
+        status, headers = self.server.script.pop(0) if self.server.script else (200, {})
+        body = b'ok' if status == 200 else b'error'
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), _ScriptedHandler)
+    httpd.script = []
+    httpd.hits = 0
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(httpd):
+    return f"http://127.0.0.1:{httpd.server_address[1]}/"
+
+
+def test_retries_transient_5xx(server):
+    server.script = [(503, {}), (502, {})]
+    with HttpClient(backoff_factor=0, backoff_jitter=0) as client:
+        response = client.get(_url(server))
+    assert response.status_code == 200
+    assert response.content == b'ok'
+    assert server.hits == 3
+
+
+def test_gives_up_after_retries(server):
+    server.script = [(500, {})] * 5
+    with HttpClient(retries=2, backoff_factor=0, backoff_jitter=0) as client:
+        response = client.get(_url(server))
+    assert response.status_code == 500
+    assert server.hits == 3
+    with pytest.raises(requests.exceptions.HTTPError):
+        response.raise_for_status()
+
+
+def test_client_errors_are_not_retried(server):
+    server.script = [(404, {})]
+    with HttpClient(backoff_factor=0, backoff_jitter=0) as client:
+        response = client.get(_url(server))
+    assert response.status_code == 404
+    assert server.hits == 1
+
+
+def test_honours_retry_after(server, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr('urllib3.util.retry.time.sleep', sleeps.append)
+    server.script = [(429, {'Retry-After': '2'})]
+    with HttpClient(backoff_factor=0, backoff_jitter=0) as client:
+        response = client.get(_url(server))
+    assert response.status_code == 200
+    assert sleeps == [2.0]
+
+
+def test_connection_error_raises_after_retries():
+    with HttpClient(retries=1, backoff_factor=0, backoff_jitter=0, connect_timeout=0.5) as client:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get('http://127.0.0.1:9/')
+
+
+def test_timeouts_are_applied():
+    client = HttpClient(connect_timeout=2, read_timeout=7)
+    assert client.timeout == (2, 7)
+    adapter = client.session.get_adapter('https://example.com')
+    assert adapter.max_retries.respect_retry_after_header
+    client.close()
@@ -1,14 +1,22 @@
+import hashlib
+import sqlite3
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 import pandas as pd
 import psycopg2
 from psycopg2 import OperationalError, errors as psycopg2_errors
+import utils.load as load_module
 from utils.load import (
     save_to_csv,
     save_to_google_sheets,
-    create_database,
-    save_to_postgres_append,
-    save_to_postgres_overwrite
+    SheetsSink,
+    ParquetSink,
+    PostgresSink,
+    save_chunks,
+    CsvChunkWriter,
+    run_sinks,
+    SqliteSink
 )
 
 # Sample DataFrame for testing
@@ -34,11 +42,81 @@ def test_save_to_csv_failure(mock_to_csv):
     mock_to_csv.assert_called_once_with("test_output.csv", index=False)
 
 # ------------------------ Test save_to_google_sheets ------------------------ #
+class FakeSheetsValues:
+    """In-memory stand-in for spreadsheets().values() that trims trailing blanks like the real API."""
+
+    def __init__(self, grid=None):
+        self.grid = [list(row) for row in (grid or [])]
+        self.calls = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, spreadsheetId, range):
+        rows = [self._trim(row) for row in self.grid]
+        while rows and not rows[-1]:
+            rows.pop()
+        return MagicMock(execute=MagicMock(return_value={'values': rows} if rows else {}))
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.calls.append(('batchUpdate', body))
+        for entry in body['data']:
+            first, column = self._first_row(entry['range']), self._first_column(entry['range'])
+            for offset, row in enumerate(entry['values']):
+                self._row(first + offset)[column:column + len(row)] = row
+        return MagicMock()
+
+    def batchClear(self, spreadsheetId, body):
+        self.calls.append(('batchClear', body))
+        for rng in body['ranges']:
+            first, last = rng.split('!')[1].split(':')
+            for i in range(self._first_row(rng), int(''.join(filter(str.isdigit, last)))):
+                self.grid[i] = []
+        return MagicMock()
+
+    def _row(self, i):
+        while len(self.grid) <= i:
+            self.grid.append([])
+        width = max(len(r) for r in self.grid) or 7
+        self.grid[i] += [''] * (width - len(self.grid[i]))
+        return self.grid[i]
+
+    @staticmethod
+    def _first_row(rng):
+        return int(''.join(filter(str.isdigit, rng.split('!')[1].split(':')[0]))) - 1
+
+    @staticmethod
+    def _first_column(rng):
+        index = 0
+        for letter in filter(str.isalpha, rng.split('!')[1].split(':')[0]):
+            index = index * 26 + ord(letter) - 64
+        return index - 1
+
+    @staticmethod
+    def _trim(row):
+        row = list(row)
+        while row and row[-1] == '':
+            row.pop()
+        return row
+
+
+def _sheet_rows(df):
+    return [df.columns.tolist()] + df.astype(str).values.tolist()
+
+@pytest.fixture(autouse=True)
+def _fresh_sheets_cache():
+    load_module._sheets_services.clear()
+    yield
+    load_module._sheets_services.clear()
+
 @patch('utils.load.Credentials.from_service_account_file')
 @patch('utils.load.build')
 def test_save_to_google_sheets_success(mock_build, mock_creds):
-    mock_service = MagicMock()
-    mock_build.return_value = mock_service
+    fake = FakeSheetsValues()
+    mock_build.return_value = fake
 
     save_to_google_sheets(
         TEST_DF,
@@ -51,14 +129,99 @@ def test_save_to_google_sheets_success(mock_build, mock_creds):
         "credentials.json",
         scopes=['https://www.googleapis.com/auth/spreadsheets']
     )
-    mock_service.spreadsheets.return_value.values.return_value.update.assert_called_once()
+    assert [name for name, _ in fake.calls] == ['batchUpdate']
+    assert fake.calls[0][1]['data'][0]['range'] == 'Test Sheet!A1:G3'
+    assert fake.get('x', 'y').execute()['values'] == _sheet_rows(TEST_DF)
 
 @patch('utils.load.Credentials.from_service_account_file', side_effect=Exception("Auth error"))
 def test_save_to_google_sheets_failure(mock_creds):
     save_to_google_sheets(TEST_DF, "credentials.json", "spreadsheet_id")
     mock_creds.assert_called_once()
 
-# ------------------------ Test create_database ------------------------ #
+@patch('utils.load.Credentials.from_service_account_file')
+@patch('utils.load.build')
+def test_sheets_service_is_cached(mock_build, mock_creds):
+    mock_build.return_value = FakeSheetsValues()
+    save_to_google_sheets(TEST_DF, "credentials.json", "spreadsheet_id")
+    save_to_google_sheets(TEST_DF, "credentials.json", "spreadsheet_id")
+    mock_build.assert_called_once()
+    mock_creds.assert_called_once()
+
+def test_sheets_sink_sends_only_changed_rows():
+    df = pd.concat([TEST_DF] * 5, ignore_index=True)
+    fake = FakeSheetsValues(_sheet_rows(df))
+    changed = df.copy()
+    changed.loc[3, 'price'] = 1
+    changed.loc[4, 'price'] = 2
+    changed.loc[8, 'rating'] = 1.0
+
+    sink = SheetsSink("credentials.json", "spreadsheet_id", service=fake)
+    assert sink.write(changed) == 3
+
+    ranges = [entry['range'] for entry in fake.calls[0][1]['data']]
+    assert ranges == ['Sheet1!B5:B6', 'Sheet1!C10:C10']
+    assert fake.get('x', 'y').execute()['values'] == _sheet_rows(changed)
+
+def test_sheets_sink_sends_only_changed_timestamps():
+    df = pd.concat([TEST_DF] * 5, ignore_index=True)
+    fake = FakeSheetsValues(_sheet_rows(df))
+    rescraped = df.assign(timestamp='2023-02-01')
+
+    sink = SheetsSink("credentials.json", "spreadsheet_id", service=fake)
+    assert sink.write(rescraped) == 10
+
+    [(_, body)] = fake.calls
+    assert [entry['range'] for entry in body['data']] == ['Sheet1!G2:G11']
+    assert body['data'][0]['values'] == [['2023-02-01']] * 10
+    assert fake.get('x', 'y').execute()['values'] == _sheet_rows(rescraped)
+
+def test_sheets_sink_unchanged_sheet_sends_nothing():
+    fake = FakeSheetsValues(_sheet_rows(TEST_DF))
+    sink = SheetsSink("credentials.json", "spreadsheet_id", service=fake)
+    assert sink.write(TEST_DF) == 0
+    assert fake.calls == []
+
+def test_sheets_sink_batches_are_bounded():
+    df = pd.concat([TEST_DF] * 10, ignore_index=True)
+    fake = FakeSheetsValues()
+
+    sink = SheetsSink("credentials.json", "spreadsheet_id", batch_rows=4, service=fake)
+    sink.write(df)
+
+    sizes = [sum(len(e['values']) for e in body['data']) for _, body in fake.calls]
+    assert sizes == [4, 4, 4, 4, 4, 1]
+    assert fake.get('x', 'y').execute()['values'] == _sheet_rows(df)
+
+def test_sheets_sink_clears_leftover_rows():
+    fake = FakeSheetsValues(_sheet_rows(pd.concat([TEST_DF] * 3, ignore_index=True)))
+
+    SheetsSink("credentials.json", "spreadsheet_id", service=fake).write(TEST_DF)
+
+    assert fake.calls[-1] == ('batchClear', {'ranges': ['Sheet1!A4:G7']})
+    assert fake.get('x', 'y').execute()['values'] == _sheet_rows(TEST_DF)
+
+DB_CONFIG = {
+    'dbname': 'test_db',
+    'user': 'test_user',
+    'password': 'test_pass',
+    'host': 'localhost',
+    'port': '5432'
+}
+
+def _pooled_cursor(mock_connect):
+    """Cursor yielded by `with conn.cursor()` on the (single) pooled mock connection."""
+    mock_conn = mock_connect.return_value
+    mock_conn.closed = 0
+    mock_conn.info.transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    cursor = mock_conn.cursor.return_value.__enter__.return_value
+    cursor.rowcount = 0
+    cursor.connection = mock_conn
+    return mock_conn, cursor
+
+def _statements(cursor):
+    return [c.args[0] for c in cursor.execute.call_args_list]
+
+# ------------------------ Test PostgresSink.create_database ------------------------ #
 @patch('psycopg2.connect')
 def test_create_database_success(mock_connect):
     mock_conn = MagicMock()
@@ -66,7 +229,8 @@ def test_create_database_success(mock_connect):
     mock_connect.return_value = mock_conn
     mock_conn.cursor.return_value = mock_cursor
 
-    create_database('new_db', 'user', 'password')
+    PostgresSink({'dbname': 'new_db', 'user': 'user', 'password': 'password',
+                  'host': 'localhost', 'port': 5432}).create_database()
 
     mock_connect.assert_called_once_with(
         dbname='postgres',
@@ -87,90 +251,351 @@ def test_create_database_duplicate(mock_connect):
     mock_conn.cursor.return_value = mock_cursor
     mock_cursor.execute.side_effect = psycopg2_errors.DuplicateDatabase()
 
-    create_database('existing_db', 'user', 'password')
+    PostgresSink({'database': 'existing_db', 'user': 'user', 'password': 'password'}).create_database()
     mock_cursor.execute.assert_called_once_with("CREATE DATABASE existing_db;")
 
 @patch('psycopg2.connect', side_effect=OperationalError("Connection failed"))
 def test_create_database_failure(mock_connect):
-    create_database('new_db', 'user', 'password')
+    PostgresSink({'dbname': 'new_db', 'user': 'user', 'password': 'password'}).create_database()
     mock_connect.assert_called_once()
 
-# ------------------------ Test save_to_postgres_append ------------------------ #
+# ------------------------ Test PostgresSink pooling and caching ------------------------ #
 @patch('psycopg2.connect')
-def test_save_to_postgres_append_success(mock_connect):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_sink_reuses_pooled_connection(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
 
-    db_config = {
-        'dbname': 'test_db',
-        'user': 'test_user',
-        'password': 'test_pass',
-        'host': 'localhost',
-        'port': '5432'
-    }
-    save_to_postgres_append(TEST_DF, db_config)
-
-    mock_connect.assert_called_once_with(**db_config)
-    assert mock_cursor.execute.call_count >= 2
-    mock_conn.commit.assert_called()
-    mock_cursor.close.assert_called_once()
+    with PostgresSink(DB_CONFIG) as sink:
+        sink.append(TEST_DF)
+        sink.append(TEST_DF)
+        sink.overwrite(TEST_DF, "fashion_products")
+
+    mock_connect.assert_called_once_with(**DB_CONFIG)
+    assert mock_conn.commit.call_count == 3
     mock_conn.close.assert_called_once()
 
+@patch('psycopg2.connect')
+def test_sink_caches_schema(mock_connect):
+    _, cursor = _pooled_cursor(mock_connect)
+
+    sink = PostgresSink(DB_CONFIG)
+    sink.append(TEST_DF)
+    sink.append(TEST_DF)
+
+    creates = [sql for sql in _statements(cursor) if sql.startswith("CREATE TABLE IF NOT EXISTS products")]
+    assert len(creates) == 1
+    assert cursor.copy_expert.call_count == 2
+
+@patch('utils.load.execute_batch')
+@patch('psycopg2.connect')
+def test_sink_prepares_insert_once(mock_connect, mock_execute_batch):
+    _, cursor = _pooled_cursor(mock_connect)
+
+    sink = PostgresSink(DB_CONFIG)
+    assert sink.append(TEST_DF, use_copy=False) == 2
+    sink.append(TEST_DF, use_copy=False)
+
+    prepares = [sql for sql in _statements(cursor) if sql.startswith("PREPARE insert_products")]
+    assert len(prepares) == 1
+    assert mock_execute_batch.call_count == 2
+    sql, rows = mock_execute_batch.call_args.args[1:3]
+    assert sql.startswith("EXECUTE insert_products")
+    assert tuple(rows[0]) == ('Product A', 100000, 4.5, 2, 'M', 'Male', '2023-01-01')
+
+@patch('psycopg2.connect')
+def test_sink_failure_rolls_back_and_resets_cache(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+    cursor.copy_expert.side_effect = [Exception("COPY failed"), None]
+
+    sink = PostgresSink(DB_CONFIG)
+    assert sink.append(TEST_DF) is None
+    mock_conn.rollback.assert_called()
+    sink.append(TEST_DF)
+
+    creates = [sql for sql in _statements(cursor) if sql.startswith("CREATE TABLE IF NOT EXISTS products")]
+    assert len(creates) == 2
+    assert "DEALLOCATE ALL;" in _statements(cursor)
+
+def test_sink_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        PostgresSink(DB_CONFIG, mode="merge")
+
+# ------------------------ Test PostgresSink.append ------------------------ #
+@patch('psycopg2.connect')
+def test_sink_append_copies_in_chunks(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+    payloads = []
+    cursor.copy_expert.side_effect = lambda sql, buf: payloads.append((sql, buf.read()))
+
+    assert PostgresSink(DB_CONFIG, chunk_size=1).append(TEST_DF) == 2
+
+    assert len(payloads) == 2
+    sql, body = payloads[0]
+    assert sql.startswith("COPY products (title, price, rating, colors, size, gender, timestamp) FROM STDIN")
+    assert body == "Product A,100000,4.5,2,M,Male,2023-01-01\n"
+    mock_conn.commit.assert_called_once()
+
 @patch('psycopg2.connect', side_effect=OperationalError("Connection failed"))
-def test_save_to_postgres_append_failure(mock_connect):
-    db_config = {
-        'dbname': 'test_db',
-        'user': 'test_user',
-        'password': 'test_pass',
-        'host': 'localhost',
-        'port': '5432'
-    }
-    save_to_postgres_append(TEST_DF, db_config)
-    mock_connect.assert_called_once_with(**db_config)
-
-# ------------------------ Test save_to_postgres_overwrite ------------------------ #
-@patch('utils.load.execute_values')
-@patch('utils.load.psycopg2.connect')
-def test_save_to_postgres_overwrite_success(mock_connect, mock_execute):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_sink_append_failure(mock_connect):
+    assert PostgresSink(DB_CONFIG).append(TEST_DF) is None
+    mock_connect.assert_called_once_with(**DB_CONFIG)
 
-    db_config = {
-        'dbname': 'test_db',
-        'user': 'test_user',
-        'password': 'test_pass',
-        'host': 'localhost',
-        'port': '5432'
-    }
-    save_to_postgres_overwrite(TEST_DF, db_config)
-
-    mock_connect.assert_called_once_with(**db_config)
-    mock_cursor.execute.assert_any_call("DROP TABLE IF EXISTS fashion_products;")
-    mock_execute.assert_called_once()
-    mock_conn.commit.assert_called()
-    mock_cursor.close.assert_called_once()
+# ------------------------ Test PostgresSink.overwrite ------------------------ #
+@patch('psycopg2.connect')
+def test_sink_overwrite_swaps_staging_table(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+
+    PostgresSink(DB_CONFIG).overwrite(TEST_DF, "fashion_products")
+
+    statements = _statements(cursor)
+    assert "DROP TABLE IF EXISTS fashion_products;" not in statements
+    assert statements[-7:-3] == [
+        "ANALYZE fashion_products_staging;",
+        "ALTER TABLE IF EXISTS fashion_products RENAME TO fashion_products_old;",
+        "ALTER TABLE fashion_products_staging RENAME TO fashion_products;",
+        "DROP TABLE IF EXISTS fashion_products_old;",
+    ]
+    assert "ALTER INDEX fashion_products_staging_gender_size_idx RENAME TO fashion_products_gender_size_idx;" in statements
+    assert cursor.copy_expert.call_args.args[0].startswith("COPY fashion_products_staging ")
+    mock_conn.commit.assert_called_once()
+
+@patch('psycopg2.connect')
+def test_sink_overwrite_failure_keeps_live_table(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+    cursor.copy_expert.side_effect = Exception("Insert error")
+
+    PostgresSink(DB_CONFIG).overwrite(TEST_DF, "fashion_products")
+
+    assert not any("RENAME" in sql for sql in _statements(cursor))
+    mock_conn.commit.assert_called_once()  # only the DEALLOCATE cleanup
+    mock_conn.rollback.assert_called_once()
+
+# ------------------------ Test PostgresSink.upsert ------------------------ #
+@patch('psycopg2.connect')
+def test_sink_upsert_success(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+    payloads = []
+    cursor.copy_expert.side_effect = lambda sql, buf: payloads.append((sql, buf.read()))
+
+    PostgresSink(DB_CONFIG).upsert(TEST_DF)
+
+    statements = _statements(cursor)
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS products_product_key_idx ON products (product_key);" in statements
+    assert not any(sql.startswith("DELETE") for sql in statements)
+    upsert = statements[-1]
+    assert "ON CONFLICT (product_key) DO UPDATE" in upsert
+    assert "IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.rating, EXCLUDED.colors)" in upsert
+
+    sql, body = payloads[0]
+    assert sql.startswith("COPY products_upsert (product_key, title, price")
+    key = hashlib.md5("Product A|M|Male".encode()).hexdigest()
+    assert body.splitlines()[0].startswith(f"{key},Product A,100000")
+    mock_conn.commit.assert_called_once()
+
+@patch('psycopg2.connect')
+def test_sink_upsert_backfills_legacy_table_once(mock_connect):
+    _, cursor = _pooled_cursor(mock_connect)
+    cursor.rowcount = 5
+
+    sink = PostgresSink(DB_CONFIG)
+    sink.upsert(TEST_DF)
+    sink.upsert(TEST_DF)
+
+    statements = _statements(cursor)
+    backfills = [sql for sql in statements if "md5(concat_ws('|', title, size, gender))" in sql]
+    assert len(backfills) == 1
+    assert any(sql.startswith("DELETE FROM products a USING products b") for sql in statements)
+
+@patch('psycopg2.connect')
+def test_sink_upsert_after_overwrite_restores_product_key(mock_connect):
+    _, cursor = _pooled_cursor(mock_connect)
+
+    sink = PostgresSink(DB_CONFIG)
+    sink.upsert(TEST_DF)
+    sink.overwrite(TEST_DF)
+    sink.upsert(TEST_DF)
+
+    statements = _statements(cursor)
+    add_key = "ALTER TABLE products ADD COLUMN IF NOT EXISTS product_key TEXT;"
+    assert statements.count(add_key) == 2
+    assert add_key in statements[statements.index("ALTER TABLE products_staging RENAME TO products;"):]
+
+@patch('psycopg2.connect')
+def test_sink_delete_by_product_key(mock_connect):
+    _, cursor = _pooled_cursor(mock_connect)
+    cursor.rowcount = 2
+
+    deleted = PostgresSink(DB_CONFIG).delete(["k1", "k2"])
+
+    assert deleted == 2
+    cursor.execute.assert_called_with("DELETE FROM products WHERE product_key = ANY(%s);", (["k1", "k2"],))
+
+@patch('psycopg2.connect')
+def test_sink_delete_nothing_skips_database(mock_connect):
+    assert PostgresSink(DB_CONFIG).delete([]) == 0
+    mock_connect.assert_not_called()
+
+# ------------------------ Test streaming chunk writers ------------------------ #
+def test_csv_chunk_writer_writes_header_once(tmp_path):
+    path = tmp_path / "stream.csv"
+    total = save_chunks([TEST_DF, TEST_DF.iloc[:1]], [CsvChunkWriter(str(path))])
+
+    assert total == 3
+    lines = path.read_text().splitlines()
+    assert lines[0] == ",".join(TEST_DF.columns)
+    assert len(lines) == 4
+
+@patch('psycopg2.connect')
+def test_postgres_sink_as_chunk_writer(mock_connect):
+    mock_conn, cursor = _pooled_cursor(mock_connect)
+    sink = PostgresSink(DB_CONFIG)
+    save_chunks([TEST_DF, TEST_DF], [sink])
+
+    mock_connect.assert_called_once_with(**DB_CONFIG)
+    assert cursor.copy_expert.call_count == 2
+    assert mock_conn.commit.call_count == 2
+    assert sink.rows == 4
     mock_conn.close.assert_called_once()
 
-@patch('utils.load.execute_values', side_effect=Exception("Insert error"))
-@patch('utils.load.psycopg2.connect')
-def test_save_to_postgres_overwrite_failure(mock_connect, mock_execute):
-    mock_conn = MagicMock()
-    mock_cursor = MagicMock()
-    mock_connect.return_value = mock_conn
-    mock_conn.cursor.return_value = mock_cursor
+def test_save_chunks_isolates_failing_writer(tmp_path):
+    broken = MagicMock()
+    broken.name = "Broken"
+    broken.write.side_effect = Exception("disk full")
+    csv_writer = CsvChunkWriter(str(tmp_path / "ok.csv"))
+
+    save_chunks([TEST_DF, TEST_DF], [broken, csv_writer])
+
+    broken.write.assert_called_once()
+    broken.close.assert_called_once()
+    assert csv_writer.rows == 4
+
+
+# ------------------------ Test run_sinks ------------------------ #
+class _SlowSink:
+    def __init__(self, name, delay, error=None):
+        self.name, self.delay, self.error = name, delay, error
+
+    def write(self, df):
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return len(df)
+
+def test_run_sinks_is_bounded_by_slowest_sink():
+    sinks = [_SlowSink("A", 0.2), _SlowSink("B", 0.2), _SlowSink("C", 0.2)]
+    start = time.perf_counter()
+    results = run_sinks(TEST_DF, sinks)
+    assert time.perf_counter() - start < 0.5
+    assert [r.name for r in results] == ["A", "B", "C"]
+    assert all(r.ok and r.rows == 2 and r.seconds >= 0.2 for r in results)
+
+def test_run_sinks_isolates_failures(tmp_path, capsys):
+    path = tmp_path / "products.csv"
+    results = run_sinks(TEST_DF, [_SlowSink("Broken", 0, RuntimeError("quota")), CsvChunkWriter(str(path))])
+
+    broken, csv_result = results
+    assert not broken.ok and isinstance(broken.error, RuntimeError)
+    assert csv_result.ok and csv_result.rows == 2
+    assert len(path.read_text().splitlines()) == 3
+    assert "❌ Broken" in capsys.readouterr().out
+
+# ------------------------ Test compressed CSV and ParquetSink ------------------------ #
+@patch('pandas.DataFrame.to_csv')
+def test_save_to_csv_compressed_chunked(mock_to_csv):
+    save_to_csv(TEST_DF, "test_output.csv.gz", compression="gzip", chunksize=1000)
+    mock_to_csv.assert_called_once_with("test_output.csv.gz", index=False, compression="gzip", chunksize=1000)
+
+def test_csv_chunk_writer_gzip_appends_members(tmp_path):
+    path = tmp_path / "stream.csv.gz"
+    save_chunks([TEST_DF, TEST_DF], [CsvChunkWriter(str(path), compression="gzip")])
+    assert len(pd.read_csv(path)) == 4
+
+TYPED_DF = pd.DataFrame({
+    'title': ['Product A', 'Product B', 'Product C'],
+    'price': pd.array([100000, 200000, 300000], dtype='int64'),
+    'rating': pd.array([4.5, 3.8, 4.0], dtype='float32'),
+    'colors': pd.array([2, 3, 1], dtype='int8'),
+    'size': pd.Categorical(['M', 'L', 'S']),
+    'gender': pd.Categorical(['men', 'women', 'men']),
+    'timestamp': pd.to_datetime(['2025-06-22T10:00:00', '2025-06-22T11:00:00', '2025-06-23T09:00:00']),
+})
+
+def test_parquet_sink_partitions_by_scrape_date(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = tmp_path / "products_parquet"
+    ParquetSink(str(root), row_group_size=1).write(TYPED_DF)
+
+    partitions = sorted(p.name for p in root.iterdir())
+    assert partitions == ['scrape_date=2025-06-22', 'scrape_date=2025-06-23']
+
+    import pyarrow.parquet as pq
+    files = list((root / 'scrape_date=2025-06-22').glob('*.parquet'))
+    metadata = pq.ParquetFile(files[0]).metadata
+    assert metadata.num_row_groups == 2
+    assert metadata.row_group(0).column(0).compression == 'ZSTD'
+
+    prices = pd.read_parquet(root, columns=['price'])
+    assert sorted(prices['price'].tolist()) == [100000, 200000, 300000]
+    roundtrip = pd.read_parquet(root).sort_values('title').reset_index(drop=True)
+    assert str(roundtrip['colors'].dtype) == 'int8'
+    assert str(roundtrip['rating'].dtype) == 'float32'
+
+def test_parquet_sink_replace_and_append(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = tmp_path / "products_parquet"
+    ParquetSink(str(root)).write(TYPED_DF)
+    ParquetSink(str(root)).write(TYPED_DF.iloc[:1])
+    assert len(pd.read_parquet(root)) == 2  # 22nd replaced, 23rd untouched
+
+    ParquetSink(str(root), existing="append").write(TYPED_DF.iloc[:1])
+    assert len(pd.read_parquet(root)) == 3
+
+def test_parquet_sink_replace_once_per_instance(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = tmp_path / "products_parquet"
+    ParquetSink(str(root)).write(TYPED_DF)
+
+    streaming = ParquetSink(str(root), existing="replace_once")
+    streaming.write(TYPED_DF.iloc[:1])
+    streaming.write(TYPED_DF.iloc[:1])
+    assert len(pd.read_parquet(root)) == 3  # 22nd: two chunks of this run; 23rd untouched
+
+    ParquetSink(str(root), existing="replace_once").write(TYPED_DF.iloc[:1])
+    assert len(pd.read_parquet(root)) == 2
+
+def test_parquet_sink_replace_keeps_new_file_if_cleanup_fails(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = tmp_path / "products_parquet"
+    ParquetSink(str(root)).write(TYPED_DF.iloc[:1])
+
+    with patch('utils.load.os.remove', side_effect=OSError("busy")):
+        with pytest.raises(OSError):
+            ParquetSink(str(root)).write(TYPED_DF.iloc[:1].assign(price=1))
+
+    assert 1 in pd.read_parquet(root)['price'].tolist()
+
+def test_sqlite_sink_overwrite_and_append(tmp_path):
+    path = str(tmp_path / "products.db")
+    SqliteSink(path).write(TYPED_DF)
+    SqliteSink(path).write(TYPED_DF.iloc[:1])
+    SqliteSink(path, mode="append").write(TYPED_DF)
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count(*) FROM products").fetchone()[0] == 4
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert indexes == {"products_gender_size_idx", "products_price_idx", "products_rating_idx"}
+
+def test_sqlite_sink_failed_overwrite_keeps_old_table(tmp_path):
+    path = str(tmp_path / "products.db")
+    SqliteSink(path).write(TYPED_DF)
+
+    broken = TYPED_DF.astype({"title": object})
+    broken.loc[1, "title"] = object()  # tidak bisa di-bind ke SQLite
+    with pytest.raises(sqlite3.Error):
+        SqliteSink(path).write(broken)
+
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT count(*) FROM products").fetchone()[0] == 3
 
-    db_config = {
-        'dbname': 'test_db',
-        'user': 'test_user',
-        'password': 'test_pass',
-        'host': 'localhost',
-        'port': '5432'
-    }
-    save_to_postgres_overwrite(TEST_DF, db_config)
-
-    mock_connect.assert_called_once_with(**db_config)
-    mock_execute.assert_called_once()
+def test_sqlite_sink_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        SqliteSink("products.db", mode="upsert")
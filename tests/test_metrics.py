@@ -0,0 +1,124 @@
+import json
+from unittest.mock import MagicMock, patch
+import pandas as pd
+from utils.metrics import RunMetrics, observe
+from utils.extract import fetching_content, parse_page
+from utils.transform import transform_fashion_data
+from utils.load import run_sinks
+
+PAGE = b"""<html><div class="collection-card"><div class="product-details">
+    <h3 class="product-title">T-shirt</h3>
+    <div class="price-container"><span class="price">$10.00</span></div>
+    <p>Rating: 4.5 / 5</p><p>3 Colors</p><p>Size: M</p><p>Gender: Men</p>
+</div></div></html>"""
+
+
+class TestRunMetrics:
+    def test_stage_accumulates_calls(self):
+        metrics = RunMetrics()
+        for _ in range(3):
+            with metrics.stage("work", rows_in=10) as stage:
+                stage.rows_out = 4
+                stage.bytes = 100
+
+        stats = metrics.stages["work"]
+        assert stats.calls == 3
+        assert (stats.rows_in, stats.rows_out, stats.bytes) == (30, 12, 300)
+        assert stats.wall_seconds >= 0 and stats.cpu_seconds >= 0
+
+    def test_observe_without_active_metrics_is_noop(self):
+        with observe("anything", rows_in=5) as stage:
+            stage.rows_out = 1
+        metrics = RunMetrics()
+        assert metrics.stages == {}
+
+    def test_activate_scopes_recording(self):
+        metrics = RunMetrics()
+        with metrics:
+            with observe("inside"):
+                pass
+        with observe("outside"):
+            pass
+
+        assert list(metrics.stages) == ["inside"]
+        assert metrics.wall_seconds > 0
+
+    def test_trace_memory_records_stage_peak(self):
+        with RunMetrics(trace_memory=True) as metrics:
+            with observe("alloc"):
+                blob = bytearray(5_000_000)
+                del blob
+
+        assert metrics.stages["alloc"].peak_memory_bytes >= 5_000_000
+
+    def test_pipeline_stages_are_instrumented(self):
+        client = MagicMock()
+        client.get_content.return_value = PAGE
+        sink = MagicMock()
+        sink.name = "fake"
+        sink.write.return_value = None
+
+        with RunMetrics() as metrics:
+            html = fetching_content("http://example.test/", client=client)
+            records, _ = parse_page(html)
+            df = transform_fashion_data(pd.DataFrame(records * 2))
+            with patch("builtins.print"):
+                run_sinks(df, [sink])
+
+        assert metrics.stages["fetch"].bytes == len(PAGE)
+        assert metrics.stages["parse"].rows_out == 1
+        assert (metrics.stages["transform"].rows_in, metrics.stages["transform"].rows_out) == (2, 2)
+        assert metrics.stages["load:fake"].rows_out == 2
+
+    def test_failed_fetch_still_counts_call(self):
+        import requests
+        client = MagicMock()
+        client.get_content.side_effect = requests.exceptions.ConnectionError("down")
+
+        with RunMetrics() as metrics, patch("builtins.print"):
+            assert fetching_content("http://example.test/", client=client) is None
+
+        assert metrics.stages["fetch"].calls == 1
+        assert metrics.stages["fetch"].bytes == 0
+
+
+class TestReports:
+    def _metrics(self):
+        metrics = RunMetrics()
+        with metrics:
+            with observe("load:csv", rows_in=7) as stage:
+                stage.rows_out = 7
+        return metrics
+
+    def test_write_json(self, tmp_path):
+        path = tmp_path / "run.json"
+        self._metrics().write_json(str(path))
+
+        report = json.loads(path.read_text())
+        assert report["stages"]["load:csv"]["rows_out"] == 7
+        assert {"wall_seconds", "cpu_seconds", "peak_memory_bytes"} <= report.keys()
+
+    def test_write_prometheus(self, tmp_path):
+        path = tmp_path / "etl.prom"
+        self._metrics().write_prometheus(str(path))
+
+        text = path.read_text()
+        assert "# TYPE etl_stage_rows_out gauge" in text
+        assert 'etl_stage_rows_out{stage="load:csv"} 7' in text
+        assert "etl_run_wall_seconds " in text
+
+    def test_summary_lists_stages(self):
+        summary = self._metrics().summary()
+        assert "load:csv" in summary
+        assert summary.splitlines()[-1].startswith("total:")
+
+    def test_profile_captures_hot_path(self, tmp_path):
+        def hot_path():
+            return sum(i * i for i in range(10_000))
+
+        with RunMetrics(profile=True) as metrics:
+            hot_path()
+
+        assert "hot_path" in metrics.profile_report()
+        metrics.write_profile(str(tmp_path / "run.prof"))
+        assert (tmp_path / "run.prof").stat().st_size > 0
@@ -0,0 +1,68 @@
+import pytest
+from utils.extract import parse_page
+
+pytest.importorskip('lxml')
+
+PAGE = """
+<html><head><meta charset="UTF-8"></head><body>
+<div class="collection-card featured">
+    <div class="product-details">
+        <h3 class="product-title">  Premium <b>Jacket</b> </h3>
+        <div class="price-container"><span class="price">$499.00</span></div>
+        <p>Rating: ⭐ 4.8 / 5</p>
+        <p>3 Colors</p>
+        <p>Size: xl</p>
+        <p>Gender: Men</p>
+    </div>
+</div>
+<div class="collection-card">
+    <div class="product-details">
+        <h3 class="product-title">Unknown Product</h3>
+        <div class="price-container"><span class="price-unavailable">Price Unavailable</span></div>
+        <p>Rating: ⭐ Invalid Rating / 5</p>
+        <p>Size:&nbsp;M</p>
+    </div>
+</div>
+<div class="collection-card"><img src="x.png"></div>
+<ul class="pagination"><li class="page-item next"><a href="/page2">Next</a></li></ul>
+</body></html>
+"""
+
+
+def _without_timestamp(records):
+    return [{k: v for k, v in r.items() if k != 'timestamp'} for r in records]
+
+
+def test_lxml_matches_reference():
+    reference, ref_next = parse_page(PAGE.encode('utf-8'))
+    fast, fast_next = parse_page(PAGE.encode('utf-8'), parser='lxml')
+
+    assert _without_timestamp(fast) == _without_timestamp(reference)
+    assert fast_next is ref_next is True
+    assert fast[0]['title'] == 'Premium Jacket'
+    assert fast[0]['rating'] == '⭐ 4.8 / 5'
+    assert fast[1]['price'] is None
+    assert fast[2] == {}
+    assert all(isinstance(r['timestamp'], str) for r in fast[:2])
+
+
+def test_lxml_last_page_and_empty_document():
+    records, has_next = parse_page(b'<html><div class="collection-card"></div></html>', parser='lxml')
+    assert records == [{}]
+    assert has_next is False
+    assert parse_page(b'', parser='lxml') == ([], False)
+
+
+def test_unknown_parser():
+    with pytest.raises(ValueError):
+        parse_page(b'<html></html>', parser='regex')
+
+
+@pytest.mark.parametrize("parser", ["html.parser", "lxml"])
+def test_typed_records(parser):
+    records, _ = parse_page(PAGE.encode('utf-8'), parser=parser, typed=True)
+
+    assert _without_timestamp(records[:2]) == [
+        {"title": "Premium Jacket", "price": 499.0, "rating": 4.8, "colors": 3, "size": "XL", "gender": "men"},
+        {"title": "Unknown Product", "price": None, "rating": None, "colors": None, "size": "M", "gender": None},
+    ]
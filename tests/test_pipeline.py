@@ -0,0 +1,238 @@
+import json
+from unittest.mock import patch
+import pandas as pd
+import pytest
+from benchmarks.fake_server import FakeCatalogServer
+from utils.extract import fetching_content, set_default_client
+from utils.pipeline import DEFAULT_CONFIG, build_sinks, load_config, main, parse_args, run_pipeline
+
+
+@pytest.fixture
+def catalog():
+    with FakeCatalogServer(pages=3, per_page=10) as server:
+        yield server
+    set_default_client(None)
+
+
+def _config(tmp_path, base_url, **overrides):
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    options = {
+        "base_url": base_url,
+        "sinks": ["csv", "parquet"],
+        "csv": {"filename": str(tmp_path / "products.csv")},
+        "parquet": {"root": str(tmp_path / "parquet")},
+        "extract": {"delay": 0, "http_cache": None, "checkpoint": str(tmp_path / "ckpt")},
+        "metrics": {"json": None},
+    }
+    options.update(overrides)
+    return load_config(overrides=options)
+
+
+class TestConfig:
+    def test_file_and_overrides_are_merged(self, tmp_path):
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps({"extract": {"max_workers": 4}, "postgres": {"mode": "upsert"}}))
+
+        config = load_config(str(path), {"extract": {"parser": "lxml"}})
+
+        assert config["extract"]["max_workers"] == 4
+        assert config["extract"]["parser"] == "lxml"
+        assert config["extract"]["delay"] == DEFAULT_CONFIG["extract"]["delay"]
+        assert config["postgres"]["mode"] == "upsert"
+        assert DEFAULT_CONFIG["extract"]["max_workers"] == 1
+
+    def test_unknown_stage_or_sink_rejected(self):
+        with pytest.raises(ValueError):
+            load_config(overrides={"stages": ["scrape"]})
+        with pytest.raises(ValueError):
+            load_config(overrides={"sinks": ["excel"]})
+
+    def test_cli_flags_become_overrides(self):
+        args = parse_args(["--stages", "extract", "transform", "--workers", "8", "--no-resume", "--typed-fields",
+                           "--discover-pages", "--postgres-mode", "upsert", "--queue", "q.db"])
+
+        assert args["config"] is None
+        assert args["overrides"] == {
+            "stages": ["extract", "transform"],
+            "extract": {"max_workers": 8, "resume": False, "typed_fields": True, "discover_pages": True},
+            "postgres": {"mode": "upsert"},
+            "queue": {"path": "q.db"},
+        }
+
+    def test_streaming_rejects_non_appending_sinks(self):
+        with pytest.raises(ValueError):
+            build_sinks(load_config(overrides={"sinks": ["sheets"], "sheets": {"spreadsheet_id": "sheet"}}),
+                        streaming=True)
+        with pytest.raises(ValueError):
+            build_sinks(load_config(overrides={"sinks": ["postgres"], "postgres": {"create_database": False}}),
+                        streaming=True)
+        with pytest.raises(ValueError):
+            build_sinks(load_config(overrides={"sinks": ["sqlite"]}), streaming=True)
+        assert build_sinks(load_config(overrides={"sinks": ["sqlite"], "sqlite": {"mode": "append"}}),
+                           streaming=True)[0].mode == "append"
+
+    def test_main_reports_invalid_config(self, capsys):
+        assert main(["--config", "does-not-exist.json"]) == 2
+        assert "Konfigurasi tidak valid" in capsys.readouterr().out
+
+    def test_defaults_use_local_sinks_only(self):
+        assert load_config()["sinks"] == ["csv", "parquet"]
+        with pytest.raises(ValueError, match="spreadsheet_id"):
+            load_config(overrides={"sinks": ["csv", "sheets"]})
+
+    @pytest.mark.parametrize("flags", [["--chunk-size", "500", "--sinks", "sqlite"], ["--async", "--sinks", "sqlite"],
+                                       ["--cdc-state", "x.db", "--sinks", "sqlite"],
+                                       ["--cdc-state", "x.db", "--sinks", "postgres"],
+                                       ["--async", "--sinks", "postgres", "--postgres-mode", "upsert"]])
+    def test_main_rejects_sinks_unsupported_by_mode(self, flags, capsys):
+        assert main(flags) == 2
+        assert "Konfigurasi tidak valid" in capsys.readouterr().out
+
+    def test_mode_checks_skip_partial_stage_runs(self):
+        assert load_config(overrides={"chunk_size": 500, "stages": ["extract"]})["sinks"] == DEFAULT_CONFIG["sinks"]
+
+
+class TestRunPipeline:
+    def test_full_run_returns_stats(self, tmp_path, catalog, capsys):
+        stats = run_pipeline(_config(tmp_path, catalog.base_url))
+
+        assert stats["rows_extracted"] == 30
+        assert 0 < stats["rows_transformed"] <= 30
+        assert stats["sinks"]["CSV"]["ok"] and stats["sinks"]["Parquet"]["ok"]
+        assert len(pd.read_csv(tmp_path / "products.csv")) == stats["rows_transformed"]
+        assert {"fetch", "parse", "transform"} <= stats["metrics"]["stages"].keys()
+        assert "5 Produk Teratas" not in capsys.readouterr().out
+
+    def test_stages_hand_off_through_files(self, tmp_path, catalog):
+        raw, clean = str(tmp_path / "raw.csv"), str(tmp_path / "clean.csv")
+        extracted = run_pipeline(_config(tmp_path, catalog.base_url, stages=["extract"], raw_path=raw))
+        transformed = run_pipeline(_config(tmp_path, catalog.base_url, stages=["transform"],
+                                           raw_path=raw, clean_path=clean))
+        loaded = run_pipeline(_config(tmp_path, catalog.base_url, stages=["load"], clean_path=clean))
+
+        assert extracted["rows_extracted"] == 30
+        assert transformed["rows_extracted"] is None
+        assert loaded["sinks"]["CSV"]["rows"] == transformed["rows_transformed"]
+        assert pd.read_parquet(tmp_path / "parquet")["price"].dtype == "int64"
+
+    def test_typed_fields_match_raw_fields(self, tmp_path, catalog, capsys):
+        raw = run_pipeline(_config(tmp_path / "raw", catalog.base_url))
+        typed = run_pipeline(_config(tmp_path / "typed", catalog.base_url, extract={
+            "delay": 0, "http_cache": None, "checkpoint": str(tmp_path / "typed" / "ckpt"), "typed_fields": True,
+        }))
+
+        assert typed["rows_transformed"] == raw["rows_transformed"]
+        assert pd.read_csv(tmp_path / "typed" / "products.csv").drop(columns="timestamp").equals(
+            pd.read_csv(tmp_path / "raw" / "products.csv").drop(columns="timestamp"))
+        assert typed["field_cache"]["paragraph_typed"]["hit_rate"] > 0.5
+        assert "Hit rate cache parser field" in capsys.readouterr().out
+
+    def test_discovered_pages_match_pagination(self, tmp_path, catalog, capsys):
+        extract = {"delay": 0, "http_cache": None, "checkpoint": None, "max_workers": 4}
+        followed = run_pipeline(_config(tmp_path / "followed", catalog.base_url, extract=extract))
+        discovered = run_pipeline(_config(tmp_path / "discovered", catalog.base_url,
+                                          extract=dict(extract, discover_pages=True)))
+
+        assert discovered["rows_extracted"] == followed["rows_extracted"] == 30
+        assert "Ditemukan 3 halaman" in capsys.readouterr().out
+
+    def test_queue_mode_matches_batch(self, tmp_path, catalog, capsys):
+        batch = run_pipeline(_config(tmp_path / "batch", catalog.base_url))
+        queue = {"path": str(tmp_path / "queue" / "queue.db"), "shards": str(tmp_path / "queue" / "shards"),
+                 "workers": 2}
+        queued = run_pipeline(_config(tmp_path / "queue", catalog.base_url, queue=queue))
+
+        assert queued["rows_extracted"] == batch["rows_extracted"]
+        columns = ["title", "price", "size"]
+        assert pd.read_csv(tmp_path / "queue" / "products.csv")[columns].equals(
+            pd.read_csv(tmp_path / "batch" / "products.csv")[columns])
+        assert "3 halaman dimasukkan ke antrean" in capsys.readouterr().out
+        assert not (tmp_path / "queue" / "shards").exists()
+
+    def test_queue_mode_follows_pages_past_discovery(self, tmp_path, catalog, capsys):
+        queue = {"path": str(tmp_path / "queue.db"), "shards": str(tmp_path / "shards"), "workers": 1}
+        with patch("utils.pipeline.discover_pages", return_value=[catalog.base_url]):
+            stats = run_pipeline(_config(tmp_path, catalog.base_url, queue=queue))
+
+        assert stats["rows_extracted"] == 30
+        assert "halaman 3 ditambahkan ke antrean" in capsys.readouterr().out
+
+    def test_streaming_matches_batch(self, tmp_path, catalog):
+        batch = run_pipeline(_config(tmp_path / "batch", catalog.base_url))
+        streaming = run_pipeline(_config(tmp_path / "stream", catalog.base_url, chunk_size=7))
+
+        assert streaming["rows_transformed"] == batch["rows_transformed"]
+        assert streaming["sinks"]["CSV"]["ok"]
+        columns = ["title", "price", "size"]
+        assert pd.read_csv(tmp_path / "stream" / "products.csv")[columns].equals(
+            pd.read_csv(tmp_path / "batch" / "products.csv")[columns])
+
+    def test_streaming_rerun_does_not_duplicate_parquet(self, tmp_path, catalog):
+        for _ in range(2):
+            stats = run_pipeline(_config(tmp_path, catalog.base_url, chunk_size=7))
+
+        assert len(pd.read_parquet(tmp_path / "parquet")) == stats["rows_transformed"]
+
+    def test_preview_prints_head_and_tail(self, tmp_path, catalog, capsys):
+        run_pipeline(_config(tmp_path, catalog.base_url, preview=True, sinks=[]))
+        out = capsys.readouterr().out
+        assert "5 Produk Teratas" in out and "5 Data Terakhir Setelah Transformasi" in out
+
+    def test_async_engine_matches_batch(self, tmp_path, catalog):
+        pytest.importorskip("aiohttp")
+        batch = run_pipeline(_config(tmp_path / "batch", catalog.base_url))
+        asynchronous = run_pipeline(_config(tmp_path / "async", catalog.base_url, **{"async": True, "chunk_size": 8}))
+
+        assert asynchronous["rows_extracted"] == batch["rows_extracted"]
+        assert asynchronous["rows_transformed"] == batch["rows_transformed"]
+        assert asynchronous["sinks"]["CSV"]["ok"]
+
+    def test_cdc_loads_only_changes(self, tmp_path, catalog):
+        state = str(tmp_path / "cdc.db")
+        first = run_pipeline(_config(tmp_path / "first", catalog.base_url, cdc={"state": state}))
+        second = run_pipeline(_config(tmp_path / "second", catalog.base_url, cdc={"state": state}))
+
+        assert first["changes"]["inserts"] > 0
+        assert second["changes"] == {"inserts": 0, "updates": 0, "deletes": 0}
+        assert second["sinks"]["CSV"]["rows"] == first["rows_transformed"]
+
+    def test_cdc_skips_deletes_when_crawl_stops_early(self, tmp_path, catalog, capsys):
+        state = str(tmp_path / "cdc.db")
+        run_pipeline(_config(tmp_path / "first", catalog.base_url, cdc={"state": state}))
+
+        last_page = catalog.base_url + "page3"
+        with patch("utils.extract.fetching_content",
+                   side_effect=lambda url: None if url == last_page else fetching_content(url)):
+            partial = run_pipeline(_config(tmp_path / "partial", catalog.base_url, cdc={"state": state}))
+
+        assert 0 < partial["rows_extracted"] < 30
+        assert partial["changes"]["deletes"] == 0
+        assert "tidak sampai halaman terakhir" in capsys.readouterr().out
+
+    def test_cdc_keeps_full_csv_and_parquet_snapshots(self, tmp_path):
+        state, clean = str(tmp_path / "cdc.db"), str(tmp_path / "clean.csv")
+        snapshot = pd.DataFrame({
+            "title": ["A", "B", "C"], "price": [100000, 200000, 300000], "rating": [4.5, 4.0, 3.5],
+            "colors": [3, 3, 3], "size": ["M", "M", "M"], "gender": ["men", "men", "men"],
+            "timestamp": ["2025-06-22T10:00:00"] * 3,
+        })
+        options = {"stages": ["load"], "clean_path": clean, "sinks": ["csv", "parquet"], "cdc": {"state": state}}
+
+        snapshot.to_csv(clean, index=False)
+        run_pipeline(_config(tmp_path, "http://unused/", **options))
+        snapshot.assign(price=[100000, 250000, 300000]).to_csv(clean, index=False)
+        second = run_pipeline(_config(tmp_path, "http://unused/", **options))
+
+        assert second["changes"] == {"inserts": 0, "updates": 1, "deletes": 0}
+        written = pd.read_csv(tmp_path / "products.csv")
+        assert written["title"].tolist() == ["A", "B", "C"]
+        assert written["price"].tolist() == [100000, 250000, 300000]
+        parquet = pd.read_parquet(tmp_path / "parquet").sort_values("title")
+        assert parquet["price"].tolist() == [100000, 250000, 300000]
+
+    def test_cdc_rejects_snapshot_sinks(self):
+        with pytest.raises(ValueError):
+            load_config(overrides={"cdc": {"state": "x.db"}, "chunk_size": 100})
+        with pytest.raises(ValueError):
+            build_sinks(load_config(overrides={"sinks": ["postgres"], "postgres": {"create_database": False}}),
+                        incremental=True)
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from utils.load import SqliteSink
+from utils.store import ProductStore
+from utils.transform import apply_output_schema
+
+PRODUCTS = apply_output_schema(pd.DataFrame(
+    [{"title": f"Item {i}", "price": 100000 + 10000 * i, "rating": 3.0 + (i % 5) * 0.4, "colors": 1 + i % 3,
+      "size": ["S", "M", "L"][i % 3], "gender": ["men", "women"][i % 2],
+      "timestamp": f"2025-06-{20 + i % 5}T10:00:00"} for i in range(60)]
+))
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "products.db")
+    SqliteSink(path).write(PRODUCTS)
+    with ProductStore(path) as store:
+        yield store
+
+
+class TestProductStore:
+    def test_find_filters_and_orders(self, store):
+        result = store.find(gender="women", size=["M", "L"], max_price=400000, order_by="-price", limit=3)
+
+        expected = PRODUCTS[(PRODUCTS["gender"] == "women") & PRODUCTS["size"].isin(["M", "L"])
+                            & (PRODUCTS["price"] <= 400000)].sort_values("price", ascending=False).head(3)
+        assert result["title"].tolist() == expected["title"].tolist()
+        assert result.dtypes.astype(str).tolist() == PRODUCTS.dtypes.astype(str).tolist()
+
+    def test_count_and_since(self, store):
+        assert store.count() == 60
+        assert store.count(min_rating=4.5) == (PRODUCTS["rating"] >= 4.5).sum()
+        assert store.count(since=pd.Timestamp("2025-06-24")) == 12
+
+    def test_rating_and_since_boundaries(self, store):
+        rated = (PRODUCTS["rating"].astype(str) == "4.6").sum()
+        assert rated > 0
+        assert store.count(min_rating=4.6, max_rating=4.6) == rated
+        assert store.count(since="2025-06-24T00:00:00") == store.count(since=pd.Timestamp("2025-06-24")) == 12
+        assert store.count(since="2025-06-24T10:00:00.000001") == 0
+
+    def test_aggregate_by_gender(self, store):
+        result = store.aggregate(by="gender", metrics=["count", "avg_price", "max_price"])
+
+        expected = PRODUCTS.groupby("gender", observed=True)["price"].agg(["count", "mean", "max"])
+        assert result["gender"].tolist() == ["men", "women"]
+        assert result["count"].tolist() == expected["count"].tolist()
+        assert result["avg_price"].tolist() == pytest.approx(expected["mean"].tolist())
+        assert result["max_price"].tolist() == expected["max"].tolist()
+
+    def test_filters_use_indexes(self, store):
+        assert "products_gender_size_idx" in store.query_plan(gender="men", size="M")
+        assert "products_price_idx" in store.query_plan(min_price=500000)
+
+    def test_rejects_unknown_names(self, store):
+        with pytest.raises(ValueError):
+            store.find(brand="x")
+        with pytest.raises(ValueError):
+            store.find(order_by="price; DROP TABLE products")
+        with pytest.raises(ValueError):
+            store.aggregate(metrics=["median_price"])
+
+    def test_is_read_only(self, store):
+        with pytest.raises(Exception):
+            store.conn.execute("DELETE FROM products")
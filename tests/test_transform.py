@@ -1,7 +1,14 @@
+import hashlib
 import pytest
 import pandas as pd
 from pandas.testing import assert_frame_equal
-from utils.transform import transform_fashion_data
+from utils.transform import (
+    transform_fashion_data,
+    transform_fashion_data_chunks,
+    apply_output_schema,
+    product_keys,
+    OUTPUT_SCHEMA
+)
 
 class TestTransformFashionData:
     def test_valid_data_transformation(self):
@@ -18,17 +25,17 @@ class TestTransformFashionData:
         
         expected = pd.DataFrame([{
             "title": "Cool Shirt",
-            "price": 100.0 * 16000.0,  
+            "price": 100 * 16000,
             "rating": 4.5,
-            "colors": 3.0,
+            "colors": 3,
             "size": "M",
             "gender": "male",
-            "timestamp": "2025-06-22T10:00:00"
+            "timestamp": pd.Timestamp("2025-06-22T10:00:00")
         }])
 
 
         result = transform_fashion_data(raw_data)
-        assert_frame_equal(result, expected, check_dtype=False)
+        assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
 
     def test_invalid_titles_and_prices_are_dropped(self):
         """Test removal of rows with invalid titles or prices"""
@@ -74,3 +81,104 @@ class TestTransformFashionData:
         raw_data = pd.DataFrame()
         result = transform_fashion_data(raw_data)
         assert result.empty
+
+class TestTransformFashionDataChunks:
+    def test_chunks_are_transformed_and_empty_ones_skipped(self):
+        """Test chunked transform accepts lists of dicts and drops empty results"""
+        valid = {"title": "Cool Shirt", "price": "$10.00", "rating": "⭐ 4.5 / 5", "colors": "3 Colors",
+                 "size": "M", "gender": "Men", "timestamp": "2025-06-22T10:00:00"}
+        invalid = dict(valid, title="Unknown Product")
+
+        chunks = list(transform_fashion_data_chunks([[valid, valid], [invalid], pd.DataFrame([valid])]))
+        assert [len(c) for c in chunks] == [2, 1]
+        assert chunks[0]['price'].tolist() == [160000.0, 160000.0]
+
+    def test_is_lazy(self):
+        """Test chunks are pulled one at a time"""
+        def source():
+            yield [{"title": "A", "price": "$1", "rating": "4/5", "colors": "1 Colors",
+                    "size": "S", "gender": "men", "timestamp": "2025-06-22T10:00:00"}]
+            raise AssertionError("second chunk should not be requested yet")
+
+        stream = transform_fashion_data_chunks(source())
+        assert len(next(stream)) == 1
+
+class TestTransformParity:
+    def test_matches_legacy_multi_pass_output(self):
+        """Test the single-pass transform matches the original multi-pass version (after typing)"""
+        from benchmarks.catalog import raw_records
+        from benchmarks.legacy_transform import transform_fashion_data as legacy
+
+        raw = pd.DataFrame(raw_records(3000, seed=7) + [
+            {"title": None, "price": "$5", "rating": "4/5", "colors": "2 Colors", "size": "m", "gender": None, "timestamp": "2025-06-22T10:00:00"},
+            {"title": "Cap", "price": "$5", "rating": "Not Rated", "colors": "x", "size": "nan", "gender": "Men", "timestamp": "2025-06-22T10:00:00"},
+            {"title": "Hat", "price": "$abc", "rating": None, "colors": "1 Colors", "size": " xl ", "gender": " Women ", "timestamp": "2025-06-22T10:00:00"},
+        ])
+        raw.index = [i % 100 for i in range(len(raw))]
+
+        expected = apply_output_schema(legacy(raw))
+        result = transform_fashion_data(raw)
+        assert_frame_equal(result, expected)
+        assert result.to_csv(index=False) == expected.to_csv(index=False)
+
+    def test_typed_records_match_string_records(self):
+        """Test records typed at extract time (utils.fields) give the same output without the regex passes"""
+        from benchmarks.catalog import raw_records
+        from utils.fields import parse_colors, parse_price, parse_rating
+
+        raw = pd.DataFrame(raw_records(2000, seed=3))
+        typed = raw.assign(
+            price=[parse_price(v) for v in raw['price']],
+            rating=[None if v is None else parse_rating(v) for v in raw['rating']],
+            colors=[None if v is None else parse_colors(v) for v in raw['colors']],
+        )
+
+        assert_frame_equal(transform_fashion_data(typed), transform_fashion_data(raw))
+
+
+class TestOutputSchema:
+    RAW = pd.DataFrame([
+        {"title": "Shirt", "price": "$102.15", "rating": "⭐ 4.8 / 5", "colors": "3 Colors",
+         "size": "m", "gender": "Women", "timestamp": "2025-06-22T17:23:17.910986"},
+        {"title": "Pants", "price": "$20.00", "rating": "⭐ 3.9 / 5", "colors": "300 Colors",
+         "size": "L", "gender": "Men", "timestamp": "2025-06-22T17:23:17.910986"},
+        {"title": "Hat", "price": "$20.00", "rating": "⭐ 3.9 / 5", "colors": "2 Colors",
+         "size": "L", "gender": "Men", "timestamp": "not a date"},
+    ])
+
+    def test_dtypes(self):
+        """Test the transform emits the typed output schema directly"""
+        result = transform_fashion_data(self.RAW)
+        assert {col: str(result[col].dtype) for col in OUTPUT_SCHEMA} == OUTPUT_SCHEMA
+        assert result['price'].tolist() == [1634400]
+        assert result['rating'].iloc[0] == pytest.approx(4.8)
+        assert result['timestamp'].iloc[0] == pd.Timestamp("2025-06-22T17:23:17.910986")
+
+    def test_out_of_range_colors_and_bad_timestamps_are_dropped(self):
+        """Test rows that cannot fit the schema are removed like other invalid rows"""
+        result = transform_fashion_data(self.RAW)
+        assert result['title'].tolist() == ['Shirt']
+
+    def test_typed_frame_is_smaller(self):
+        """Test the typed schema uses less memory than the legacy string/float64 frame"""
+        from benchmarks.catalog import raw_records
+        from benchmarks.legacy_transform import transform_fashion_data as legacy
+
+        raw = pd.DataFrame(raw_records(2000))
+        legacy_bytes = legacy(raw).drop(columns='title').memory_usage(deep=True).sum()
+        typed_bytes = transform_fashion_data(raw).drop(columns='title').memory_usage(deep=True).sum()
+        assert typed_bytes < legacy_bytes / 3
+
+class TestProductKeys:
+    def test_stable_key_from_identity_columns(self):
+        """Test product keys depend only on title, size and gender"""
+        df = pd.DataFrame({"title": ["Shirt", "Shirt", "Shirt"], "size": ["M", "M", "L"],
+                           "gender": ["men", "men", "men"], "price": [1, 2, 1]})
+        keys = product_keys(df)
+        assert keys.iloc[0] == keys.iloc[1] != keys.iloc[2]
+        assert keys.iloc[0] == hashlib.md5(b"Shirt|M|men").hexdigest()
+
+    def test_categorical_columns(self):
+        """Test categorical size/gender hash the same as plain strings"""
+        df = pd.DataFrame({"title": ["Shirt"], "size": pd.Categorical(["M"]), "gender": pd.Categorical(["men"])})
+        assert product_keys(df).iloc[0] == hashlib.md5(b"Shirt|M|men").hexdigest()
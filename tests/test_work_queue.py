@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest.mock import patch
+import pytest
+from benchmarks.fake_server import FakeCatalogServer
+from utils.extract import fetching_content, page_url, set_default_client
+from utils.transform import transform_fashion_data
+from utils.work_queue import CrawlQueue, iter_shards, merge_shards, next_unqueued_page, run_worker, run_workers
+
+BASE_URL = "https://example.com/"
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = CrawlQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    queue.enqueue([page_url(BASE_URL, page) for page in range(1, 6)])
+    return queue
+
+
+@pytest.fixture
+def catalog():
+    with FakeCatalogServer(pages=12, per_page=5) as server:
+        yield server
+    set_default_client(None)
+
+
+class TestCrawlQueue:
+    def test_leases_are_exclusive_and_ordered(self, queue):
+        first = queue.lease("a", limit=2)
+        second = queue.lease("b", limit=2)
+
+        assert [task.page for task in first] == [1, 2]
+        assert [task.page for task in second] == [3, 4]
+        assert queue.counts() == {"pending": 1, "leased": 4, "done": 0, "failed": 0}
+
+    def test_enqueue_is_idempotent(self, queue):
+        queue.enqueue([page_url(BASE_URL, page) for page in range(1, 6)])
+        assert len(queue) == 5
+
+    def test_expired_lease_moves_to_another_worker(self, queue):
+        queue.lease_seconds = 0.01
+        [abandoned] = queue.lease("crashed")
+        time.sleep(0.02)
+
+        [retried] = queue.lease("b")
+        assert (retried.page, retried.attempts) == (abandoned.page, 2)
+        assert not queue.complete(abandoned.page, "crashed")
+        assert queue.complete(retried.page, "b")
+
+    def test_attempts_are_bounded(self, queue):
+        for _ in range(2):
+            [task] = queue.lease("a")
+            queue.fail(task.page, "a", "boom")
+
+        assert queue.counts()["failed"] == 1
+        assert queue.requeue_failed() == 1
+        assert queue.counts()["failed"] == 0
+
+    def test_renew_keeps_lease(self, queue):
+        queue.lease_seconds = 0.05
+        [task] = queue.lease("a")
+        time.sleep(0.03)
+        assert queue.renew(task.page, "a")
+        time.sleep(0.03)
+        assert queue.lease("b")[0].page != task.page
+
+
+class TestWorkers:
+    def test_threads_share_the_work_and_merge_in_order(self, tmp_path, catalog):
+        queue = CrawlQueue(str(tmp_path / "queue.db"))
+        queue.enqueue([page_url(catalog.base_url, page) for page in range(1, 13)])
+        shards = str(tmp_path / "shards")
+
+        done = []
+        threads = [threading.Thread(target=lambda: done.append(run_worker(queue, shards, poll_interval=0.01)))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(done) == 12
+        assert queue.finished() and queue.counts()["done"] == 12
+        merged = merge_shards(queue, shards)
+        assert len(merged) == 60
+        assert merged["title"].str.extract(r"(\d+)$")[0].astype(int).is_monotonic_increasing
+        assert 0 < len(transform_fashion_data(merged)) <= 60
+
+    def test_failed_fetch_is_retried_then_marked_failed(self, tmp_path):
+        queue = CrawlQueue(str(tmp_path / "queue.db"), max_attempts=2)
+        queue.enqueue([page_url(BASE_URL, 1)])
+
+        with patch("utils.work_queue.fetching_content", return_value=None) as fetch:
+            assert run_worker(queue, str(tmp_path / "shards"), poll_interval=0.01) == 0
+
+        assert fetch.call_count == 2
+        assert queue.counts()["failed"] == 1
+        assert list(iter_shards(queue, str(tmp_path / "shards"))) == []
+
+    def test_worker_renews_lease_while_page_is_slow(self, tmp_path, catalog):
+        queue = CrawlQueue(str(tmp_path / "queue.db"), lease_seconds=0.2)
+        queue.enqueue([page_url(catalog.base_url, 1)])
+        html = fetching_content(page_url(catalog.base_url, 1))
+        stolen = []
+
+        def slow_fetch(url):
+            time.sleep(0.6)
+            stolen.extend(queue.lease("other"))
+            return html
+
+        with patch("utils.work_queue.fetching_content", side_effect=slow_fetch):
+            assert run_worker(queue, str(tmp_path / "shards"), poll_interval=0.01) == 1
+
+        assert stolen == []
+        assert queue.counts()["done"] == 1
+
+    def test_worker_respects_rate_limit(self, tmp_path, catalog):
+        queue = CrawlQueue(str(tmp_path / "queue.db"))
+        queue.enqueue([page_url(catalog.base_url, page) for page in range(1, 6)])
+
+        start = time.monotonic()
+        assert run_worker(queue, str(tmp_path / "shards"), poll_interval=0.01, rate_limit=20) == 5
+        assert time.monotonic() - start >= 0.2
+
+    def test_next_unqueued_page_follows_last_next_link(self, tmp_path, catalog):
+        queue = CrawlQueue(str(tmp_path / "queue.db"))
+        queue.enqueue([page_url(catalog.base_url, page) for page in range(1, 11)])
+        shards = str(tmp_path / "shards")
+        run_worker(queue, shards, poll_interval=0.01)
+        assert next_unqueued_page(queue, shards) == 11
+
+        queue.enqueue([page_url(catalog.base_url, 11), page_url(catalog.base_url, 12)], start=11)
+        run_worker(queue, shards, poll_interval=0.01)
+        assert next_unqueued_page(queue, shards) is None
+
+    def test_worker_processes(self, tmp_path, catalog):
+        queue = CrawlQueue(str(tmp_path / "queue.db"))
+        queue.enqueue([page_url(catalog.base_url, page) for page in range(1, 13)])
+
+        run_workers(queue, str(tmp_path / "shards"), processes=2)
+
+        assert queue.counts()["done"] == 12
+        assert len(merge_shards(queue, str(tmp_path / "shards"))) == 60
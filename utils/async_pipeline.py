@@ -0,0 +1,300 @@
+import asyncio
+import random
+import pandas as pd
+from utils.extract import HEADERS, _known_total, _past_discovered_end, page_url, parse_page
+from utils.http_client import RETRY_STATUSES
+from utils.load import PRODUCT_COLUMNS, PRODUCT_COLUMNS_DDL, staging_table_statements, swap_table_statements
+from utils.transform import transform_fashion_data
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp opsional; hanya dibutuhkan oleh pipeline async
+    aiohttp = None
+
+try:
+    import asyncpg
+except ImportError:  # asyncpg opsional; hanya dibutuhkan oleh AsyncPostgresSink
+    asyncpg = None
+
+
+def _require(module, package):
+    if module is None:
+        raise ImportError(f"{package} belum terpasang; jalankan `pip install {package}`")
+
+
+def open_session(max_concurrency: int = 16, connect_timeout: float = 5, read_timeout: float = 30):
+    """aiohttp.ClientSession keep-alive dengan batas koneksi, timeout, dan HEADERS yang sama dengan versi sinkron."""
+    _require(aiohttp, "aiohttp")
+    return aiohttp.ClientSession(
+        headers=HEADERS,
+        connector=aiohttp.TCPConnector(limit=max_concurrency),
+        timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+    )
+
+
+async def fetch_content(session, url: str, retries: int = 3, backoff_factor: float = 0.5,
+                        backoff_max: float = 30):
+    """Versi async dari fetching_content: retry dengan exponential backoff + jitter, None jika gagal."""
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url) as response:
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    retry_after = response.headers.get("Retry-After")
+                    delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+                else:
+                    response.raise_for_status()
+                    return await response.read()
+        except aiohttp.ClientResponseError as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                print(f"Error fetching {url}: {e}")
+                return None
+            delay = None
+        if delay is None:
+            delay = min(backoff_max, backoff_factor * 2 ** attempt) + random.uniform(0, backoff_factor)
+        await asyncio.sleep(delay)
+
+
+class AsyncRateLimiter:
+    """Batasi request per detik di dalam satu event loop."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = None
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(self._next_slot or now, now)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+async def aiter_pages(base_url: str, session, max_concurrency: int = 16, rate_limit=None,
+                      parser: str = 'html.parser', executor=None, typed: bool = False, total_pages: int = None):
+    """Async generator: record per halaman, berurutan, dengan `max_concurrency` halaman sekaligus.
+
+    Parsing (CPU-bound) dijalankan di `executor` (default: thread pool event loop;
+    berikan ProcessPoolExecutor untuk paralel sungguhan) agar event loop tidak terblokir.
+    Dengan `total_pages` (lihat utils/discovery.py) tidak ada halaman di luar katalog yang diminta.
+    """
+    loop = asyncio.get_running_loop()
+    limiter = AsyncRateLimiter(rate_limit)
+
+    async def task(page):
+        await limiter.wait()
+        html = await fetch_content(session, page_url(base_url, page))
+        if html is None:
+            return None
+        return await loop.run_in_executor(executor, parse_page, html, parser, typed)
+
+    total_pages = _known_total(total_pages)
+    pending = {}
+    next_page = 1
+    page = 1
+    try:
+        while True:
+            while len(pending) < max_concurrency and (total_pages is None or next_page <= total_pages):
+                pending[next_page] = asyncio.create_task(task(next_page))
+                next_page += 1
+
+            print(f"Scraping page {page}: {page_url(base_url, page)}")
+            result = await pending.pop(page)
+            if result is None:
+                print("Failed to fetch content. Stopping.")
+                break
+
+            records, has_next = result
+            if not records:
+                print("No more products found. Done.")
+                break
+
+            yield records
+            if not has_next:
+                print("No more pages.")
+                break
+            total_pages = _past_discovered_end(page, total_pages)
+            page += 1
+    finally:
+        for future in pending.values():
+            future.cancel()
+        await asyncio.gather(*pending.values(), return_exceptions=True)
+
+
+class AsyncPostgresSink:
+    """Sink PostgreSQL async (asyncpg) yang memuat chunk lewat `copy_records_to_table`.
+
+    `append` menulis tiap chunk dalam transaksinya sendiri. `overwrite` mengalirkan
+    semua chunk ke `<table>_staging` lalu menukarnya dengan tabel aktif saat
+    `close()`, memakai SQL yang sama dengan swap_in_table di utils/load.py.
+    """
+
+    name = "PostgreSQL (async)"
+    MODES = ("append", "overwrite")
+
+    def __init__(self, db_config: dict, table_name: str = "products", mode: str = "append",
+                 min_size: int = 1, max_size: int = 4):
+        if mode not in self.MODES:
+            raise ValueError(f"mode harus salah satu dari {self.MODES}, bukan {mode!r}")
+        self.db_config = dict(db_config)
+        self.table_name = table_name
+        self.mode = mode
+        self.min_size = min_size
+        self.max_size = max_size
+        self.rows = 0
+        self._pool = None
+        self._staging_ready = False
+        self._failed = False
+
+    async def pool(self):
+        if self._pool is None:
+            _require(asyncpg, "asyncpg")
+            config = dict(self.db_config)
+            if "dbname" in config:
+                config["database"] = config.pop("dbname")
+            self._pool = await asyncpg.create_pool(min_size=self.min_size, max_size=self.max_size, **config)
+        return self._pool
+
+    async def write(self, df: pd.DataFrame) -> int:
+        try:
+            return await self._write(df)
+        except Exception:
+            # Staging yang tidak lengkap tidak boleh ditukar ke tabel aktif saat close().
+            self._failed = True
+            raise
+
+    async def _write(self, df):
+        pool = await self.pool()
+        columns = PRODUCT_COLUMNS.split(", ")
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                if self.mode == "overwrite":
+                    if not self._staging_ready:
+                        for statement in staging_table_statements(self.table_name):
+                            await conn.execute(statement)
+                        self._staging_ready = True
+                    target = f"{self.table_name}_staging"
+                else:
+                    await conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table_name} ({PRODUCT_COLUMNS_DDL});")
+                    target = self.table_name
+                await conn.copy_records_to_table(target, records=dataframe_records(df[columns]), columns=columns)
+        self.rows += len(df)
+        return len(df)
+
+    async def close(self):
+        if self._pool is None:
+            return
+        try:
+            if self._staging_ready:
+                statements = (
+                    [f"DROP TABLE IF EXISTS {self.table_name}_staging;"] if self._failed
+                    else swap_table_statements(self.table_name)
+                )
+                async with self._pool.acquire() as conn:
+                    async with conn.transaction():
+                        for statement in statements:
+                            await conn.execute(statement)
+                self._staging_ready = False
+        finally:
+            await self._pool.close()
+            self._pool = None
+
+
+def dataframe_records(df: pd.DataFrame) -> list:
+    """Baris DataFrame sebagai tuple bertipe Python (int, float, str, datetime, None) untuk asyncpg."""
+    values = df.astype(object).where(df.notna(), None)
+    return list(values.itertuples(index=False, name=None))
+
+
+async def _write(sink, df):
+    if asyncio.iscoroutinefunction(sink.write):
+        return await sink.write(df)
+    return await asyncio.to_thread(sink.write, df)
+
+
+async def _close(sink):
+    if asyncio.iscoroutinefunction(sink.close):
+        await sink.close()
+    else:
+        await asyncio.to_thread(sink.close)
+
+
+async def run_async_pipeline(base_url: str, sinks: list, batch_size: int = 500, queue_size: int = 4,
+                             max_concurrency: int = 16, rate_limit=None, parser: str = 'html.parser',
+                             executor=None, session=None, typed: bool = False, total_pages: int = None) -> dict:
+    """Extract → transform → load dalam satu event loop, dihubungkan antrean terbatas.
+
+    Antrean `queue_size` batch di antara tiap tahap memberi backpressure: scraping
+    berhenti sementara jika transform/load tertinggal, sehingga memori tetap konstan.
+    Sink boleh async (`async def write`) atau sinkron (dijalankan lewat `asyncio.to_thread`);
+    sink yang gagal dilewati pada chunk berikutnya, seperti save_chunks.
+    """
+    raw_batches = asyncio.Queue(maxsize=queue_size)
+    clean_chunks = asyncio.Queue(maxsize=queue_size)
+    stats = {"rows_extracted": 0, "rows_transformed": 0, "sinks": {}}
+    errors = {}
+
+    async def extract():
+        own_session = session is None
+        client = open_session(max_concurrency) if own_session else session
+        try:
+            batch = []
+            async for records in aiter_pages(base_url, client, max_concurrency, rate_limit, parser, executor,
+                                             typed, total_pages):
+                batch.extend(records)
+                while len(batch) >= batch_size:
+                    await raw_batches.put(batch[:batch_size])
+                    batch = batch[batch_size:]
+            if batch:
+                await raw_batches.put(batch)
+        finally:
+            if own_session:
+                await client.close()
+        await raw_batches.put(None)
+
+    async def transform():
+        while (batch := await raw_batches.get()) is not None:
+            stats["rows_extracted"] += len(batch)
+            df = await asyncio.to_thread(transform_fashion_data, pd.DataFrame(batch))
+            if not df.empty:
+                await clean_chunks.put(df)
+        await clean_chunks.put(None)
+
+    async def load():
+        active = list(sinks)
+        while (df := await clean_chunks.get()) is not None:
+            results = await asyncio.gather(*(_write(sink, df) for sink in active), return_exceptions=True)
+            for sink, result in zip(list(active), results):
+                if isinstance(result, Exception):
+                    print(f"❌ Gagal menulis chunk ke {sink.name}: {result}")
+                    errors[sink.name] = result
+                    active.remove(sink)
+            stats["rows_transformed"] += len(df)
+
+        for sink in sinks:
+            try:
+                await _close(sink)
+            except Exception as e:
+                print(f"❌ Gagal menutup {sink.name}: {e}")
+                errors.setdefault(sink.name, e)
+
+    async with asyncio.TaskGroup() as group:
+        group.create_task(extract())
+        group.create_task(transform())
+        group.create_task(load())
+
+    for sink in sinks:
+        error = errors.get(sink.name)
+        if error is None:
+            print(f"✅ {sink.rows} baris berhasil disimpan ke {sink.name}")
+        stats["sinks"][sink.name] = {
+            "ok": error is None,
+            "rows": sink.rows,
+            "seconds": None,
+            "error": None if error is None else str(error),
+        }
+    return stats
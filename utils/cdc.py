@@ -0,0 +1,144 @@
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+import pandas as pd
+from utils.transform import PRODUCT_IDENTITY, product_keys
+
+# Atribut yang dibandingkan antar run; identitas produk ada di PRODUCT_IDENTITY,
+# dan timestamp diabaikan karena selalu berubah di setiap scraping.
+TRACKED_ATTRIBUTES = ['price', 'rating', 'colors']
+HELPER_COLUMNS = ['product_key', 'attr_hash']
+
+STATE_DDL = """
+CREATE TABLE IF NOT EXISTS product_state (
+    product_key TEXT PRIMARY KEY,
+    attr_hash TEXT NOT NULL,
+    title TEXT, size TEXT, gender TEXT,
+    price INTEGER, rating REAL, colors INTEGER,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS product_history (
+    product_key TEXT NOT NULL,
+    change TEXT NOT NULL,
+    price INTEGER, rating REAL, colors INTEGER,
+    observed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS product_history_key_idx ON product_history (product_key, observed_at);
+"""
+
+
+def attribute_hashes(df):
+    """md5 dari price|rating|colors per baris (kolom attr_hash)."""
+    joined = df[TRACKED_ATTRIBUTES[0]].astype(str)
+    for column in TRACKED_ATTRIBUTES[1:]:
+        joined = joined + '|' + df[column].astype(str)
+    return joined.map(lambda value: hashlib.md5(value.encode('utf-8')).hexdigest()).astype(object).rename('attr_hash')
+
+
+class ChangeSet:
+    """Hasil diff satu run: produk baru, produk yang atributnya berubah, dan produk yang hilang."""
+
+    def __init__(self, inserts: pd.DataFrame, updates: pd.DataFrame, deletes: pd.DataFrame):
+        self.inserts = inserts
+        self.updates = updates
+        self.deletes = deletes
+
+    @property
+    def upserts(self) -> pd.DataFrame:
+        """Baris baru + berubah dengan kolom produk saja, siap dikirim ke sink."""
+        return pd.concat([self.inserts, self.updates], ignore_index=True).drop(columns=HELPER_COLUMNS)
+
+    def counts(self) -> dict:
+        return {"inserts": len(self.inserts), "updates": len(self.updates), "deletes": len(self.deletes)}
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+class ChangeTracker:
+    """Indeks SQLite lokal berisi hash atribut tiap produk dari run terakhir, plus riwayat harga/rating.
+
+    `diff(df)` membandingkan snapshot hasil transformasi dengan state tersimpan tanpa
+    mengubahnya; `commit(changes)` baru memajukan state (dan menambah riwayat) setelah
+    sink berhasil, sehingga run yang gagal di tengah jalan akan mengirim delta yang sama lagi.
+    """
+
+    def __init__(self, path: str = "cdc_state.db"):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript(STATE_DDL)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def diff(self, df: pd.DataFrame, detect_deletes: bool = True) -> ChangeSet:
+        """Bandingkan snapshot lengkap `df` dengan state; `detect_deletes=False` untuk snapshot parsial."""
+        current = df.assign(product_key=product_keys(df), attr_hash=attribute_hashes(df))
+        # Produk yang muncul lebih dari sekali: pakai baris terbaru, sama seperti upsert PostgreSQL.
+        current = current.sort_values('timestamp', kind='stable').drop_duplicates('product_key', keep='last')
+
+        with self._connect() as conn:
+            previous = pd.read_sql_query(
+                f"SELECT product_key, attr_hash, {', '.join(PRODUCT_IDENTITY)} FROM product_state", conn
+            )
+        previous_hash = current['product_key'].map(previous.set_index('product_key')['attr_hash'])
+
+        is_new = previous_hash.isna().to_numpy()
+        is_changed = ~is_new & (previous_hash != current['attr_hash']).to_numpy()
+        inserts = current[is_new].reset_index(drop=True)
+        updates = current[is_changed].reset_index(drop=True)
+        if detect_deletes:
+            deletes = previous[~previous['product_key'].isin(current['product_key'])].reset_index(drop=True)
+        else:
+            deletes = previous.iloc[0:0]
+        return ChangeSet(inserts, updates, deletes.drop(columns=['attr_hash']))
+
+    def commit(self, changes: ChangeSet, observed_at: datetime = None):
+        """Terapkan ChangeSet ke state dan riwayat dalam satu transaksi."""
+        observed_at = (observed_at or datetime.now()).isoformat()
+        upserts = pd.concat([changes.inserts, changes.updates], ignore_index=True)
+        state_rows = [
+            (row.product_key, row.attr_hash, row.title, row.size, row.gender,
+             int(row.price), float(str(row.rating)), int(row.colors), observed_at)
+            for row in upserts.astype({'size': object, 'gender': object}).itertuples(index=False)
+        ]
+        inserted = len(changes.inserts)
+        history_rows = (
+            [(r[0], "insert", r[5], r[6], r[7], observed_at) for r in state_rows[:inserted]]
+            + [(r[0], "update", r[5], r[6], r[7], observed_at) for r in state_rows[inserted:]]
+            + [(key, "delete", None, None, None, observed_at) for key in changes.deletes['product_key']]
+        )
+
+        with self._connect() as conn, conn:
+            conn.executemany(
+                "INSERT INTO product_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (product_key) DO UPDATE SET attr_hash = excluded.attr_hash, "
+                "price = excluded.price, rating = excluded.rating, colors = excluded.colors, "
+                "updated_at = excluded.updated_at",
+                state_rows,
+            )
+            conn.executemany(
+                "DELETE FROM product_state WHERE product_key = ?",
+                [(key,) for key in changes.deletes['product_key']],
+            )
+            conn.executemany("INSERT INTO product_history VALUES (?, ?, ?, ?, ?, ?)", history_rows)
+
+    def history(self, product_key: str = None) -> pd.DataFrame:
+        """Riwayat harga/rating (semua produk, atau satu product_key) berurutan menurut waktu."""
+        query = "SELECT * FROM product_history"
+        params = ()
+        if product_key is not None:
+            query += " WHERE product_key = ?"
+            params = (product_key,)
+        with self._connect() as conn:
+            return pd.read_sql_query(query + " ORDER BY observed_at, rowid", conn, params=params)
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT count(*) FROM product_state").fetchone()[0]
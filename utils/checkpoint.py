@@ -0,0 +1,67 @@
+import json
+import os
+
+from utils.fileio import atomic_write
+
+
+class CrawlCheckpoint:
+    """Durable crawl state: one JSON file per completed page under `directory`.
+
+    Each page file holds the page's parsed records and whether it had a next
+    link, and is written atomically (temp file + fsync + rename), so a crash
+    never leaves a half-written checkpoint. A manifest records the base URL and
+    whether records were typed (see utils.fields); state from a different crawl
+    is discarded instead of resumed.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, directory=".crawl_checkpoint", base_url=None, typed=False):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        if base_url is not None:
+            identity = {"base_url": base_url, "typed": typed}
+            manifest = self._read(self.MANIFEST)
+            if manifest is not None and dict({"typed": False}, **manifest) != identity:
+                self.clear()
+            atomic_write(self._path(self.MANIFEST), json.dumps(identity, ensure_ascii=False))
+
+    def completed_pages(self):
+        return sorted(
+            int(name[len("page-"):-len(".json")])
+            for name in os.listdir(self.directory)
+            if name.startswith("page-") and name.endswith(".json")
+        )
+
+    def get(self, page):
+        """Return (records, has_next) for a completed page, or None."""
+        state = self._read(self._page_file(page))
+        if state is None:
+            return None
+        return state["records"], state["has_next"]
+
+    def save_page(self, page, records, has_next):
+        atomic_write(self._path(self._page_file(page)),
+                     json.dumps({"records": records, "has_next": has_next}, ensure_ascii=False))
+
+    def clear(self):
+        """Delete only the checkpoint's own files; anything else in `directory` is left alone."""
+        for name in os.listdir(self.directory):
+            if name == self.MANIFEST or name.endswith(".tmp") or (name.startswith("page-") and name.endswith(".json")):
+                try:
+                    os.remove(self._path(name))
+                except FileNotFoundError:
+                    pass
+
+    def _page_file(self, page):
+        return f"page-{page:06d}.json"
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read(self, name):
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,69 @@
+"""Page discovery: find how many catalog pages exist before fetching them.
+
+Following `li.next` links forces a serial chain of requests. Discovery reads the
+total from page 1's pagination ("Page 1 of 50"), or, when the markup has no
+count, probes pages 2, 4, 8, ... until one is empty and binary-searches the gap,
+using about 2*log2(N) requests. Parallel fetchers can then schedule every page
+at once instead of waiting for the next link.
+"""
+import re
+
+from utils.extract import fetching_content, page_url, parse_page
+
+PAGE_COUNT = re.compile(r"Page\s+\d+\s+of\s+(\d+)", re.IGNORECASE)
+
+
+def page_count_from_html(html):
+    """Total page count from pagination text like 'Page 1 of 50', or None if there is none."""
+    if isinstance(html, bytes):
+        html = html.decode('utf-8', errors='replace')
+    match = PAGE_COUNT.search(html)
+    return int(match.group(1)) if match else None
+
+
+def probe_last_page(exists, known=1, max_pages=100_000):
+    """Last page for which `exists(page)` is true, given that page `known` exists.
+
+    Pages are assumed contiguous: every page up to the last one has products.
+    """
+    low, high = known, known * 2
+    while high <= max_pages and exists(high):
+        low, high = high, high * 2
+    high = min(high, max_pages + 1)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if exists(middle):
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def has_products(base_url, page, parser='html.parser'):
+    html = fetching_content(page_url(base_url, page))
+    if html is None:
+        return False
+    records, _ = parse_page(html, parser)
+    return bool(records)
+
+
+def discover_page_count(base_url, parser='html.parser'):
+    """Number of catalog pages under `base_url`; 0 if page 1 cannot be fetched or is empty."""
+    html = fetching_content(page_url(base_url, 1))
+    if html is None:
+        return 0
+    total = page_count_from_html(html)
+    if total is not None:
+        return total
+
+    records, has_next = parse_page(html, parser)
+    if not records:
+        return 0
+    if not has_next:
+        return 1
+    return probe_last_page(lambda page: has_products(base_url, page, parser))
+
+
+def discover_pages(base_url, parser='html.parser'):
+    """URLs of every catalog page, in order."""
+    return [page_url(base_url, page) for page in range(1, discover_page_count(base_url, parser) + 1)]
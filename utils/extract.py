@@ -1,7 +1,12 @@
+import queue
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 import requests
 from bs4 import BeautifulSoup
+from utils.http_client import HttpClient
+from utils.metrics import observe
+from utils.parsers import build_record, parse_page_lxml
 
 HEADERS = {
     "User-Agent": (
@@ -11,17 +16,38 @@ HEADERS = {
 }
 
 
-def fetching_content(url):
-    try:
-        response = requests.get(url, headers=HEADERS)
-        response.raise_for_status()
-        return response.content
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching {url}: {e}")
-        return None
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    """Shared HttpClient reused by every fetch so connections stay alive between pages."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HttpClient(headers=HEADERS)
+        return _default_client
+
 
+def set_default_client(client):
+    """Replace the shared client, e.g. with one backed by a ResponseCache."""
+    global _default_client
+    with _default_client_lock:
+        _default_client = client
 
-def extract_fashion_data(product_div):
+
+def fetching_content(url, client=None):
+    with observe("fetch") as stage:
+        try:
+            content = (client or get_default_client()).get_content(url)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {url}: {e}")
+            return None
+        stage.bytes = len(content)
+        return content
+
+
+def extract_fashion_data(product_div, typed=False):
     product_details = product_div.find('div', class_='product-details')
     if not product_details:
         return {}
@@ -38,61 +64,307 @@ def extract_fashion_data(product_div):
         if price_span:
             price = price_span.text.strip()
 
-    # Other attributes
-    rating = colors = size = gender = None
-    for p in product_details.find_all('p'):
-        text = p.text.strip()
-        lower = text.lower()
-        if "rating" in lower:
-            rating = text.split(':', 1)[-1].strip()
-        elif "color" in lower:
-            colors = text
-        elif "size" in lower:
-            size = text.split(':', 1)[-1].strip().upper()
-        elif "gender" in lower:
-            gender = text.split(':', 1)[-1].strip().lower()
-
-    return {
-        "title": title,
-        "price": price,
-        "rating": rating,
-        "colors": colors,
-        "size": size,
-        "gender": gender,
-        "timestamp": datetime.now().isoformat()
-    }
-
-
-def scrape_all_pages(base_url, delay=1):
+    # Other attributes (classified once per distinct text, see utils.fields)
+    texts = [p.text.strip() for p in product_details.find_all('p')]
+    return build_record(title, price, texts, typed)
+
+
+class RateLimiter:
+    """Shared limiter allowing at most `rate` requests per second across threads."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def page_url(base_url, page):
+    return base_url if page == 1 else f"{base_url.rstrip('/')}/page{page}"
+
+
+def _parse_page_bs4(html, typed=False):
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = soup.find_all('div', class_='collection-card')
+    return [extract_fashion_data(card, typed) for card in cards], soup.find('li', class_='next') is not None
+
+
+# 'html.parser' is the reference implementation; other backends must return identical dicts.
+PARSERS = {
+    'html.parser': _parse_page_bs4,
+    'lxml': parse_page_lxml,
+}
+
+
+def parse_page(html, parser='html.parser', typed=False):
+    """Parse one catalog page into (records, has_next) with the chosen backend.
+
+    `typed=True` returns price (USD), rating and colors as numbers instead of raw strings.
+    """
+    try:
+        backend = PARSERS[parser]
+    except KeyError:
+        raise ValueError(f"Unknown parser {parser!r}; choose from {sorted(PARSERS)}") from None
+    with observe("parse") as stage:
+        records, has_next = backend(html, typed)
+        stage.rows_out = len(records)
+    return records, has_next
+
+
+def scrape_page(url, parser='html.parser', typed=False):
+    """Fetch and parse one catalog page. Returns (records, has_next) or None on fetch failure."""
+    html = fetching_content(url)
+    if html is None:
+        return None
+    return parse_page(html, parser, typed)
+
+
+def scrape_all_pages(base_url, delay=1, max_workers=1, rate_limit=None, parser='html.parser',
+                     checkpoint=None, resume=True, typed=False, total_pages=None):
     all_data = []
-    page = 1
+    for records in iter_pages(base_url, delay, max_workers, rate_limit, parser, checkpoint, resume, typed,
+                              total_pages):
+        all_data.extend(records)
+    return all_data
+
+
+def iter_pages(base_url, delay=1, max_workers=1, rate_limit=None, parser='html.parser',
+               checkpoint=None, resume=True, typed=False, total_pages=None):
+    """Generator form of scrape_all_pages: yields each page's records as soon as it is parsed.
 
+    With a CrawlCheckpoint, every completed page is saved as it is yielded and pages
+    already saved are served from disk instead of being fetched again, so a run
+    that stopped halfway picks up where it left off. `resume=False` discards the
+    saved state first. The checkpoint is cleared once the crawl reaches the end.
+
+    `total_pages` (see utils.discovery) lets the concurrent path schedule pages
+    without fetching past the end of the catalog; it is ignored when sequential.
+
+    The generator returns True (the value of `yield from`) when the crawl reached
+    the last page, and False when it stopped early on a failed fetch.
+    """
+    if checkpoint is not None and not resume:
+        checkpoint.clear()
+
+    if max_workers > 1:
+        return (yield from _iter_pages_concurrent(base_url, max_workers, RateLimiter(rate_limit), parser,
+                                                  checkpoint, typed, total_pages))
+
+    page = 1
     while True:
-        current_url = base_url if page == 1 else f"{base_url.rstrip('/')}/page{page}"
-        print(f"Scraping page {page}: {current_url}")
+        current_url = page_url(base_url, page)
+        result = checkpoint.get(page) if checkpoint is not None else None
+        restored = result is not None
+        if restored:
+            print(f"Restored page {page} from checkpoint: {current_url}")
+        else:
+            print(f"Scraping page {page}: {current_url}")
+            result = _scrape_and_save(base_url, page, parser, checkpoint, typed)
 
-        html = fetching_content(current_url)
-        if html is None:
+        if result is None:
             print("Failed to fetch content. Stopping.")
-            break
+            return False
 
-        soup = BeautifulSoup(html, 'html.parser')
-        cards = soup.find_all('div', class_='collection-card')
-        if not cards:
+        records, has_next = result
+        if not records:
             print("No more products found. Done.")
-            break
+            _finish_checkpoint(checkpoint)
+            return True
 
-        for card in cards:
-            all_data.append(extract_fashion_data(card))
+        yield records
 
-        if soup.find('li', class_='next'):
+        if has_next:
             page += 1
-            time.sleep(delay)
+            if not restored:
+                time.sleep(delay)
         else:
             print("No more pages.")
-            break
+            _finish_checkpoint(checkpoint)
+            return True
 
-    return all_data
+
+def _scrape_and_save(base_url, page, parser, checkpoint, typed=False):
+    result = scrape_page(page_url(base_url, page), parser, typed)
+    if checkpoint is not None and result is not None and result[0]:
+        checkpoint.save_page(page, *result)
+    return result
+
+
+def _finish_checkpoint(checkpoint):
+    if checkpoint is not None:
+        checkpoint.clear()
+
+
+def iter_batches(pages, batch_size=500):
+    """Regroup an iterable of per-page record lists into lists of `batch_size` records."""
+    batch = []
+    for records in pages:
+        batch.extend(records)
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            batch = batch[batch_size:]
+    if batch:
+        yield batch
+
+
+def _iter_pages_concurrent(base_url, max_workers, rate_limiter, parser, checkpoint=None, typed=False,
+                           total_pages=None):
+    # Keep a sliding window of `max_workers` pages in flight and consume the
+    # results strictly in page order, so the output matches the sequential path.
+    # At most `max_workers - 1` pages past the end of the catalog are fetched,
+    # none if `total_pages` is known.
+    def task(page):
+        if checkpoint is not None:
+            saved = checkpoint.get(page)
+            if saved is not None:
+                return saved
+        rate_limiter.wait()
+        return _scrape_and_save(base_url, page, parser, checkpoint, typed)
+
+    total_pages = _known_total(total_pages)
+    pending = {}
+    next_page = 1
+    page = 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            while True:
+                while len(pending) < max_workers and (total_pages is None or next_page <= total_pages):
+                    pending[next_page] = executor.submit(task, next_page)
+                    next_page += 1
+
+                print(f"Scraping page {page}: {page_url(base_url, page)}")
+                result = pending.pop(page).result()
+                if result is None:
+                    print("Failed to fetch content. Stopping.")
+                    return False
+
+                records, has_next = result
+                if not records:
+                    print("No more products found. Done.")
+                    _finish_checkpoint(checkpoint)
+                    return True
+
+                yield records
+                if not has_next:
+                    print("No more pages.")
+                    _finish_checkpoint(checkpoint)
+                    return True
+                total_pages = _past_discovered_end(page, total_pages)
+                page += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+
+def _known_total(total_pages):
+    # Discovery reports 0 when page 1 could not be fetched or was empty; that is
+    # not a usable page count, so schedule as if it were unknown.
+    return total_pages if total_pages and total_pages > 0 else None
+
+
+def _past_discovered_end(page, total_pages):
+    # The last discovered page still links to a next one (the catalog grew or the
+    # discovery was wrong): fall back to following the pagination.
+    if total_pages is not None and page >= total_pages:
+        print(f"Page {page} links past the {total_pages} discovered pages; following pagination.")
+        return None
+    return total_pages
+
+
+def scrape_pages_pipelined(base_url, fetch_workers=4, parse_workers=None, queue_size=8,
+                           rate_limit=None, parser='html.parser', typed=False, total_pages=None):
+    """Yield each page's records as a list (like iter_pages), fetching in threads and parsing in a process pool.
+
+    Fetcher threads push raw HTML onto a bounded queue; the caller's thread hands
+    each page to a ProcessPoolExecutor and yields records in page order. At most
+    `fetch_workers + queue_size` pages are in flight (fetching, queued, parsing or
+    waiting to be yielded), which bounds memory regardless of catalog size.
+    With `total_pages` known, fetchers do not claim pages past the end. Like
+    iter_pages, the generator returns whether the crawl reached the last page.
+    """
+    window = fetch_workers + queue_size
+    slots = threading.Semaphore(window)
+    html_queue = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+    rate_limiter = RateLimiter(rate_limit)
+    claim_lock = threading.Lock()
+    next_page = [1]
+    last_page = [_known_total(total_pages)]
+
+    def fetcher():
+        while not stop.is_set():
+            if not slots.acquire(timeout=0.1):
+                continue
+            with claim_lock:
+                page = next_page[0]
+                claimed = last_page[0] is None or page <= last_page[0]
+                if claimed:
+                    next_page[0] += 1
+            if not claimed:
+                slots.release()
+                stop.wait(0.05)
+                continue
+            rate_limiter.wait()
+            item = (page, fetching_content(page_url(base_url, page)))
+            while not stop.is_set():
+                try:
+                    html_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    threads = [threading.Thread(target=fetcher, daemon=True) for _ in range(fetch_workers)]
+    for thread in threads:
+        thread.start()
+
+    executor = ProcessPoolExecutor(max_workers=parse_workers)
+    pending = {}
+    page = 1
+    try:
+        while True:
+            while page in pending and (pending[page] is None or pending[page].done()):
+                future = pending.pop(page)
+                print(f"Scraping page {page}: {page_url(base_url, page)}")
+                if future is None:
+                    print("Failed to fetch content. Stopping.")
+                    return False
+
+                records, has_next = future.result()
+                if not records:
+                    print("No more products found. Done.")
+                    return True
+                yield records
+                if not has_next:
+                    print("No more pages.")
+                    return True
+                with claim_lock:
+                    last_page[0] = _past_discovered_end(page, last_page[0])
+                page += 1
+                slots.release()
+
+            try:
+                fetched_page, html = html_queue.get(timeout=0.05)
+            except queue.Empty:
+                running = [f for f in pending.values() if f is not None and not f.done()]
+                if running:
+                    wait(running, timeout=0.05, return_when=FIRST_COMPLETED)
+                continue
+            pending[fetched_page] = None if html is None else executor.submit(parse_page, html, parser, typed)
+    finally:
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for thread in threads:
+            thread.join()
 
 
 def extract_all_products_from_url(url):
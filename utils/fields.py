@@ -0,0 +1,112 @@
+"""Memoized field parsers shared by the BeautifulSoup and lxml extractors.
+
+Rating, colors, size, gender and price strings repeat heavily across the
+catalog, so each distinct string is classified (and, with `typed=True`,
+converted) once and served from a bounded LRU cache afterwards. The rules are
+the ones transform_fashion_data applies: typed values are plain numbers in the
+site's units (price stays in USD), invalid values become None, and the
+transform only has to convert currency, clean size/gender and drop NaN rows.
+"""
+from functools import lru_cache
+
+from utils.transform import (
+    COLORS_VALUE, INVALID_PRICES, INVALID_RATINGS, PRICE_NOISE, RATING_VALUE,
+)
+
+CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_paragraph(text):
+    """Classify one stripped <p> text as (field, raw value), or (None, None) if it is not an attribute."""
+    lower = text.lower()
+    if "rating" in lower:
+        return "rating", text.split(':', 1)[-1].strip()
+    if "color" in lower:
+        return "colors", text
+    if "size" in lower:
+        return "size", text.split(':', 1)[-1].strip().upper()
+    if "gender" in lower:
+        return "gender", text.split(':', 1)[-1].strip().lower()
+    return None, None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_paragraph_typed(text):
+    """Like parse_paragraph, with rating as float and colors as int (None when invalid)."""
+    field, value = parse_paragraph(text)
+    if field == "rating":
+        return field, parse_rating(value)
+    if field == "colors":
+        return field, parse_colors(value)
+    return field, value
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_price(text):
+    """'$120.00' -> 120.0 (USD); None for missing, unavailable or unparsable prices."""
+    if text is None or text.lower() in INVALID_PRICES:
+        return None
+    return _to_float(PRICE_NOISE.sub('', text))
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_rating(value):
+    """'⭐ 4.8 / 5' -> 4.8; None for 'Not Rated' and other invalid ratings."""
+    if value.lower() in INVALID_RATINGS:
+        return None
+    match = RATING_VALUE.search(value)
+    return _to_float(match.group(1)) if match else None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_colors(text):
+    """'3 Colors' -> 3; None when there is no count or it does not fit in int8."""
+    match = COLORS_VALUE.search(text)
+    if not match:
+        return None
+    colors = int(match.group(1))
+    return colors if 0 <= colors <= 127 else None
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+CACHED_PARSERS = {
+    "paragraph": parse_paragraph,
+    "paragraph_typed": parse_paragraph_typed,
+    "price": parse_price,
+    "rating": parse_rating,
+    "colors": parse_colors,
+}
+
+
+def cache_stats(baseline=None):
+    """Hits, misses and hit rate per parser, counted since `baseline` (an earlier cache_stats() result).
+
+    Caches are per process: pages parsed in a ProcessPoolExecutor are not counted here.
+    """
+    stats = {}
+    for name, parser in CACHED_PARSERS.items():
+        info = parser.cache_info()
+        hits, misses = info.hits, info.misses
+        if baseline and name in baseline:
+            hits -= baseline[name]["hits"]
+            misses -= baseline[name]["misses"]
+        lookups = hits + misses
+        stats[name] = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else None,
+            "size": info.currsize,
+        }
+    return stats
+
+
+def clear_caches():
+    for parser in CACHED_PARSERS.values():
+        parser.cache_clear()
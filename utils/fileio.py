@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+
+def atomic_write(path, data, fsync=True):
+    """Write bytes or text to `path` via a temp file in the same directory and os.replace.
+
+    Readers see either the old file or the complete new one, never a partial
+    write. With `fsync` the data is flushed to disk before the rename, so the
+    new file also survives a crash; caches that can be rebuilt may skip it.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
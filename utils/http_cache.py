@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from utils.fileio import atomic_write
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "last_modified"])
+
+
+class ResponseCache:
+    """On-disk store of page bodies and their validators (ETag / Last-Modified).
+
+    Bodies live in `<directory>/<sha256(url)>.body`, metadata in `index.json`.
+    The index is kept in least-recently-used order and entries are evicted from
+    the front once the total body size exceeds `max_bytes`. Lookups and stores
+    only update the in-memory index; it is written to disk by `flush()` (called
+    from HttpClient.close) or at most once every `flush_interval` seconds, so a
+    crawl does not rewrite the whole index on every page.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, directory=".http_cache", max_bytes=64 * 1024 * 1024, flush_interval=30.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+    @property
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self._index.values())
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, url):
+        return _key(url) in self._index
+
+    def get(self, url):
+        key = _key(url)
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            try:
+                with open(self._body_path(key), "rb") as f:
+                    body = f.read()
+            except OSError:
+                del self._index[key]
+                self._changed()
+                return None
+            self._index.move_to_end(key)
+            entry["last_access"] = time.time()
+            self._changed()
+            return CachedResponse(body, entry.get("etag"), entry.get("last_modified"))
+
+    def conditional_headers(self, url):
+        with self._lock:
+            entry = self._index.get(_key(url))
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, body, etag=None, last_modified=None):
+        if not (etag or last_modified) or len(body) > self.max_bytes:
+            return False
+        key = _key(url)
+        with self._lock:
+            atomic_write(self._body_path(key), body, fsync=False)
+            self._index.pop(key, None)
+            self._index[key] = {
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "size": len(body),
+                "last_access": time.time(),
+            }
+            self._evict()
+            self._changed()
+        return True
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+    def flush(self):
+        """Write the index to disk if it changed since the last write."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _changed(self):
+        self._dirty = True
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self._save_index()
+
+    def _evict(self):
+        total = sum(entry["size"] for entry in self._index.values())
+        while total > self.max_bytes and self._index:
+            key = next(iter(self._index))
+            total -= self._index[key]["size"]
+            self._remove(key)
+
+    def _remove(self, key):
+        self._index.pop(key, None)
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, f"{key}.body")
+
+    def _load_index(self):
+        path = os.path.join(self.directory, self.INDEX_FILE)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return OrderedDict()
+        ordered = sorted(entries.items(), key=lambda item: item[1].get("last_access", 0))
+        return OrderedDict(ordered)
+
+    def _save_index(self):
+        data = json.dumps(self._index).encode("utf-8")
+        atomic_write(os.path.join(self.directory, self.INDEX_FILE), data, fsync=False)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
+
+def _key(url):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
@@ -0,0 +1,78 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP client with timeouts and retries (exponential backoff + jitter).
+
+    Retries cover connection/read errors and RETRY_STATUSES. A `Retry-After`
+    header on 429/503 responses is honoured instead of the computed backoff.
+    With a ResponseCache attached, `get_content` revalidates cached pages with
+    If-None-Match / If-Modified-Since and reuses the stored body on 304.
+    """
+
+    def __init__(self, headers=None, connect_timeout=5, read_timeout=30, retries=3,
+                 backoff_factor=0.5, backoff_jitter=0.5, backoff_max=30, pool_size=16, cache=None):
+        self.timeout = (connect_timeout, read_timeout)
+        self.cache = cache
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            backoff_max=backoff_max,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, headers=None):
+        return self.session.get(url, headers=headers, timeout=self.timeout)
+
+    def get_content(self, url):
+        """Return the body of `url`, raising requests.HTTPError on error statuses."""
+        if self.cache is None:
+            response = self.get(url)
+            response.raise_for_status()
+            return response.content
+
+        response = self.get(url, headers=self.cache.conditional_headers(url) or None)
+        if response.status_code == 304:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached.body
+            # Entry vanished between the request and now: fetch unconditionally.
+            response = self.get(url)
+
+        response.raise_for_status()
+        self.cache.store(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.content
+
+    def close(self):
+        if self.cache is not None:
+            self.cache.flush()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
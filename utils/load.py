@@ -1,135 +1,655 @@
 from google.oauth2.service_account import Credentials
 from googleapiclient.discovery import build
 import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2.extras import execute_batch
+from psycopg2.pool import ThreadedConnectionPool
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import io
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
 import pandas as pd
+from utils.transform import PRODUCT_IDENTITY, product_keys
+from utils.metrics import observe
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsional; hanya dibutuhkan oleh ParquetSink
+    pa = pq = None
 
-def save_to_csv(df: pd.DataFrame, filename: str = "products.csv"):
-    """Simpan DataFrame ke file CSV."""
+# Kolom tabel produk, mengikuti OUTPUT_SCHEMA di utils/transform.py
+PRODUCT_COLUMNS_DDL = """
+            title TEXT,
+            price BIGINT,
+            rating REAL,
+            colors SMALLINT,
+            size TEXT,
+            gender TEXT,
+            timestamp TIMESTAMP
+"""
+PRODUCT_COLUMNS = "title, price, rating, colors, size, gender, timestamp"
+PRODUCT_INDEXES = [("gender", "size"), ("price",), ("rating",)]
+
+
+def save_to_csv(df: pd.DataFrame, filename: str = "products.csv", compression=None, chunksize: int = None):
+    """Simpan DataFrame ke file CSV (opsional terkompresi, mis. 'gzip'/'zstd', dan ditulis per `chunksize` baris)."""
+    options = {k: v for k, v in {"compression": compression, "chunksize": chunksize}.items() if v is not None}
     try:
-        df.to_csv(filename, index=False)
+        df.to_csv(filename, index=False, **options)
         print(f"✅ Data berhasil disimpan ke {filename}")
     except Exception as e:
         print(f"❌ Gagal menyimpan ke CSV: {e}")
 
 
+SHEETS_SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
+_sheets_services = {}
+_sheets_lock = threading.Lock()
+
+
+def get_sheets_service(json_keyfile_path: str):
+    """Discovery client Google Sheets, dibangun sekali per file kredensial lalu dipakai ulang."""
+    with _sheets_lock:
+        if json_keyfile_path not in _sheets_services:
+            credentials = Credentials.from_service_account_file(json_keyfile_path, scopes=SHEETS_SCOPES)
+            _sheets_services[json_keyfile_path] = build('sheets', 'v4', credentials=credentials, cache_discovery=False)
+        return _sheets_services[json_keyfile_path]
+
+
+class SheetsSink:
+    """Sink Google Sheets: hanya mengirim sel yang berubah, dalam beberapa batchUpdate berukuran terbatas.
+
+    Isi sheet saat ini dibaca lebih dulu; baris yang sama dilewati, dan untuk baris
+    yang berubah hanya rentang kolom dari sel berbeda pertama hingga terakhir yang
+    dikirim (mis. hanya kolom timestamp saat harga tidak berubah). Baris berurutan
+    dengan rentang kolom yang sama digabung menjadi satu range, dan baris sisa di
+    bawah data baru dikosongkan dengan batchClear.
+    """
+
+    name = "Google Sheets"
+
+    def __init__(self, json_keyfile_path: str, spreadsheet_id: str, sheet_name: str = 'Sheet1',
+                 batch_rows: int = 5000, diff: bool = True, service=None):
+        self.json_keyfile_path = json_keyfile_path
+        self.spreadsheet_id = spreadsheet_id
+        self.sheet_name = sheet_name
+        self.batch_rows = batch_rows
+        self.diff = diff
+        self._service = service
+        self.rows = 0
+        self.requests = 0
+
+    @property
+    def service(self):
+        if self._service is None:
+            self._service = get_sheets_service(self.json_keyfile_path)
+        return self._service
+
+    def write(self, df: pd.DataFrame) -> int:
+        """Sinkronkan sheet dengan DataFrame; mengembalikan jumlah baris yang dikirim."""
+        values = self.service.spreadsheets().values()
+        desired = [df.columns.tolist()] + df.astype(str).values.tolist()
+        current = self._current_values(values) if self.diff else []
+
+        width = max([len(row) for row in desired + current] or [0])
+        desired = [row + [''] * (width - len(row)) for row in desired]
+        current = [row + [''] * (width - len(row)) for row in current]
+
+        spans = {}
+        for i, row in enumerate(desired):
+            columns = [j for j in range(width) if i >= len(current) or current[i][j] != row[j]]
+            if columns:
+                spans[i] = (columns[0], columns[-1] + 1)
+        changed = list(spans)
+        data = [
+            {'range': self._range(start, start + len(rows), last, first), 'values': rows}
+            for start, (first, last), rows in self._group(spans, desired)
+        ]
+        for batch in self._batches(data):
+            values.batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={'valueInputOption': 'RAW', 'data': batch}
+            ).execute()
+            self.requests += 1
+
+        if len(current) > len(desired):
+            values.batchClear(
+                spreadsheetId=self.spreadsheet_id,
+                body={'ranges': [self._range(len(desired), len(current), width)]}
+            ).execute()
+            self.requests += 1
+
+        self.rows += len(changed)
+        return len(changed)
+
+    def close(self):
+        pass
+
+    def _current_values(self, values):
+        response = values.get(spreadsheetId=self.spreadsheet_id, range=self.sheet_name).execute()
+        return [list(row) for row in response.get('values', [])]
+
+    def _group(self, spans, desired):
+        # Kelompokkan baris berurutan dengan rentang kolom yang sama menjadi range, maksimal batch_rows baris.
+        start = prev = None
+        for i in list(spans) + [None]:
+            if start is not None and (i is None or i != prev + 1 or spans[i] != spans[start]
+                                      or i - start >= self.batch_rows):
+                first, last = spans[start]
+                yield start, spans[start], [row[first:last] for row in desired[start:prev + 1]]
+                start = None
+            if i is not None and start is None:
+                start = i
+            prev = i
+
+    def _batches(self, data):
+        batch, rows = [], 0
+        for entry in data:
+            if batch and rows + len(entry['values']) > self.batch_rows:
+                yield batch
+                batch, rows = [], 0
+            batch.append(entry)
+            rows += len(entry['values'])
+        if batch:
+            yield batch
+
+    def _range(self, first_row, end_row, end_column, first_column=0):
+        return (f"{self.sheet_name}!{_column_letter(first_column + 1)}{first_row + 1}:"
+                f"{_column_letter(max(end_column, 1))}{end_row}")
+
+
+def _column_letter(n: int) -> str:
+    letters = ''
+    while n:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
 def save_to_google_sheets(df: pd.DataFrame, json_keyfile_path: str, spreadsheet_id: str, sheet_name: str = 'Sheet1'):
-    """Simpan DataFrame ke Google Sheets."""
+    """Simpan DataFrame ke Google Sheets (hanya baris yang berubah)."""
     try:
         print("📤 Menyimpan ke Google Sheets...")
-        scopes = ['https://www.googleapis.com/auth/spreadsheets']
-        credentials = Credentials.from_service_account_file(json_keyfile_path, scopes=scopes)
-        service = build('sheets', 'v4', credentials=credentials)
+        sink = SheetsSink(json_keyfile_path, spreadsheet_id, sheet_name)
+        changed = sink.write(df)
+        print(f"✅ Data berhasil ditulis ke Google Sheets! ({changed} baris berubah, {sink.requests} request)")
 
-        values = [df.columns.tolist()] + df.astype(str).values.tolist()
-        range_name = f'{sheet_name}!A1'
-        body = {'values': values}
+    except Exception as e:
+        print(f"❌ Gagal menyimpan ke Google Sheets: {e}")
 
-        service.spreadsheets().values().update(
-            spreadsheetId=spreadsheet_id,
-            range=range_name,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
 
-        print("✅ Data berhasil ditulis ke Google Sheets!")
+class ParquetSink:
+    """Sink Parquet terkompresi yang dipartisi per tanggal scraping (`<root>/scrape_date=YYYY-MM-DD/`).
 
-    except Exception as e:
-        print(f"❌ Gagal menyimpan ke Google Sheets: {e}")
+    Setiap write hanya menyentuh partisi tanggal yang ada di DataFrame; partisi lain
+    tidak diubah. Dengan `existing="replace"` partisi yang sama ditulis ulang (run
+    ulang di hari yang sama tidak menggandakan data), `existing="append"` menambah file baru,
+    dan `existing="replace_once"` (untuk mode streaming) mengosongkan partisi pada write
+    pertama objek ini lalu menambah chunk berikutnya ke partisi tersebut.
+    Hasilnya bisa dibaca per kolom, mis. `pd.read_parquet(root, columns=["price"])`,
+    atau di-memory-map lewat `pyarrow.parquet.read_table(..., memory_map=True)`.
+    """
 
+    name = "Parquet"
+    PARTITION = "scrape_date"
+    EXISTING = ("replace", "append", "replace_once")
+    # Partisi berisi snapshot per tanggal; dengan CDC ditulis ulang dari snapshot lengkap, bukan diberi delta.
+    full_snapshot = True
 
-def create_database(dbname: str, user: str, password: str, host: str = 'localhost', port: int = 5432):
-    """Buat database PostgreSQL jika belum ada."""
-    try:
-        conn = psycopg2.connect(
-            dbname='postgres',
-            user=user,
-            password=password,
-            host=host,
-            port=port
-        )
-        conn.autocommit = True
-        cur = conn.cursor()
-        cur.execute(f"CREATE DATABASE {dbname};")
-        print(f"✅ Database '{dbname}' berhasil dibuat!")
-        cur.close()
-        conn.close()
-    except psycopg2.errors.DuplicateDatabase:
-        print(f"ℹ️ Database '{dbname}' sudah ada. Lewatkan pembuatan.")
-    except Exception as e:
-        print(f"❌ Gagal membuat database: {e}")
+    def __init__(self, root: str = "products_parquet", compression: str = "zstd",
+                 row_group_size: int = 100_000, existing: str = "replace"):
+        if pq is None:
+            raise ImportError("pyarrow belum terpasang; jalankan `pip install pyarrow`")
+        if existing not in self.EXISTING:
+            raise ValueError(f"existing harus salah satu dari {self.EXISTING}, bukan {existing!r}")
+        self.root = root
+        self.compression = compression
+        self.row_group_size = row_group_size
+        self.existing = existing
+        self.rows = 0
+        self._written = set()  # partisi yang sudah ditulis objek ini (untuk replace_once)
 
+    def write(self, df: pd.DataFrame) -> int:
+        dates = pd.to_datetime(df["timestamp"]).dt.strftime("%Y-%m-%d")
+        for scrape_date, part in df.groupby(dates.to_numpy(), sort=True):
+            self._write_partition(scrape_date, part)
+        self.rows += len(df)
+        return len(df)
 
-def save_to_postgres_append(df: pd.DataFrame, db_config: dict, table_name: str = "products"):
-    """Simpan data ke PostgreSQL (append jika tabel sudah ada)."""
-    try:
-        print("🛢️ Menyimpan ke PostgreSQL (append)...")
-        conn = psycopg2.connect(**db_config)
-        cursor = conn.cursor()
+    def close(self):
+        pass
 
-        create_table_query = f"""
-        CREATE TABLE IF NOT EXISTS {table_name} (
-            title TEXT,
-            price FLOAT,
-            rating FLOAT,
-            colors INTEGER,
-            size TEXT,
-            gender TEXT,
-            timestamp TEXT
-        )
-        """
-        cursor.execute(create_table_query)
-        conn.commit()
+    def _write_partition(self, scrape_date, part):
+        directory = os.path.join(self.root, f"{self.PARTITION}={scrape_date}")
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        filename = f"part-{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.parquet"
+
+        # Tulis ke file sementara lalu rename, agar pembaca tidak pernah melihat file setengah jadi.
+        tmp_path = os.path.join(self.root, f".{filename}.tmp")
+        pq.write_table(table, tmp_path, compression=self.compression, row_group_size=self.row_group_size)
+        shutil.move(tmp_path, os.path.join(directory, filename))
+        replace = self.existing == "replace" or (self.existing == "replace_once"
+                                                 and scrape_date not in self._written)
+        self._written.add(scrape_date)
+        # File baru dipindahkan dulu: jika penghapusan gagal, partisi berisi data lama + baru, bukan kosong.
+        if replace:
+            for old in os.listdir(directory):
+                if old != filename:
+                    os.remove(os.path.join(directory, old))
+
+
+class PostgresSink:
+    """Sink PostgreSQL dengan connection pool, INSERT yang di-PREPARE sekali per koneksi, dan cache skema.
+
+    Satu objek dipakai ulang untuk create_database, append, overwrite, dan upsert
+    sehingga koneksi tidak dibuka-tutup di setiap pemanggilan. `write(df)` memakai
+    `table_name` dan `mode` bawaan, jadi sink ini juga bisa menjadi writer di `save_chunks`.
+    """
+
+    name = "PostgreSQL"
+    MODES = ("append", "overwrite", "upsert")
+
+    def __init__(self, db_config: dict, table_name: str = "products", mode: str = "append",
+                 minconn: int = 1, maxconn: int = 4, chunk_size: int = 50_000):
+        if mode not in self.MODES:
+            raise ValueError(f"mode harus salah satu dari {self.MODES}, bukan {mode!r}")
+        self.db_config = dict(db_config)
+        self.table_name = table_name
+        self.mode = mode
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self._pool = None
+        self._lock = threading.Lock()
+        self._ready = set()
+        self._prepared = set()
+
+    @property
+    def pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, **self.db_config)
+            return self._pool
+
+    @contextmanager
+    def transaction(self):
+        """Pinjam koneksi dari pool; commit jika berhasil, rollback dan reset cache jika gagal."""
+        conn = self.pool.getconn()
+        try:
+            with conn.cursor() as cursor:
+                yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            self._forget(conn)
+            raise
+        finally:
+            self.pool.putconn(conn)
+
+    def create_database(self):
+        """Buat database PostgreSQL dari db_config jika belum ada."""
+        config = {k: v for k, v in self.db_config.items() if k not in ("dbname", "database")}
+        dbname = self.db_config.get("dbname") or self.db_config.get("database")
+        try:
+            conn = psycopg2.connect(dbname='postgres', **config)
+            conn.autocommit = True
+            cur = conn.cursor()
+            cur.execute(f"CREATE DATABASE {dbname};")
+            print(f"✅ Database '{dbname}' berhasil dibuat!")
+            cur.close()
+            conn.close()
+        except psycopg2.errors.DuplicateDatabase:
+            print(f"ℹ️ Database '{dbname}' sudah ada. Lewatkan pembuatan.")
+        except Exception as e:
+            print(f"❌ Gagal membuat database: {e}")
+
+    def append(self, df: pd.DataFrame, table_name: str = None, use_copy: bool = True):
+        """Simpan data (append): COPY untuk bulk load, atau INSERT prepared untuk batch kecil."""
+        return self._report("append", self._append, df, table_name or self.table_name, use_copy)
+
+    def overwrite(self, df: pd.DataFrame, table_name: str = None):
+        """Tulis ulang tabel tanpa downtime (staging table lalu rename atomik)."""
+        return self._report("overwrite", self._overwrite, df, table_name or self.table_name)
+
+    def upsert(self, df: pd.DataFrame, table_name: str = None):
+        """Upsert idempoten berdasarkan product_key; hanya baris baru/berubah yang ditulis."""
+        return self._report("upsert", self._upsert, df, table_name or self.table_name)
+
+    def delete(self, product_keys, table_name: str = None):
+        """Hapus produk berdasarkan product_key (mis. delete dari ChangeSet CDC)."""
+        return self._report("delete", self._delete, list(product_keys), table_name or self.table_name)
+
+    def write(self, df: pd.DataFrame):
+        """Tulis satu chunk dengan mode bawaan; error diteruskan ke pemanggil (mis. save_chunks)."""
+        load = {"append": self._append, "overwrite": self._overwrite, "upsert": self._upsert}[self.mode]
+        written = load(df, self.table_name)
+        self.rows += len(df)
+        return written
 
-        for _, row in df.iterrows():
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+            self._prepared.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _report(self, mode, load, *args):
+        try:
+            print(f"🛢️ Menyimpan ke PostgreSQL ({mode})...")
+            written = load(*args)
+            print(f"✅ {written} baris berhasil disimpan ke PostgreSQL ({mode})!")
+            return written
+        except Exception as e:
+            print(f"❌ Gagal menyimpan ke PostgreSQL ({mode}): {e}")
+            return None
+
+    def _append(self, df, table_name, use_copy=True):
+        with self.transaction() as cursor:
+            self._ensure_table(cursor, table_name)
+            if use_copy:
+                copy_dataframe(cursor, df, table_name, self.chunk_size)
+            else:
+                statement = self._prepare_insert(cursor, table_name)
+                execute_batch(
+                    cursor,
+                    f"EXECUTE {statement} (%s, %s, %s, %s, %s, %s, %s)",
+                    list(df[PRODUCT_COLUMNS.split(", ")].itertuples(index=False)),
+                    page_size=1000,
+                )
+        self._ready.add(table_name)
+        return len(df)
+
+    def _overwrite(self, df, table_name):
+        with self.transaction() as cursor:
+            swap_in_table(cursor, df, table_name, self.chunk_size)
+        self._ready.add(table_name)
+        # Tabel baru hasil swap belum punya product_key; upsert/delete berikutnya harus menambahkannya lagi.
+        self._ready.discard((table_name, "product_key"))
+        return len(df)
+
+    def _upsert(self, df, table_name):
+        with self.transaction() as cursor:
+            if (table_name, "product_key") not in self._ready:
+                ensure_product_key(cursor, table_name)
+            keyed = df.assign(product_key=product_keys(df))[["product_key"] + PRODUCT_COLUMNS.split(", ")]
+            staging = f"{table_name}_upsert"
+            cursor.execute(f"CREATE TEMP TABLE {staging} (product_key TEXT, {PRODUCT_COLUMNS_DDL}) ON COMMIT DROP;")
+            copy_dataframe(cursor, keyed, staging, self.chunk_size)
+            cursor.execute(UPSERT_QUERY.format(table=table_name, staging=staging))
+            written = cursor.rowcount
+        self._ready.update({table_name, (table_name, "product_key")})
+        return written
+
+    def _delete(self, product_keys, table_name):
+        if not product_keys:
+            return 0
+        with self.transaction() as cursor:
+            if (table_name, "product_key") not in self._ready:
+                ensure_product_key(cursor, table_name)
+            cursor.execute(f"DELETE FROM {table_name} WHERE product_key = ANY(%s);", (product_keys,))
+            deleted = cursor.rowcount
+        self._ready.update({table_name, (table_name, "product_key")})
+        return deleted
+
+    def _ensure_table(self, cursor, table_name):
+        if table_name not in self._ready:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} ({PRODUCT_COLUMNS_DDL});")
+
+    def _prepare_insert(self, cursor, table_name):
+        statement = f"insert_{table_name}"
+        key = (id(cursor.connection), table_name)
+        if key not in self._prepared:
             cursor.execute(
-                f"INSERT INTO {table_name} (title, price, rating, colors, size, gender, timestamp) VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                tuple(row)
+                f"PREPARE {statement} (text, bigint, real, smallint, text, text, timestamp) AS "
+                f"INSERT INTO {table_name} ({PRODUCT_COLUMNS}) VALUES ($1, $2, $3, $4, $5, $6, $7);"
             )
+            self._prepared.add(key)
+        return statement
 
-        conn.commit()
-        cursor.close()
-        conn.close()
-        print("✅ Data berhasil disimpan ke PostgreSQL (append)!")
-        
-    except Exception as e:
-        print(f"❌ Gagal menyimpan ke PostgreSQL (append): {e}")
+    def _forget(self, conn):
+        # DDL dan PREPARE di transaksi yang gagal ikut batal: bangun ulang cache dari nol.
+        self._ready.clear()
+        self._prepared = {key for key in self._prepared if key[0] != id(conn)}
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("DEALLOCATE ALL;")
+            conn.commit()
+        except Exception:
+            conn.rollback()
 
 
-def save_to_postgres_overwrite(df: pd.DataFrame, db_config: dict, table_name: str = "fashion_products"):
-    """Simpan data ke PostgreSQL dengan cara overwrite (drop table lalu buat ulang)."""
-    try:
-        print("🛢️ Menyimpan ke PostgreSQL (overwrite)...")
-        conn = psycopg2.connect(**db_config)
-        cursor = conn.cursor()
+def copy_dataframe(cursor, df: pd.DataFrame, table_name: str, chunk_size: int = 50_000) -> int:
+    """Alirkan DataFrame ke tabel lewat COPY ... FROM STDIN (format CSV) per chunk dari buffer memori."""
+    copy_query = f"COPY {table_name} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv)"
+    for start in range(0, len(df), chunk_size):
+        buffer = io.StringIO()
+        df.iloc[start:start + chunk_size].to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+        cursor.copy_expert(copy_query, buffer)
+    return len(df)
 
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name};")
-        create_table_query = f"""
-        CREATE TABLE {table_name} (
-            title TEXT,
-            price FLOAT,
-            rating FLOAT,
-            colors INT,
-            size TEXT,
-            gender TEXT,
-            timestamp TIMESTAMP
-        );
-        """
-        cursor.execute(create_table_query)
-        conn.commit()
-
-        insert_query = f"""
-        INSERT INTO {table_name} (title, price, rating, colors, size, gender, timestamp)
-        VALUES %s
-        """
-        data_tuples = [tuple(row) for row in df.itertuples(index=False)]
-        execute_values(cursor, insert_query, data_tuples)
-
-        conn.commit()
-        cursor.close()
-        conn.close()
-        print("✅ Data berhasil ditulis ulang ke PostgreSQL (overwrite)!")
 
-    except Exception as e:
-        print(f"❌ Gagal menyimpan ke PostgreSQL (overwrite): {e}")
\ No newline at end of file
+def swap_in_table(cursor, df: pd.DataFrame, table_name: str, chunk_size: int = 50_000):
+    """Bulk-load ke `<table>_staging`, bangun index di sana, lalu tukar dengan tabel aktif.
+
+    Semua langkah berjalan dalam transaksi pemanggil: pembaca tetap melihat tabel
+    lama sampai COMMIT, dan kegagalan di tengah jalan membiarkan tabel lama utuh.
+    Lock eksklusif pada tabel aktif hanya diambil saat rename di akhir.
+    """
+    for statement in staging_table_statements(table_name):
+        cursor.execute(statement)
+    copy_dataframe(cursor, df, f"{table_name}_staging", chunk_size)
+    for statement in swap_table_statements(table_name):
+        cursor.execute(statement)
+
+
+def staging_table_statements(table_name: str) -> list:
+    """SQL untuk menyiapkan `<table>_staging` yang kosong sebelum bulk-load."""
+    staging = f"{table_name}_staging"
+    return [
+        f"DROP TABLE IF EXISTS {staging};",
+        f"CREATE TABLE {staging} ({PRODUCT_COLUMNS_DDL});",
+    ]
+
+
+def swap_table_statements(table_name: str) -> list:
+    """SQL untuk membangun index di `<table>_staging` lalu menukarnya dengan tabel aktif."""
+    staging, old = f"{table_name}_staging", f"{table_name}_old"
+    statements = [
+        f"CREATE INDEX {_index_name(staging, columns)} ON {staging} ({', '.join(columns)});"
+        for columns in PRODUCT_INDEXES
+    ]
+    statements += [
+        f"ANALYZE {staging};",
+        f"ALTER TABLE IF EXISTS {table_name} RENAME TO {old};",
+        f"ALTER TABLE {staging} RENAME TO {table_name};",
+        f"DROP TABLE IF EXISTS {old};",
+    ]
+    statements += [
+        f"ALTER INDEX {_index_name(staging, columns)} RENAME TO {_index_name(table_name, columns)};"
+        for columns in PRODUCT_INDEXES
+    ]
+    return statements
+
+
+def _index_name(table_name: str, columns) -> str:
+    return f"{table_name}_{'_'.join(columns)}_idx"
+
+
+UPSERT_QUERY = """
+INSERT INTO {table} AS t (product_key, title, price, rating, colors, size, gender, timestamp)
+SELECT DISTINCT ON (product_key) product_key, title, price, rating, colors, size, gender, timestamp
+FROM {staging}
+ORDER BY product_key, timestamp DESC
+ON CONFLICT (product_key) DO UPDATE
+SET price = EXCLUDED.price, rating = EXCLUDED.rating, colors = EXCLUDED.colors, timestamp = EXCLUDED.timestamp
+WHERE (t.price, t.rating, t.colors) IS DISTINCT FROM (EXCLUDED.price, EXCLUDED.rating, EXCLUDED.colors)
+"""
+
+
+def ensure_product_key(cursor, table_name: str):
+    """Pastikan tabel punya kolom product_key unik; tabel lama tanpa kunci diisi ulang dan diduplikasi-bersihkan sekali."""
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name} (product_key TEXT, {PRODUCT_COLUMNS_DDL});")
+    cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS product_key TEXT;")
+    cursor.execute(
+        f"UPDATE {table_name} SET product_key = md5(concat_ws('|', {', '.join(PRODUCT_IDENTITY)})) "
+        f"WHERE product_key IS NULL;"
+    )
+    if cursor.rowcount > 0:
+        # Sisakan baris terbaru (ctid terbesar) untuk setiap produk dari hasil append lama.
+        cursor.execute(
+            f"DELETE FROM {table_name} a USING {table_name} b "
+            f"WHERE a.product_key = b.product_key AND a.ctid < b.ctid;"
+        )
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {table_name}_product_key_idx ON {table_name} (product_key);")
+
+
+# Kolom tabel produk di SQLite; timestamp disimpan sebagai teks lebar tetap agar urutan teks = urutan waktu.
+SQLITE_COLUMNS_DDL = "title TEXT, price INTEGER, rating REAL, colors INTEGER, size TEXT, gender TEXT, timestamp TEXT"
+SQLITE_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
+
+
+class SqliteSink:
+    """Sink SQLite lokal ber-index (gender+size, price, rating) untuk query cepat lewat utils/store.py.
+
+    `overwrite` menghapus, membuat ulang, mengisi, dan meng-index tabel dalam satu
+    transaksi eksplisit (DDL di SQLite ikut transaksi), jadi pembaca melihat tabel lama atau
+    tabel baru yang lengkap. `append` menambah baris ke tabel yang ada. Database
+    memakai WAL agar pembaca tidak terblokir selama penulisan.
+    """
+
+    name = "SQLite"
+    MODES = ("overwrite", "append")
+
+    def __init__(self, path: str = "products.db", table_name: str = "products", mode: str = "overwrite"):
+        if mode not in self.MODES:
+            raise ValueError(f"mode harus salah satu dari {self.MODES}, bukan {mode!r}")
+        self.path = path
+        self.table_name = table_name
+        self.mode = mode
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> int:
+        table = self.table_name
+        columns = PRODUCT_COLUMNS.split(", ")
+        # Rating float32 dilebarkan lewat str (4.8, bukan 4.800000190734863) agar filter batas tepat.
+        rows = df[columns].astype({"size": object, "gender": object}).assign(
+            rating=df["rating"].map(lambda rating: round(float(str(rating)), 2)),
+            timestamp=pd.to_datetime(df["timestamp"], format="ISO8601").dt.strftime(SQLITE_TIMESTAMP_FORMAT),
+        ).itertuples(index=False, name=None)
+
+        # isolation_level=None + BEGIN eksplisit: modul sqlite3 tidak membuka transaksi sebelum DDL,
+        # sehingga DROP/CREATE akan langsung di-commit tanpa ini.
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("BEGIN IMMEDIATE;")
+            try:
+                if self.mode == "overwrite":
+                    conn.execute(f"DROP TABLE IF EXISTS {table};")
+                conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({SQLITE_COLUMNS_DDL});")
+                conn.executemany(f"INSERT INTO {table} ({PRODUCT_COLUMNS}) VALUES ({', '.join('?' * len(columns))});",
+                                 rows)
+                for index_columns in PRODUCT_INDEXES:
+                    conn.execute(f"CREATE INDEX IF NOT EXISTS {_index_name(table, index_columns)} "
+                                 f"ON {table} ({', '.join(index_columns)});")
+            except BaseException:
+                conn.execute("ROLLBACK;")
+                raise
+            conn.execute("COMMIT;")
+            conn.execute(f"ANALYZE {table};")
+        finally:
+            conn.close()
+        self.rows += len(df)
+        return len(df)
+
+    def close(self):
+        pass
+
+
+class CsvChunkWriter:
+    """Penulis CSV per chunk: chunk pertama menulis header, berikutnya append."""
+
+    name = "CSV"
+    # File lokal ini selalu berisi snapshot lengkap; dengan CDC ia ditulis ulang, bukan diberi delta.
+    full_snapshot = True
+
+    def __init__(self, filename: str = "products.csv", compression=None):
+        self.filename = filename
+        # gzip/bz2/xz/zstd boleh di-append: tiap chunk menjadi member/frame baru dalam file yang sama.
+        self.compression = compression
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self.filename, mode='a' if self.rows else 'w', header=not self.rows, index=False,
+                  compression=self.compression)
+        self.rows += len(df)
+
+    def close(self):
+        pass
+
+
+def save_chunks(chunks, writers: list) -> int:
+    """Alirkan setiap chunk ke semua writer; writer yang gagal dilewati tanpa menghentikan yang lain."""
+    active = list(writers)
+    total = 0
+    for chunk in chunks:
+        for writer in list(active):
+            try:
+                writer.write(chunk)
+            except Exception as e:
+                print(f"❌ Gagal menulis chunk ke {writer.name}: {e}")
+                active.remove(writer)
+        total += len(chunk)
+
+    for writer in writers:
+        try:
+            writer.close()
+        except Exception as e:
+            print(f"❌ Gagal menutup {writer.name}: {e}")
+    for writer in active:
+        print(f"✅ {writer.rows} baris berhasil disimpan ke {writer.name}")
+    return total
+
+
+SinkResult = namedtuple("SinkResult", ["name", "ok", "seconds", "rows", "error"])
+
+
+def run_sinks(df: pd.DataFrame, sinks: list, max_workers: int = None) -> list:
+    """Tulis satu DataFrame (dibaca bersama, tidak diubah) ke semua sink secara paralel.
+
+    Setiap sink berjalan di thread sendiri sehingga total waktu mengikuti sink
+    paling lambat. Kegagalan satu sink dicatat di hasilnya tanpa memengaruhi sink lain.
+    """
+    def timed(sink):
+        start = time.perf_counter()
+        with observe(f"load:{sink.name}", rows_in=len(df)) as stage:
+            try:
+                written = sink.write(df)
+            except Exception as e:
+                return SinkResult(sink.name, False, time.perf_counter() - start, 0, e)
+            stage.rows_out = len(df) if written is None else written
+            return SinkResult(sink.name, True, time.perf_counter() - start, stage.rows_out, None)
+
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(sinks), 1)) as executor:
+        results = list(executor.map(timed, sinks))
+
+    for result in results:
+        if result.ok:
+            print(f"✅ {result.name}: {result.rows} baris dalam {result.seconds:.2f} detik")
+        else:
+            print(f"❌ {result.name}: gagal setelah {result.seconds:.2f} detik: {result.error}")
+    return results
@@ -0,0 +1,203 @@
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from utils.fileio import atomic_write
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_active = None
+
+
+class StageStats:
+    """Totals for one named stage, summed over every call (and every thread)."""
+
+    FIELDS = ("calls", "wall_seconds", "cpu_seconds", "bytes", "rows_in", "rows_out", "peak_memory_bytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.bytes = 0
+        self.rows_in = 0
+        self.rows_out = 0
+        self.peak_memory_bytes = 0
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class Observation:
+    """Handle yielded by a stage so the code inside it can report sizes."""
+
+    def __init__(self, rows_in=None):
+        self.bytes = 0
+        self.rows_in = rows_in or 0
+        self.rows_out = 0
+
+
+class RunMetrics:
+    """Per-stage wall/CPU time, bytes, row counts and peak memory for one ETL run.
+
+    Stages are recorded with `stage(name)` or, from library code, with the
+    module-level `observe(name)`, which is a no-op unless a RunMetrics is
+    active. CPU time is the calling thread's, so stages running in worker
+    threads add up their own CPU. Peak memory is the process' peak RSS, or the
+    tracemalloc peak during the stage with `trace_memory=True` (slower, and
+    shared between stages that overlap in time). `profile=True` runs cProfile
+    on the activating thread while the metrics are active.
+    """
+
+    def __init__(self, trace_memory=False, profile=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.profiler = cProfile.Profile() if profile else None
+        self._lock = threading.Lock()
+        self._previous = None
+        self._started = None
+
+    def activate(self):
+        global _active
+        self._previous, _active = _active, self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._started = (time.perf_counter(), time.process_time())
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def deactivate(self):
+        global _active
+        if self.profiler is not None:
+            self.profiler.disable()
+        wall, cpu = self._started
+        self.wall_seconds += time.perf_counter() - wall
+        self.cpu_seconds += time.process_time() - cpu
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        _active = self._previous
+
+    def __enter__(self):
+        return self.activate()
+
+    def __exit__(self, *exc):
+        self.deactivate()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        observation = Observation(rows_in)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield observation
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            peak = self._peak_memory()
+            with self._lock:
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats(name)
+                stats.calls += 1
+                stats.wall_seconds += wall
+                stats.cpu_seconds += cpu
+                stats.bytes += observation.bytes
+                stats.rows_in += observation.rows_in
+                stats.rows_out += observation.rows_out
+                stats.peak_memory_bytes = max(stats.peak_memory_bytes, peak)
+
+    def _peak_memory(self):
+        if self.trace_memory and tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[1]
+        return peak_rss()
+
+    def as_dict(self):
+        with self._lock:
+            stages = {name: stats.as_dict() for name, stats in self.stages.items()}
+        return {
+            "wall_seconds": self.wall_seconds,
+            "cpu_seconds": self.cpu_seconds,
+            "peak_memory_bytes": peak_rss(),
+            "stages": stages,
+        }
+
+    def summary(self):
+        lines = [f"{'stage':<24}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'MB':>10}{'rows in':>10}{'rows out':>10}{'peak MB':>10}"]
+        for name, stats in self.as_dict()["stages"].items():
+            lines.append(
+                f"{name:<24}{stats['calls']:>7}{stats['wall_seconds']:>10.3f}{stats['cpu_seconds']:>10.3f}"
+                f"{stats['bytes'] / 1e6:>10.2f}{stats['rows_in']:>10}{stats['rows_out']:>10}"
+                f"{stats['peak_memory_bytes'] / 1e6:>10.1f}"
+            )
+        lines.append(f"total: {self.wall_seconds:.3f} s wall, {self.cpu_seconds:.3f} s CPU, peak RSS {peak_rss() / 1e6:.1f} MB")
+        return "\n".join(lines)
+
+    def print_summary(self, profile_top=15):
+        print("\n📊 Ringkasan run:")
+        print(self.summary())
+        if self.profiler is not None:
+            print(self.profile_report(profile_top))
+
+    def profile_report(self, top=15):
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(top)
+        return stream.getvalue()
+
+    def write_profile(self, path):
+        """Dump the cProfile data, e.g. for `snakeviz` or `python -m pstats`."""
+        self.profiler.dump_stats(path)
+
+    def write_json(self, path):
+        atomic_write(path, json.dumps(self.as_dict(), indent=2))
+
+    def write_prometheus(self, path, prefix="etl"):
+        """Write a node_exporter textfile-collector file (replaced atomically)."""
+        report = self.as_dict()
+        lines = []
+        for field in StageStats.FIELDS:
+            metric = f"{prefix}_stage_{field}"
+            lines.append(f"# TYPE {metric} gauge")
+            for name, stats in report["stages"].items():
+                lines.append(f'{metric}{{stage="{_escape_label(name)}"}} {stats[field]}')
+        for field in ("wall_seconds", "cpu_seconds", "peak_memory_bytes"):
+            lines.append(f"# TYPE {prefix}_run_{field} gauge")
+            lines.append(f"{prefix}_run_{field} {report[field]}")
+        atomic_write(path, "\n".join(lines) + "\n")
+
+
+@contextmanager
+def observe(name, rows_in=None):
+    """Record a stage on the active RunMetrics; without one, just run the block."""
+    metrics = _active
+    if metrics is None:
+        yield Observation(rows_in)
+        return
+    with metrics.stage(name, rows_in) as observation:
+        yield observation
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes (0 where unavailable)."""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
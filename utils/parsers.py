@@ -0,0 +1,85 @@
+from datetime import datetime
+
+from utils.fields import parse_paragraph, parse_paragraph_typed, parse_price
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # lxml is optional; the BeautifulSoup parser stays available
+    etree = lxml_html = None
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if etree is not None:
+    _CARDS = etree.XPath(f"//div[{_has_class('collection-card')}]")
+    _NEXT = etree.XPath(f"boolean(//li[{_has_class('next')}])")
+    _DETAILS = etree.XPath(f"(.//div[{_has_class('product-details')}])[1]")
+    _TITLE = etree.XPath(f"(.//h3[{_has_class('product-title')}])[1]")
+    _PRICE_CONTAINER = etree.XPath(f"(.//div[{_has_class('price-container')}])[1]")
+    _PRICE = etree.XPath(f"(.//span[{_has_class('price')}])[1]")
+    _PARAGRAPHS = etree.XPath(".//p")
+
+
+def lxml_available():
+    return etree is not None
+
+
+def build_record(title, price, paragraph_texts, typed=False):
+    """Same field rules as extract_fashion_data, applied to already-extracted texts.
+
+    With `typed=True`, price, rating and colors are parsed into numbers (see utils.fields).
+    """
+    classify = parse_paragraph_typed if typed else parse_paragraph
+    fields = {"rating": None, "colors": None, "size": None, "gender": None}
+    for text in paragraph_texts:
+        field, value = classify(text)
+        if field is not None:
+            fields[field] = value
+
+    return {
+        "title": title,
+        "price": parse_price(price) if typed else price,
+        **fields,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def _first_text(xpath, node):
+    found = xpath(node)
+    return found[0].text_content().strip() if found else None
+
+
+def extract_fashion_data_lxml(card, typed=False):
+    details = _DETAILS(card)
+    if not details:
+        return {}
+    details = details[0]
+
+    price = None
+    container = _PRICE_CONTAINER(details)
+    if container:
+        price = _first_text(_PRICE, container[0])
+
+    texts = [p.text_content().strip() for p in _PARAGRAPHS(details)]
+    return build_record(_first_text(_TITLE, details), price, texts, typed)
+
+
+def parse_page_lxml(html, typed=False):
+    """Parse a catalog page with lxml and precompiled XPath selectors. Returns (records, has_next)."""
+    if etree is None:
+        raise ImportError("lxml is not installed; use parser='html.parser'")
+
+    if isinstance(html, bytes):
+        try:
+            html = html.decode('utf-8')
+        except UnicodeDecodeError:
+            from bs4.dammit import UnicodeDammit
+            html = UnicodeDammit(html).unicode_markup
+    if not html.strip():
+        return [], False
+
+    root = lxml_html.document_fromstring(html)
+    return [extract_fashion_data_lxml(card, typed) for card in _CARDS(root)], bool(_NEXT(root))
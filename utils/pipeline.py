@@ -0,0 +1,509 @@
+import argparse
+import asyncio
+import copy
+import json
+import shutil
+import sys
+import time
+import pandas as pd
+from utils.async_pipeline import AsyncPostgresSink, run_async_pipeline
+from utils.cdc import ChangeTracker
+from utils.checkpoint import CrawlCheckpoint
+from utils.discovery import discover_page_count, discover_pages
+from utils.extract import HEADERS, iter_batches, iter_pages, page_url, scrape_pages_pipelined, set_default_client
+from utils.fields import cache_stats
+from utils.http_cache import ResponseCache
+from utils.http_client import HttpClient
+from utils.load import CsvChunkWriter, ParquetSink, PostgresSink, SheetsSink, SqliteSink, run_sinks, save_chunks
+from utils.metrics import RunMetrics
+from utils.transform import apply_output_schema, transform_fashion_data, transform_fashion_data_chunks
+from utils.work_queue import CrawlQueue, iter_shards, next_unqueued_page, run_workers
+
+STAGES = ("extract", "transform", "load")
+SINKS = ("csv", "parquet", "sheets", "postgres", "sqlite")
+
+DEFAULT_CONFIG = {
+    "base_url": "https://fashion-studio.dicoding.dev/",
+    "stages": list(STAGES),
+    # Hand-off antar tahap saat tidak semua tahap dijalankan: extract menulis raw_path,
+    # transform membacanya; transform menulis clean_path, load membacanya.
+    "raw_path": None,
+    "clean_path": None,
+    # Jika diisi, seluruh tahap berjalan per chunk (mode streaming) dengan ukuran ini.
+    "chunk_size": None,
+    # Jalankan seluruh pipeline di asyncio (aiohttp + asyncpg) dengan antrean terbatas antar tahap.
+    "async": False,
+    # Isi path SQLite untuk CDC: hanya delta (baru/berubah/dihapus) yang dimuat, riwayat harga/rating disimpan.
+    "cdc": {"state": None},
+    "preview": False,
+    "extract": {
+        "max_workers": 1,
+        "rate_limit": None,
+        "delay": 1,
+        "parser": "html.parser",
+        "pipelined": False,
+        "parse_workers": None,
+        "http_cache": ".http_cache",
+        "checkpoint": ".crawl_checkpoint",
+        "resume": True,
+        # Parse price/rating/colors menjadi angka saat extract (parser ter-memo, lihat utils/fields.py),
+        # sehingga transform melewati regex untuk kolom tersebut.
+        "typed_fields": False,
+        # Hitung jumlah halaman dulu (teks "Page 1 of N" atau probe + binary search) agar fetcher
+        # paralel/pipelined/async bisa menjadwalkan semua halaman tanpa mengikuti link next.
+        "discover_pages": False,
+    },
+    # Mode antrean terdistribusi: halaman dimasukkan ke antrean SQLite `path`, diambil oleh `workers`
+    # proses lokal (0 = hanya menunggu worker di node lain, lihat utils/work_queue.py), lalu shard digabung.
+    "queue": {"path": None, "shards": "crawl_shards", "workers": 4, "lease_seconds": 60, "max_attempts": 3},
+    # Bawaan hanya sink lokal; "sheets" dan "postgres" butuh kredensial, aktifkan lewat file konfigurasi
+    # (lihat config.example.json) atau --sinks.
+    "sinks": ["csv", "parquet"],
+    "csv": {"filename": "products.csv", "compression": None},
+    "parquet": {"root": "products_parquet", "compression": "zstd"},
+    "sheets": {"keyfile": "google-sheets-api.json", "spreadsheet_id": None, "sheet_name": "Sheet1"},
+    "postgres": {
+        "db_config": {"host": "localhost", "port": 5432, "database": "fashion_db", "user": "postgres"},
+        "table_name": "fashion_products",
+        "mode": "overwrite",
+        "create_database": True,
+    },
+    # Store lokal ber-index untuk query lewat utils/store.py; tambahkan "sqlite" ke "sinks" untuk memakainya.
+    "sqlite": {"path": "products.db", "table_name": "products", "mode": "overwrite"},
+    "metrics": {"json": "run_metrics.json", "prometheus": None, "profile": None},
+}
+
+
+def load_config(path: str = None, overrides: dict = None) -> dict:
+    """Gabungkan DEFAULT_CONFIG, file JSON (opsional), dan override (mis. dari argumen CLI)."""
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            _merge(config, json.load(f))
+    if overrides:
+        _merge(config, overrides)
+
+    unknown = set(config["stages"]) - set(STAGES)
+    if unknown:
+        raise ValueError(f"Tahap tidak dikenal: {sorted(unknown)}; pilih dari {STAGES}")
+    unknown = set(config["sinks"]) - set(SINKS)
+    if unknown:
+        raise ValueError(f"Sink tidak dikenal: {sorted(unknown)}; pilih dari {SINKS}")
+    if config["cdc"]["state"] and (config["chunk_size"] or config["async"]):
+        raise ValueError("CDC butuh snapshot lengkap; tidak bisa digabung dengan chunk_size atau async")
+    if config["queue"]["path"] and config["async"]:
+        raise ValueError("Mode antrean (queue) tidak bisa digabung dengan async")
+    if "sheets" in config["sinks"] and not config["sheets"]["spreadsheet_id"]:
+        raise ValueError("Sink Google Sheets butuh sheets.spreadsheet_id di file konfigurasi")
+    check_sinks(config, execution_mode(config))
+    return config
+
+
+def execution_mode(config: dict) -> str:
+    """Mode yang akan dipakai run_pipeline: "async", "streaming", "cdc", atau "batch"."""
+    full_run = set(config["stages"]) == set(STAGES)
+    if config["async"] and full_run:
+        return "async"
+    if config["chunk_size"] and full_run:
+        return "streaming"
+    if config["cdc"]["state"] and "load" in config["stages"]:
+        return "cdc"
+    return "batch"
+
+
+def check_sinks(config: dict, mode: str = "batch"):
+    """Tolak sink yang tidak cocok dengan mode eksekusi.
+
+    Mode streaming/async (chunk) dan CDC (delta) tidak mengirim snapshot lengkap, jadi hanya sink
+    yang bisa menambah data yang diizinkan: Google Sheets ditolak, SQLite harus `append` dan tidak
+    bisa dipakai dengan CDC, PostgreSQL harus `append`/`upsert` untuk streaming, `append`/`overwrite`
+    untuk async (AsyncPostgresSink), dan `upsert` untuk CDC.
+    """
+    if mode == "batch":
+        return
+    sinks = config["sinks"]
+    if "sheets" in sinks:
+        raise ValueError("Google Sheets butuh snapshot lengkap; tidak bisa dipakai dengan chunk_size, async, atau CDC")
+    if "sqlite" in sinks:
+        if mode == "cdc":
+            raise ValueError("SQLite tidak mendukung upsert/delete; tidak bisa dipakai dengan CDC")
+        if config["sqlite"]["mode"] == "overwrite":
+            raise ValueError("Mode streaming (chunk_size/async) butuh SQLite 'append'")
+    if "postgres" in sinks:
+        postgres_mode = config["postgres"]["mode"]
+        if mode == "streaming" and postgres_mode == "overwrite":
+            raise ValueError("Mode streaming (chunk_size) butuh PostgreSQL 'append' atau 'upsert'")
+        if mode == "async" and postgres_mode not in AsyncPostgresSink.MODES:
+            raise ValueError(f"Mode async butuh PostgreSQL {' atau '.join(map(repr, AsyncPostgresSink.MODES))}")
+        if mode == "cdc" and postgres_mode != "upsert":
+            raise ValueError("CDC butuh PostgreSQL mode 'upsert' agar delta dan delete diterapkan per produk")
+
+
+def _merge(base: dict, update: dict):
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+
+
+def build_sinks(config: dict, streaming: bool = False, incremental: bool = False) -> list:
+    """Buat objek sink sesuai `config["sinks"]` (kombinasi yang tidak valid ditolak oleh check_sinks).
+
+    Pada mode streaming, Parquet memakai `existing="replace_once"`; CSV dan Parquet dengan CDC tetap
+    menerima snapshot lengkap (lihat `full_snapshot`).
+    """
+    check_sinks(config, "cdc" if incremental else "streaming" if streaming else "batch")
+    sinks = []
+    for name in config["sinks"]:
+        if name == "csv":
+            sinks.append(CsvChunkWriter(config["csv"]["filename"], compression=config["csv"]["compression"]))
+        elif name == "parquet":
+            sinks.append(ParquetSink(config["parquet"]["root"], compression=config["parquet"]["compression"],
+                                     existing="replace_once" if streaming else "replace"))
+        elif name == "sheets":
+            sheets = config["sheets"]
+            sinks.append(SheetsSink(sheets["keyfile"], sheets["spreadsheet_id"], sheets["sheet_name"]))
+        elif name == "postgres":
+            postgres = config["postgres"]
+            sink = PostgresSink(postgres["db_config"], table_name=postgres["table_name"], mode=postgres["mode"])
+            if postgres["create_database"]:
+                sink.create_database()
+            sinks.append(sink)
+        elif name == "sqlite":
+            sqlite = config["sqlite"]
+            sinks.append(SqliteSink(sqlite["path"], table_name=sqlite["table_name"], mode=sqlite["mode"]))
+    return sinks
+
+
+def run_pipeline(config: dict = None) -> dict:
+    """Jalankan tahap ETL yang dipilih dan kembalikan statistik run (baris per tahap, hasil sink, metrik)."""
+    config = config or load_config()
+    stages = config["stages"]
+    extract = config["extract"]
+    stats = {"stages": list(stages), "rows_extracted": None, "rows_transformed": None, "sinks": {}}
+
+    cache = None
+    if "extract" in stages:
+        cache = ResponseCache(extract["http_cache"]) if extract["http_cache"] else None
+        set_default_client(HttpClient(headers=HEADERS, cache=cache, pool_size=max(16, extract["max_workers"])))
+
+    field_cache = cache_stats()
+    metrics = RunMetrics(profile=bool(config["metrics"]["profile"])).activate()
+    try:
+        if config["async"] and set(stages) == set(STAGES):
+            _run_async(config, stats)
+        elif config["chunk_size"] and set(stages) == set(STAGES):
+            _run_streaming(config, stats)
+        else:
+            _run_batch(config, stats)
+    finally:
+        metrics.deactivate()
+        if cache is not None:
+            cache.flush()
+
+    metrics.print_summary()
+    stats["field_cache"] = cache_stats(field_cache)
+    _print_field_cache(stats["field_cache"])
+    if config["metrics"]["json"]:
+        metrics.write_json(config["metrics"]["json"])
+    if config["metrics"]["prometheus"]:
+        metrics.write_prometheus(config["metrics"]["prometheus"])
+    if config["metrics"]["profile"]:
+        metrics.write_profile(config["metrics"]["profile"])
+    stats["metrics"] = metrics.as_dict()
+    return stats
+
+
+def _total_pages(config: dict):
+    extract = config["extract"]
+    if not extract["discover_pages"]:
+        return None
+    total = discover_page_count(config["base_url"], extract["parser"])
+    if not total:
+        print("⚠️ Jumlah halaman tidak dapat ditemukan; mengikuti pagination")
+        return None
+    print(f"🔎 Ditemukan {total} halaman katalog")
+    return total
+
+
+def _pages(config: dict):
+    extract = config["extract"]
+    base_url = config["base_url"]
+    if config["queue"]["path"]:
+        return _queue_pages(config)
+    # Jalur sekuensial tetap mengikuti link next, jadi discovery hanya dipakai fetcher paralel.
+    total_pages = _total_pages(config) if extract["pipelined"] or extract["max_workers"] > 1 else None
+    if extract["pipelined"]:
+        # Pipeline fetch/parse tidak memakai checkpoint.
+        return scrape_pages_pipelined(base_url, fetch_workers=extract["max_workers"],
+                                      parse_workers=extract["parse_workers"],
+                                      rate_limit=extract["rate_limit"], parser=extract["parser"],
+                                      typed=extract["typed_fields"], total_pages=total_pages)
+    checkpoint = None
+    if extract["checkpoint"]:
+        checkpoint = CrawlCheckpoint(extract["checkpoint"], base_url, typed=extract["typed_fields"])
+    return iter_pages(base_url, extract["delay"], extract["max_workers"], extract["rate_limit"],
+                      extract["parser"], checkpoint, extract["resume"], extract["typed_fields"], total_pages)
+
+
+def _queue_pages(config: dict):
+    extract = config["extract"]
+    options = config["queue"]
+    queue = CrawlQueue(options["path"], options["lease_seconds"], options["max_attempts"])
+    # Antrean dari katalog lain atau --no-resume: mulai dari awal, seperti checkpoint.
+    if not extract["resume"] or (len(queue) and queue.url(1) != page_url(config["base_url"], 1)):
+        queue.clear()
+
+    if len(queue):
+        queue.requeue_failed()
+        print(f"🗂️  Melanjutkan antrean {options['path']}: {queue.counts()}")
+    else:
+        urls = discover_pages(config["base_url"], extract["parser"])
+        queue.enqueue(urls)
+        print(f"🗂️  {len(urls)} halaman dimasukkan ke antrean {options['path']}")
+
+    while True:
+        if options["workers"]:
+            run_workers(queue, options["shards"], options["workers"], extract["parser"], extract["typed_fields"],
+                        extract["rate_limit"])
+        while not queue.finished():
+            time.sleep(1)  # halaman yang masih di-lease worker di node lain
+        # Discovery bisa kurang hitung; lanjutkan selama halaman terakhir masih punya link next.
+        page = next_unqueued_page(queue, options["shards"])
+        if page is None:
+            break
+        print(f"⚠️ Halaman {page - 1} masih punya link next; halaman {page} ditambahkan ke antrean")
+        queue.enqueue([page_url(config["base_url"], page)], start=page)
+
+    counts = queue.counts()
+    if counts["failed"]:
+        print(f"⚠️ {counts['failed']} halaman gagal di-scrape; jalankan ulang untuk mencoba lagi")
+    yield from iter_shards(queue, options["shards"])
+    if counts["failed"]:
+        return False
+    queue.clear()
+    shutil.rmtree(options["shards"], ignore_errors=True)
+    return True
+
+
+def _until_end(pages, crawl: dict):
+    """Teruskan halaman dari `pages` dan catat di `crawl["complete"]` apakah crawl sampai halaman terakhir."""
+    crawl["complete"] = bool((yield from pages))
+
+
+def _run_batch(config: dict, stats: dict):
+    stages = config["stages"]
+    df = None
+    # Tanpa tahap extract, data handoff dianggap snapshot lengkap.
+    crawl = {"complete": True}
+
+    # 1. Extract
+    if "extract" in stages:
+        print("🚀 Memulai scraping data...")
+        df = pd.DataFrame([record for page in _until_end(_pages(config), crawl) for record in page])
+        stats["rows_extracted"] = len(df)
+        if config["raw_path"]:
+            df.to_csv(config["raw_path"], index=False)
+        _preview(config, df, "📌 5 Produk Teratas:", "📌 5 Produk Terakhir:")
+
+    # 2. Transform
+    if "transform" in stages:
+        if df is None:
+            df = _read_handoff(config, "raw_path", "transform", dtype=str)
+        print("\n⚙️  Melakukan transformasi data...")
+        df = transform_fashion_data(df)
+        stats["rows_transformed"] = len(df)
+        if config["clean_path"]:
+            df.to_csv(config["clean_path"], index=False)
+        _preview(config, df, "✅ 5 Data Teratas Setelah Transformasi:", "✅ 5 Data Terakhir Setelah Transformasi:")
+
+    # 3. Load
+    if "load" in stages:
+        if df is None:
+            df = apply_output_schema(_read_handoff(config, "clean_path", "load"))
+        tracker = changes = None
+        snapshot = df
+        if config["cdc"]["state"]:
+            # CDC: hanya produk baru/berubah yang dikirim ke sink, produk yang hilang dihapus.
+            tracker = ChangeTracker(config["cdc"]["state"])
+            # Crawl yang berhenti di tengah (fetch gagal) bukan snapshot lengkap: produk di halaman
+            # berikutnya tidak boleh dianggap terhapus.
+            if not crawl["complete"]:
+                print("⚠️ Crawl tidak sampai halaman terakhir; produk yang hilang tidak dihapus pada run ini")
+            changes = tracker.diff(df, detect_deletes=crawl["complete"])
+            stats["changes"] = changes.counts()
+            print(f"\n🔁 CDC: {len(changes.inserts)} baru, {len(changes.updates)} berubah, "
+                  f"{len(changes.deletes)} dihapus")
+            df = changes.upserts
+
+        print("\n📦 Menyimpan ke semua sink...")
+        sinks = build_sinks(config, incremental=tracker is not None)
+        # Dengan CDC, sink snapshot (CSV, Parquet) ditulis ulang dengan seluruh produk; sink lain hanya menerima delta.
+        full = [sink for sink in sinks if changes is not None and getattr(sink, "full_snapshot", False)]
+        delta = [sink for sink in sinks if sink not in full]
+        try:
+            for result in run_sinks(df, delta) + (run_sinks(snapshot, full) if full else []):
+                stats["sinks"][result.name] = {
+                    "ok": result.ok,
+                    "rows": result.rows,
+                    "seconds": result.seconds,
+                    "error": None if result.error is None else str(result.error),
+                }
+            if changes is not None and len(changes.deletes):
+                for sink in sinks:
+                    if hasattr(sink, "delete") and stats["sinks"][sink.name]["ok"]:
+                        stats["sinks"][sink.name]["ok"] = sink.delete(changes.deletes["product_key"]) is not None
+        finally:
+            for sink in sinks:
+                sink.close()
+
+        # State CDC hanya maju jika semua sink berhasil; jika tidak, delta yang sama dikirim ulang run berikutnya.
+        if tracker is not None and all(result["ok"] for result in stats["sinks"].values()):
+            tracker.commit(changes)
+
+
+def _run_streaming(config: dict, stats: dict):
+    sinks = build_sinks(config, streaming=True)
+    extracted = [0]
+
+    def counted(batches):
+        for batch in batches:
+            extracted[0] += len(batch)
+            yield batch
+
+    print(f"🚀 Memulai ETL streaming (chunk {config['chunk_size']} baris)...")
+    chunks = transform_fashion_data_chunks(counted(iter_batches(_pages(config), config["chunk_size"])))
+    stats["rows_transformed"] = save_chunks(chunks, sinks)
+    stats["rows_extracted"] = extracted[0]
+    for sink in sinks:
+        stats["sinks"][sink.name] = {
+            "ok": sink.rows == stats["rows_transformed"],
+            "rows": sink.rows,
+            "seconds": None,
+            "error": None,
+        }
+
+
+def _run_async(config: dict, stats: dict):
+    extract = config["extract"]
+    sinks = []
+    for name in config["sinks"]:
+        if name == "postgres":
+            postgres = config["postgres"]
+            if postgres["create_database"]:
+                PostgresSink(postgres["db_config"]).create_database()
+            sinks.append(AsyncPostgresSink(postgres["db_config"], postgres["table_name"], postgres["mode"]))
+        else:
+            sinks.extend(build_sinks(dict(config, sinks=[name]), streaming=True))
+
+    print("🚀 Memulai ETL async...")
+    result = asyncio.run(run_async_pipeline(
+        config["base_url"], sinks, batch_size=config["chunk_size"] or 500,
+        max_concurrency=max(extract["max_workers"], 1), rate_limit=extract["rate_limit"], parser=extract["parser"],
+        typed=extract["typed_fields"], total_pages=_total_pages(config),
+    ))
+    stats.update(result)
+
+
+def _read_handoff(config: dict, key: str, stage: str, dtype=None) -> pd.DataFrame:
+    path = config[key]
+    if not path:
+        raise ValueError(f"Tahap {stage} tanpa tahap sebelumnya membutuhkan `{key}`")
+    return pd.read_csv(path, dtype=dtype)
+
+
+def _print_field_cache(field_cache: dict):
+    used = {name: entry for name, entry in field_cache.items() if entry["hit_rate"] is not None}
+    if used:
+        rates = ", ".join(f"{name} {entry['hit_rate']:.0%}" for name, entry in used.items())
+        print(f"🧠 Hit rate cache parser field: {rates}")
+
+
+def _preview(config: dict, df: pd.DataFrame, head_title: str, tail_title: str):
+    if not config["preview"]:
+        return
+    print(f"\n{head_title}")
+    print(df.head())
+    print(f"\n{tail_title}")
+    print(df.tail())
+
+
+def parse_args(argv=None) -> dict:
+    """Ubah argumen CLI menjadi override untuk load_config; argumen yang tidak diisi diabaikan."""
+    parser = argparse.ArgumentParser(description="ETL produk fashion-studio: extract, transform, load.")
+    parser.add_argument("--config", help="file konfigurasi JSON (lihat config.example.json)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES)
+    parser.add_argument("--base-url")
+    parser.add_argument("--workers", type=int, help="jumlah halaman yang diambil bersamaan")
+    parser.add_argument("--rate-limit", type=float, help="maksimum request per detik")
+    parser.add_argument("--parser", choices=["html.parser", "lxml"])
+    parser.add_argument("--pipelined", action="store_true", default=None, help="parsing di process pool")
+    parser.add_argument("--typed-fields", action="store_true", default=None,
+                        help="parse price/rating/colors menjadi angka saat extract")
+    parser.add_argument("--discover-pages", action="store_true", default=None,
+                        help="hitung jumlah halaman dulu lalu jadwalkan semuanya sekaligus")
+    parser.add_argument("--queue", help="file SQLite antrean crawl terdistribusi (lihat utils/work_queue.py)")
+    parser.add_argument("--queue-workers", type=int, help="jumlah proses worker lokal untuk --queue")
+    parser.add_argument("--no-resume", dest="resume", action="store_false", default=None,
+                        help="abaikan checkpoint crawl sebelumnya")
+    parser.add_argument("--chunk-size", type=int, help="jalankan semua tahap per chunk (streaming)")
+    parser.add_argument("--async", dest="async_", action="store_true", default=None,
+                        help="pipeline asyncio (aiohttp + asyncpg); --workers menjadi jumlah request bersamaan")
+    parser.add_argument("--sinks", nargs="+", choices=SINKS)
+    parser.add_argument("--postgres-mode", choices=PostgresSink.MODES)
+    parser.add_argument("--cdc-state", help="file SQLite state CDC; hanya perubahan yang dimuat")
+    parser.add_argument("--raw-path")
+    parser.add_argument("--clean-path")
+    parser.add_argument("--preview", action="store_true", default=None, help="cetak head()/tail() tiap tahap")
+    parser.add_argument("--metrics-json")
+    parser.add_argument("--prometheus", help="tulis metrik ke textfile Prometheus")
+    parser.add_argument("--profile", help="rekam profil cProfile ke file ini")
+    args = parser.parse_args(argv)
+
+    overrides = {
+        "stages": args.stages,
+        "base_url": args.base_url,
+        "chunk_size": args.chunk_size,
+        "async": args.async_,
+        "sinks": args.sinks,
+        "raw_path": args.raw_path,
+        "clean_path": args.clean_path,
+        "preview": args.preview,
+        "extract": {"max_workers": args.workers, "rate_limit": args.rate_limit, "parser": args.parser,
+                    "pipelined": args.pipelined, "resume": args.resume, "typed_fields": args.typed_fields,
+                    "discover_pages": args.discover_pages},
+        "postgres": {"mode": args.postgres_mode},
+        "cdc": {"state": args.cdc_state},
+        "queue": {"path": args.queue, "workers": args.queue_workers},
+        "metrics": {"json": args.metrics_json, "prometheus": args.prometheus, "profile": args.profile},
+    }
+    return {"config": args.config, "overrides": _drop_unset(overrides)}
+
+
+def _drop_unset(options: dict) -> dict:
+    cleaned = {}
+    for key, value in options.items():
+        if isinstance(value, dict):
+            value = _drop_unset(value)
+            if value:
+                cleaned[key] = value
+        elif value is not None:
+            cleaned[key] = value
+    return cleaned
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        config = load_config(args["config"], args["overrides"])
+    except (OSError, ValueError) as e:
+        print(f"❌ Konfigurasi tidak valid: {e}")
+        return 2
+    stats = run_pipeline(config)
+    failed = [name for name, result in stats["sinks"].items() if not result["ok"]]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+import sqlite3
+import pandas as pd
+from utils.load import PRODUCT_COLUMNS, SQLITE_TIMESTAMP_FORMAT
+from utils.transform import apply_output_schema
+
+COLUMNS = PRODUCT_COLUMNS.split(", ")
+
+# Filter yang didukung: nama argumen -> (kolom, operator). gender/size juga menerima list.
+FILTERS = {
+    "gender": ("gender", "="),
+    "size": ("size", "="),
+    "min_price": ("price", ">="),
+    "max_price": ("price", "<="),
+    "min_rating": ("rating", ">="),
+    "max_rating": ("rating", "<="),
+    "since": ("timestamp", ">="),
+}
+
+AGGREGATES = {
+    "count": "count(*)",
+    "avg_price": "avg(price)",
+    "min_price": "min(price)",
+    "max_price": "max(price)",
+    "avg_rating": "avg(rating)",
+}
+
+
+class ProductStore:
+    """API query read-only di atas tabel produk SQLite yang ditulis SqliteSink.
+
+    Filter diterjemahkan ke WHERE dengan parameter, sehingga memakai index
+    gender+size, price, dan rating dari SqliteSink; pencarian dan agregasi
+    selesai di database tanpa membaca seluruh CSV ke pandas.
+
+        store = ProductStore("products.db")
+        store.find(gender="women", size=["M", "L"], max_price=500_000, order_by="-rating", limit=10)
+        store.aggregate(by="gender", min_rating=4)
+    """
+
+    def __init__(self, path: str = "products.db", table_name: str = "products"):
+        self.path = path
+        self.table_name = table_name
+        self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+    def find(self, columns=None, order_by: str = None, limit: int = None, **filters) -> pd.DataFrame:
+        """Baris yang cocok dengan filter; `order_by="-price"` untuk urutan menurun."""
+        columns = list(columns or COLUMNS)
+        _check_columns(columns)
+        where, params = _where(filters)
+        sql = f"SELECT {', '.join(columns)} FROM {self.table_name}{where}"
+        if order_by:
+            column = order_by.lstrip("-")
+            _check_columns([column])
+            sql += f" ORDER BY {column} {'DESC' if order_by.startswith('-') else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        return apply_output_schema(df) if columns == COLUMNS else df
+
+    def count(self, **filters) -> int:
+        where, params = _where(filters)
+        return self.conn.execute(f"SELECT count(*) FROM {self.table_name}{where}", params).fetchone()[0]
+
+    def aggregate(self, by=("gender",), metrics=tuple(AGGREGATES), **filters) -> pd.DataFrame:
+        """Agregasi per grup, mis. `aggregate(by=["gender", "size"], metrics=["count", "avg_price"])`."""
+        by = [by] if isinstance(by, str) else list(by)
+        _check_columns(by)
+        unknown = set(metrics) - set(AGGREGATES)
+        if unknown:
+            raise ValueError(f"Metrik tidak dikenal: {sorted(unknown)}; pilih dari {sorted(AGGREGATES)}")
+        where, params = _where(filters)
+        select = by + [f"{AGGREGATES[name]} AS {name}" for name in metrics]
+        group = f" GROUP BY {', '.join(by)} ORDER BY {', '.join(by)}" if by else ""
+        return pd.read_sql_query(f"SELECT {', '.join(select)} FROM {self.table_name}{where}{group}",
+                                 self.conn, params=params)
+
+    def query_plan(self, **filters) -> str:
+        """EXPLAIN QUERY PLAN untuk filter tertentu, untuk memastikan index terpakai."""
+        where, params = _where(filters)
+        rows = self.conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM {self.table_name}{where}", params).fetchall()
+        return "\n".join(row[-1] for row in rows)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_columns(columns):
+    unknown = set(columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Kolom tidak dikenal: {sorted(unknown)}; pilih dari {COLUMNS}")
+
+
+def _where(filters: dict):
+    clauses, params = [], []
+    for name, value in filters.items():
+        if value is None:
+            continue
+        if name not in FILTERS:
+            raise ValueError(f"Filter tidak dikenal: {name!r}; pilih dari {sorted(FILTERS)}")
+        column, operator = FILTERS[name]
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            clauses.append(f"{column} {operator} ?")
+            params.append(pd.Timestamp(value).strftime(SQLITE_TIMESTAMP_FORMAT) if column == "timestamp" else value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
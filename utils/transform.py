@@ -1,40 +1,144 @@
-import pandas as pd
+import hashlib
+import re
 import numpy as np
+import pandas as pd
+from utils.metrics import observe
+
+INVALID_TITLES = ['unknown product', 'none']
+INVALID_PRICES = ['price unavailable', 'none']
+INVALID_RATINGS = ['not rated', '⭐ invalid rating / 5', 'none']
+USD_TO_IDR = 16000
+
+PRICE_NOISE = re.compile(r'[^\d.]')
+RATING_VALUE = re.compile(r'([\d.]+)')
+COLORS_VALUE = re.compile(r'(\d+)')
+
+# Skema keluaran transform_fashion_data: price dalam Rupiah bulat (int64),
+# size/gender sebagai kategori, dan timestamp sebagai datetime64.
+OUTPUT_SCHEMA = {
+    'price': 'int64',
+    'rating': 'float32',
+    'colors': 'int8',
+    'size': 'category',
+    'gender': 'category',
+    'timestamp': 'datetime64[us]',
+}
+
+
+def _on_distinct(series, func):
+    """Jalankan operasi string vektor sekali per nilai unik lalu sebarkan kembali ke semua baris.
+
+    Nilai kosong (None/NaN) tidak digabung agar hasilnya sama persis dengan
+    menjalankan `func` langsung pada seluruh kolom.
+    """
+    codes, _ = pd.factorize(series)
+    missing = np.flatnonzero(codes == -1)
+    if len(missing):
+        codes = codes.copy()
+        codes[missing] = codes.max(initial=-1) + 1 + np.arange(len(missing))
+    _, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+    result = func(series.iloc[first])
+    return pd.Series(result.to_numpy()[inverse], index=series.index, dtype=result.dtype, name=series.name)
+
+
+def _is_invalid(values):
+    return lambda s: s.str.lower().isin(values)
+
+
+def _parse_price(s):
+    return pd.to_numeric(s.str.replace(PRICE_NOISE, '', regex=True), errors='coerce') * USD_TO_IDR
+
+
+def _extract_number(pattern):
+    return lambda s: pd.to_numeric(s.str.extract(pattern)[0], errors='coerce')
+
+
+def _clean_size(s):
+    s = s.astype(str).str.strip().str.upper()
+    return s.replace(['NONE', 'NONETYPE', 'NAN'], np.nan).infer_objects()
+
+
+def _clean_gender(s):
+    return s.astype(str).str.strip().str.lower()
+
 
 def transform_fashion_data(df):
-    try:
-        df_clean = df.copy()
+    with observe("transform", rows_in=len(df)) as stage:
+        df_clean = _transform_fashion_data(df)
+        stage.rows_out = len(df_clean)
+    return df_clean
 
-        # 1. Hapus baris dengan title tidak valid
-        df_clean = df_clean[~df_clean['title'].str.lower().isin(['unknown product', 'none'])]
 
-        # 2. Hapus baris dengan price tidak valid
-        df_clean = df_clean[~df_clean['price'].str.lower().isin(['price unavailable', 'none'])]
+def _transform_fashion_data(df):
+    try:
+        # Record bertipe dari extract (parse_page(..., typed=True)) sudah berisi angka
+        # untuk price/rating/colors; kolom numerik dipakai langsung tanpa regex.
+        price_typed, rating_typed, colors_typed = (
+            pd.api.types.is_numeric_dtype(df[col]) for col in ('price', 'rating', 'colors')
+        )
 
-        # 3. Konversi price ke float lalu ke Rupiah
-        df_clean['price'] = df_clean['price'].str.replace(r'[^\d.]', '', regex=True)
-        df_clean['price'] = pd.to_numeric(df_clean['price'], errors='coerce') * 16000
+        # 1-2. Mask gabungan untuk title dan price tidak valid (tanpa salinan DataFrame)
+        valid_item = ~_on_distinct(df['title'], _is_invalid(INVALID_TITLES)).to_numpy()
+        if not price_typed:
+            valid_item &= ~_on_distinct(df['price'], _is_invalid(INVALID_PRICES)).to_numpy()
 
-        # 4. Filter rating valid lalu ubah ke float
-        df_clean = df_clean[~df_clean['rating'].str.lower().isin(['not rated', '⭐ invalid rating / 5', 'none'])]
-        df_clean['rating'] = df_clean['rating'].str.extract(r'([\d.]+)')
-        df_clean['rating'] = pd.to_numeric(df_clean['rating'], errors='coerce')
+        # 3. Konversi price ke float lalu ke Rupiah (pada baris yang sama seperti filter sebelumnya)
+        if price_typed:
+            price = df['price'][valid_item] * USD_TO_IDR
+        else:
+            price = _on_distinct(df['price'][valid_item], _parse_price)
 
-        # 5. Ekstrak angka dari kolom colors
-        df_clean['colors'] = df_clean['colors'].str.extract(r'(\d+)')
-        df_clean['colors'] = pd.to_numeric(df_clean['colors'], errors='coerce')
+        # 4. Filter rating valid
+        valid_rating = np.ones(len(df), dtype=bool)
+        if not rating_typed:
+            valid_rating = ~_on_distinct(df['rating'], _is_invalid(INVALID_RATINGS)).to_numpy()
+        df_clean = df[valid_item & valid_rating].copy()
+        df_clean['price'] = price[valid_rating[valid_item]].set_axis(df_clean.index)
 
-        # 6. Bersihkan size dan gender
-        df_clean['size'] = df_clean['size'].astype(str).str.strip().str.upper()
-        df_clean['size'] = df_clean['size'].replace(['NONE', 'NONETYPE', 'NAN'], np.nan).infer_objects(copy=False)
+        # 5-6. Ekstrak rating, colors, size, gender sekali per nilai unik
+        if not rating_typed:
+            df_clean['rating'] = _on_distinct(df_clean['rating'], _extract_number(RATING_VALUE))
+        if not colors_typed:
+            df_clean['colors'] = _on_distinct(df_clean['colors'], _extract_number(COLORS_VALUE))
+        df_clean['size'] = _on_distinct(df_clean['size'], _clean_size)
+        df_clean['gender'] = _on_distinct(df_clean['gender'], _clean_gender)
 
-        df_clean['gender'] = df_clean['gender'].astype(str).str.strip().str.lower()
+        # 7. Colors di luar rentang int8 dan timestamp tidak valid dianggap NaN
+        df_clean['colors'] = df_clean['colors'].where(df_clean['colors'].between(0, 127))
+        df_clean['timestamp'] = pd.to_datetime(df_clean['timestamp'], errors='coerce', format='ISO8601')
 
-        # 7. Drop rows yang masih ada NaN
+        # 8. Drop rows yang masih ada NaN lalu terapkan skema bertipe
         df_clean.dropna(inplace=True)
 
-        return df_clean.reset_index(drop=True)
+        return apply_output_schema(df_clean.reset_index(drop=True))
 
     except Exception as e:
         print(f"⚠️ Terjadi kesalahan saat transformasi data: {e}")
         return pd.DataFrame()
+
+
+def apply_output_schema(df):
+    """Ubah DataFrame yang sudah bersih ke OUTPUT_SCHEMA (price dibulatkan ke Rupiah terdekat)."""
+    typed = df.assign(price=df['price'].round())
+    if not pd.api.types.is_datetime64_any_dtype(typed['timestamp']):
+        typed['timestamp'] = pd.to_datetime(typed['timestamp'], format='ISO8601')
+    return typed.astype(OUTPUT_SCHEMA)
+
+
+PRODUCT_IDENTITY = ['title', 'size', 'gender']
+
+
+def product_keys(df):
+    """Kunci produk yang stabil antar run: md5 dari title|size|gender (sama dengan md5(concat_ws('|', ...)) di PostgreSQL)."""
+    columns = [df[col].astype(str) for col in PRODUCT_IDENTITY]
+    keys = [hashlib.md5('|'.join(values).encode('utf-8')).hexdigest() for values in zip(*columns)]
+    return pd.Series(keys, index=df.index, name='product_key', dtype=object)
+
+
+def transform_fashion_data_chunks(chunks):
+    """Transformasi per chunk (DataFrame atau list of dict); chunk yang kosong setelah dibersihkan dilewati."""
+    for chunk in chunks:
+        df = chunk if isinstance(chunk, pd.DataFrame) else pd.DataFrame(chunk)
+        df_clean = transform_fashion_data(df)
+        if not df_clean.empty:
+            yield df_clean
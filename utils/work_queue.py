@@ -0,0 +1,332 @@
+"""Distributed crawl: a SQLite-backed work queue of catalog pages.
+
+A coordinator enqueues every page URL (see utils.discovery). Any number of
+worker processes, on this machine or on other nodes that share the queue
+file and shard directory, lease pages, run fetching_content + parse_page, and
+write one JSON shard per page. While a worker holds pages, a heartbeat thread
+renews their leases; a lease that stops being renewed (the worker process
+died) expires and the page is handed to another worker; a page is marked
+failed after `max_attempts` leases. The merge step reads the
+shards back in page order for transform_fashion_data.
+
+    python -m utils.work_queue enqueue https://fashion-studio.dicoding.dev/ --queue crawl_queue.db
+    python -m utils.work_queue worker --queue crawl_queue.db --shards crawl_shards   # on every node
+    python -m utils.work_queue status --queue crawl_queue.db
+
+SQLite needs a filesystem with working POSIX locks (a local disk, or a
+network filesystem that supports them). Where that is not available, run the
+workers as processes on one large machine with `--processes`.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import pandas as pd
+
+from utils.discovery import discover_pages
+from utils.extract import RateLimiter, fetching_content, parse_page, set_default_client
+from utils.fileio import atomic_write
+
+QUEUE_DDL = """
+CREATE TABLE IF NOT EXISTS tasks (
+    page INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status_idx ON tasks (status, page);
+"""
+STATUSES = ("pending", "leased", "done", "failed")
+
+
+class Task:
+    def __init__(self, page, url, attempts):
+        self.page = page
+        self.url = url
+        self.attempts = attempts
+
+    def __repr__(self):
+        return f"Task(page={self.page}, url={self.url!r}, attempts={self.attempts})"
+
+
+class CrawlQueue:
+    """Page tasks with leases: pending -> leased -> done, or back to pending on failure/expiry."""
+
+    def __init__(self, path="crawl_queue.db", lease_seconds=60, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript(QUEUE_DDL)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two workers can never lease the same page.
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, urls, start=1):
+        """Add page URLs in order (page numbers from `start`); pages already queued are kept as they are."""
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR IGNORE INTO tasks (page, url) VALUES (?, ?)",
+                             list(enumerate(urls, start)))
+
+    def lease(self, owner, limit=1):
+        """Claim up to `limit` pending or expired tasks for `owner`, lowest pages first."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = 'failed', lease_owner = NULL, error = 'lease expired' "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            rows = conn.execute(
+                "SELECT page, url, attempts FROM tasks "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY page LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1 "
+                "WHERE page = ?",
+                [(owner, now + self.lease_seconds, page) for page, _, _ in rows],
+            )
+        return [Task(page, url, attempts + 1) for page, url, attempts in rows]
+
+    def renew(self, page, owner):
+        """Extend a lease that is still held by `owner`; False if it was lost."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE page = ? AND lease_owner = ? AND status = 'leased'",
+                (time.time() + self.lease_seconds, page, owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, page, owner):
+        """Mark a leased page done; False if the lease expired and moved to another worker."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE tasks SET status = 'done', lease_owner = NULL, error = NULL "
+                "WHERE page = ? AND lease_owner = ? AND status = 'leased'",
+                (page, owner),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, page, owner, error):
+        """Release a leased page for retry, or mark it failed after `max_attempts`."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner = NULL, error = ? WHERE page = ? AND lease_owner = ? AND status = 'leased'",
+                (self.max_attempts, str(error), page, owner),
+            )
+
+    def requeue_failed(self):
+        """Give failed pages a fresh set of attempts (used when a crawl is resumed)."""
+        with self._transaction() as conn:
+            return conn.execute(
+                "UPDATE tasks SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+            ).rowcount
+
+    def counts(self):
+        with self._connect() as conn:
+            found = dict(conn.execute("SELECT status, count(*) FROM tasks GROUP BY status").fetchall())
+        return {status: found.get(status, 0) for status in STATUSES}
+
+    def finished(self):
+        """True when no page is pending or leased."""
+        counts = self.counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def url(self, page):
+        with self._connect() as conn:
+            row = conn.execute("SELECT url FROM tasks WHERE page = ?", (page,)).fetchone()
+        return row[0] if row else None
+
+    def last_page(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT max(page) FROM tasks").fetchone()[0]
+
+    def done_pages(self):
+        with self._connect() as conn:
+            return [page for (page,) in conn.execute("SELECT page FROM tasks WHERE status = 'done' ORDER BY page")]
+
+    def clear(self):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM tasks")
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT count(*) FROM tasks").fetchone()[0]
+
+
+def shard_path(shard_dir, page):
+    return os.path.join(shard_dir, f"page-{page:06d}.json")
+
+
+def worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+@contextmanager
+def _heartbeat(queue, pages, owner):
+    """Renew the leases on `pages` every third of `lease_seconds` until the block exits."""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(queue.lease_seconds / 3):
+            for page in pages:
+                queue.renew(page, owner)  # False once the page is completed; nothing to do then
+
+    thread = threading.Thread(target=beat, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_worker(queue, shard_dir, owner=None, parser='html.parser', typed=False, batch_size=1,
+               poll_interval=0.5, rate_limit=None):
+    """Lease, scrape and shard pages until the queue is finished. Returns the number of pages completed.
+
+    `rate_limit` caps this worker's requests per second.
+    """
+    owner = owner or worker_id()
+    rate_limiter = RateLimiter(rate_limit)
+    os.makedirs(shard_dir, exist_ok=True)
+    completed = 0
+    while True:
+        tasks = queue.lease(owner, batch_size)
+        if not tasks:
+            if queue.finished():
+                return completed
+            # Other workers hold the remaining leases; wait in case one of them expires.
+            time.sleep(poll_interval)
+            continue
+
+        with _heartbeat(queue, [task.page for task in tasks], owner):
+            for task in tasks:
+                try:
+                    rate_limiter.wait()
+                    html = fetching_content(task.url)
+                    if html is None:
+                        queue.fail(task.page, owner, "fetch failed")
+                        continue
+                    records, has_next = parse_page(html, parser, typed)
+                    atomic_write(shard_path(shard_dir, task.page), json.dumps(
+                        {"url": task.url, "records": records, "has_next": has_next}, ensure_ascii=False))
+                except Exception as e:
+                    print(f"Error scraping page {task.page}: {e}")
+                    queue.fail(task.page, owner, e)
+                    continue
+                if queue.complete(task.page, owner):
+                    completed += 1
+
+
+def _worker_process(queue_options, shard_dir, parser, typed, rate_limit):
+    set_default_client(None)  # the parent's pooled connections must not be shared with a child
+    run_worker(CrawlQueue(**queue_options), shard_dir, parser=parser, typed=typed, rate_limit=rate_limit)
+
+
+def run_workers(queue, shard_dir, processes=4, parser='html.parser', typed=False, rate_limit=None):
+    """Run `processes` local worker processes against `queue` and wait for them to finish.
+
+    `rate_limit` is the total for this node; each process gets an equal share of it.
+    """
+    options = dict(path=queue.path, lease_seconds=queue.lease_seconds, max_attempts=queue.max_attempts)
+    share = rate_limit / processes if rate_limit else None
+    workers = [
+        multiprocessing.Process(target=_worker_process, args=(options, shard_dir, parser, typed, share))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def next_unqueued_page(queue, shard_dir):
+    """Page after the last queued one if that page was scraped and still links to a next page, else None.
+
+    Discovery can undercount (the catalog grew, or the page count in the markup is stale);
+    the coordinator then keeps enqueuing until the last page has no next link.
+    """
+    last = queue.last_page()
+    if last is None or last not in queue.done_pages():
+        return None
+    with open(shard_path(shard_dir, last), "r", encoding="utf-8") as f:
+        return last + 1 if json.load(f).get("has_next") else None
+
+
+def iter_shards(queue, shard_dir):
+    """Yield each completed page's records in page order (same shape as iter_pages)."""
+    for page in queue.done_pages():
+        with open(shard_path(shard_dir, page), "r", encoding="utf-8") as f:
+            records = json.load(f)["records"]
+        if records:
+            yield records
+
+
+def merge_shards(queue, shard_dir):
+    """Raw records of every completed page, in page order, as one DataFrame for transform_fashion_data."""
+    return pd.DataFrame([record for records in iter_shards(queue, shard_dir) for record in records])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Distributed crawl work queue.")
+    parser.add_argument("command", choices=["enqueue", "worker", "status"])
+    parser.add_argument("base_url", nargs="?", help="catalog to enqueue (enqueue only)")
+    parser.add_argument("--queue", default="crawl_queue.db")
+    parser.add_argument("--shards", default="crawl_shards")
+    parser.add_argument("--lease-seconds", type=float, default=60)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--processes", type=int, default=1, help="worker processes on this node")
+    parser.add_argument("--parser", choices=["html.parser", "lxml"], default="html.parser")
+    parser.add_argument("--typed-fields", action="store_true")
+    parser.add_argument("--rate-limit", type=float, help="max requests per second for this node")
+    args = parser.parse_args(argv)
+
+    queue = CrawlQueue(args.queue, args.lease_seconds, args.max_attempts)
+    if args.command == "enqueue":
+        if not args.base_url:
+            parser.error("enqueue needs a base_url")
+        urls = discover_pages(args.base_url, args.parser)
+        queue.enqueue(urls)
+        print(f"Enqueued {len(urls)} pages into {args.queue}")
+    elif args.command == "worker":
+        if args.processes > 1:
+            run_workers(queue, args.shards, args.processes, args.parser, args.typed_fields, args.rate_limit)
+        else:
+            run_worker(queue, args.shards, parser=args.parser, typed=args.typed_fields, rate_limit=args.rate_limit)
+    print(json.dumps(queue.counts()))
+
+
+if __name__ == '__main__':
+    main()